@@ -0,0 +1,16 @@
+import time, tempfile, datetime as dt, jobserver as jserv
+from pathlib import Path
+d=Path(tempfile.mkdtemp())
+c=jserv.ConfigClient(config_file_path=d/"c.json")
+c.set("database_path", str(d/"db.sqlite3"))
+db=jserv.DatabaseClient(config=c)
+db.set_entries([jserv.DatabaseEntry.JobStatus(job_id=i,init_time=dt.datetime.now(),archived=False) for i in range(1,1001)], jserv.enums.SQLSetMethod.INSERT)
+t=time.perf_counter()
+for i in range(20000):
+    db.get_entry(table=jserv.enums.DatabaseTable.JOB_STATUS, primary_key_fields={"job_id": i%1000+1})
+print("get_entry", round(20000/(time.perf_counter()-t)),"/s")
+t=time.perf_counter()
+for i in range(5000):
+    db.search_entries(table=jserv.enums.DatabaseTable.JOB_STATUS, filters=[jserv.data.Filter.Compare("job_id", jserv.enums.SQLCompareOperator.EQUALS, i%1000+1)])
+print("search", round(5000/(time.perf_counter()-t)),"/s")
+db.disconnect()
@@ -0,0 +1,10 @@
+import tempfile, jobserver as jserv
+from pathlib import Path
+d=Path(tempfile.mkdtemp())
+c=jserv.ConfigClient(config_file_path=d/"c.json"); c.set("database_path", str(d/"db.sqlite3"))
+db=jserv.DatabaseClient(config=c)
+for q in ["SELECT * FROM JobUpdate WHERE (update_time, job_id) < (?, ?) ORDER BY update_time DESC, job_id DESC LIMIT 10",
+          "SELECT * FROM JobUpdate WHERE job_id = ? AND (update_time, job_id) > (?, ?) ORDER BY update_time, job_id LIMIT 10",
+          "SELECT * FROM JobStatus WHERE archived = ? AND (init_time, job_id) > (?, ?) ORDER BY init_time, job_id LIMIT 10",
+          "SELECT * FROM Error WHERE (error_time, error_id) < (?, ?) ORDER BY error_time DESC, error_id DESC LIMIT 10"]:
+    print([r[-1] for r in db._db_connection.execute("EXPLAIN QUERY PLAN "+q, [1]*q.count("?")).fetchall()])
@@ -0,0 +1,15 @@
+import time, pickle, datetime as dt, sys
+sys.path.insert(0, ".")
+from pathlib import Path
+import jobserver as jserv
+from tests.fixtures.jobs.checkpoint_job import CheckpointJob
+d = Path(".tmp/bench/r"); import shutil; shutil.rmtree(d, ignore_errors=True); d.mkdir(parents=True)
+c = jserv.ConfigClient(config_file_path=d/"c.json"); c.set("database_path", str(d/"db.sqlite"))
+c.set("available_threads", 0)
+db = jserv.DatabaseClient(config=c)
+now = dt.datetime.now()
+p = pickle.dumps(CheckpointJob.Parameters())
+rows = [jserv.DatabaseEntry.JobStatus(job_id=i+1, init_time=now, archived=False, template_name="CheckpointJob", parameters=p, priority=3, lease_owner="server") for i in range(100000)]
+db.set_entries(rows, jserv.enums.SQLSetMethod.INSERT)
+m = jserv.JobManager(config=c, database=db, allowed_jobs=[CheckpointJob], lease_owner="server")
+import cProfile; cProfile.run("m._recover_jobs()", sort="cumtime")
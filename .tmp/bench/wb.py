@@ -0,0 +1,13 @@
+import time, tempfile, jobserver as jserv
+from pathlib import Path
+for mode in ["FULL","BATCHED"]:
+    d=Path(tempfile.mkdtemp())
+    c=jserv.ConfigClient(config_file_path=d/"c.json")
+    c.set("database_path", str(d/"db.sqlite3")); c.set("database_durability", mode)
+    db=jserv.DatabaseClient(config=c)
+    t=time.perf_counter()
+    for i in range(3000):
+        db.buffer_entry(jserv.DatabaseEntry.JobUpdate(job_id=1,update_time=1_700_000_000_000_000+i,new_state=1,comment="x"))
+    db.flush()
+    print(mode, round(3000/(time.perf_counter()-t)),"rows/s")
+    db.disconnect()
@@ -1,4 +1,6 @@
 from . import enums
+from . import execution
 from . import structs
-from .core import Job, JobManager, JobServer, JobServerClient
+from . import scheduling
+from .core import Job, JobManager, JobWorker, JobServer, JobServerClient
 from .data import ConfigClient, DatabaseClient, DatabaseEntry
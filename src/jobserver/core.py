@@ -1,10 +1,24 @@
 # -*- coding: utf-8 -*-
+import os
+import json
+import math
+import time
+import heapq
+import functools
+import pickle
+import socket
+import threading
+import traceback
+import concurrent.futures
 import datetime as dt
 from . import data
 from . import enums
 from . import structs
-from typing import Callable
-from fastapi import FastAPI, APIRouter, Body
+from . import execution
+from . import scheduling
+from .internal import utils
+from typing import Any, Callable
+from fastapi import FastAPI, APIRouter, Body, HTTPException, Response
 
 
 class Job:
@@ -12,6 +26,8 @@ class Job:
         name: str
         job_id: str
 
+        timeout: float | None = None  # Seconds, overrides the template's state timeout
+
         def __init__(
             self,
             name: str,
@@ -33,7 +49,151 @@ class Job:
         def cancel(self) -> bool:
             return False
 
+    class AsyncState(State):
+        # For I/O-bound work; run as coroutines by jobs using the asyncio execution backend
+
+        async def start(self) -> bool:  # type: ignore[override]
+            return False
+
+        async def pause(self) -> bool:  # type: ignore[override]
+            return False
+
+        async def resume(self) -> bool:  # type: ignore[override]
+            return False
+
+        async def cancel(self) -> bool:  # type: ignore[override]
+            return False
+
+    class ParallelState(State):
+        """State that maps its partitions concurrently, then reduces their results.
+
+        Up to `max_workers` partitions (the job's `max_threads`) are mapped at once,
+        on threads or on the process pool depending on the job's execution backend.
+        On the process backend, `map` runs on a copy of the state rebuilt from its
+        class, name and job ID. Pausing stops new partitions from being started, and
+        cancelling also drops the partitions not yet started.
+        """
+
+        max_workers: int
+
+        _progress_callback: Callable[[int, int], None] | None
+        _resumed: threading.Event
+        _cancelled: threading.Event
+
+        def __init__(
+            self,
+            name: str,
+            job_id: str,
+            update_callback: Callable | None = None,
+            max_workers: int = 1,
+        ) -> None:
+            super().__init__(name=name, job_id=job_id)
+            self.max_workers = max(1, max_workers)
+            self._progress_callback = update_callback
+            self._resumed = threading.Event()
+            self._resumed.set()
+            self._cancelled = threading.Event()
+
+        def partition(self) -> list[Any]:
+            return []
+
+        def map(self, partition: Any) -> Any:
+            return None
+
+        def reduce(self, results: list[Any]) -> bool:
+            return True
+
+        def pause(self) -> bool:
+            self._resumed.clear()
+            return True
+
+        def resume(self) -> bool:
+            self._resumed.set()
+            return True
+
+        def cancel(self) -> bool:
+            self._cancelled.set()
+            self._resumed.set()
+            return True
+
+        def run_partitions(
+            self,
+            map_partition: Callable[[Any], concurrent.futures.Future],
+        ) -> bool:
+            # Called by the execution backend, with a function that maps one partition
+            partitions = list(self.partition())
+            results: list[Any] = [None] * len(partitions)
+            running: dict[concurrent.futures.Future, int] = {}
+            next_index = 0
+            try:
+                while next_index < len(partitions) or running:
+                    # While paused, only wait for the partitions already running
+                    if not running:
+                        self._resumed.wait()
+                    while (
+                        next_index < len(partitions)
+                        and len(running) < self.max_workers
+                        and self._resumed.is_set()
+                        and not self._cancelled.is_set()
+                    ):
+                        running[map_partition(partitions[next_index])] = next_index
+                        next_index += 1
+                    if self._cancelled.is_set():
+                        return False
+
+                    finished, _ = concurrent.futures.wait(
+                        running, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in finished:
+                        results[running.pop(future)] = future.result()
+                        if self._progress_callback is not None:
+                            self._progress_callback(next_index - len(running), len(partitions))
+            finally:
+                for future in running:
+                    future.cancel()
+            return bool(self.reduce(results))
+
+    # Subclasses define their own parameter and template classes
+    Parameters: type[structs.JobParameters] = structs.JobParameters
+    Template: type[structs.JobTemplate] = structs.JobTemplate
+
+    # Statuses a job can move to from each status. Any other move is rejected.
+    _transitions: dict[enums.JobStatus, frozenset[enums.JobStatus]] = {
+        enums.JobStatus.PENDING: frozenset([enums.JobStatus.RUNNING, enums.JobStatus.CLOSED]),
+        enums.JobStatus.RUNNING: frozenset(
+            [
+                enums.JobStatus.PAUSING,
+                enums.JobStatus.EXITING,
+                enums.JobStatus.PENDING,
+                enums.JobStatus.CLOSED,
+            ]
+        ),
+        enums.JobStatus.PAUSING: frozenset(
+            [
+                enums.JobStatus.PAUSED,
+                enums.JobStatus.RUNNING,
+                enums.JobStatus.PENDING,
+                enums.JobStatus.CLOSED,
+            ]
+        ),
+        enums.JobStatus.PAUSED: frozenset(
+            [enums.JobStatus.RESUMING, enums.JobStatus.PENDING, enums.JobStatus.CLOSED]
+        ),
+        enums.JobStatus.RESUMING: frozenset(
+            [
+                enums.JobStatus.RUNNING,
+                enums.JobStatus.PAUSED,
+                enums.JobStatus.PENDING,
+                enums.JobStatus.CLOSED,
+            ]
+        ),
+        enums.JobStatus.EXITING: frozenset([enums.JobStatus.CLOSED]),
+        enums.JobStatus.CLOSED: frozenset(),
+    }
+
     # Input
+    job_id: int | None
+    client_token: str | None  # Client that submitted the job, for fair-share scheduling
     template: type[structs.JobTemplate]
     parameters: structs.JobParameters
     init_time: dt.datetime
@@ -45,6 +205,18 @@ class Job:
     # Internal
     _update_callback: Callable[[enums.JobUpdateType], None] | None
     _states: list[type[State]]  # List of state classes
+    _current_state: State | None
+    _deferred_state_index: int | None  # Next state to start once resumed
+    _state_index: int  # First state to run, advanced at every checkpoint
+    _start_time: dt.datetime | None
+    _attempt: int
+    _lock: threading.Lock  # Guards status changes and the hand-off between states and timeouts
+    _state_timer: int | None
+    _job_timer: int | None
+    _cache_key: str | None
+    _manager: "JobManager | None"
+    _backend: execution.ExecutionBackend | None
+    _on_closed: Callable[["Job"], None] | None
 
     def __init__(
         self,
@@ -54,14 +226,30 @@ class Job:
         job_parameters: structs.JobParameters | None = None,
         update_callback: Callable[[enums.JobUpdateType], None] | None = None,
     ) -> None:
+        self.job_id = None
+        self.client_token = None
         self.template = _template
         self._states = _states
         self._update_callback = update_callback
+        self._current_state = None
+        self._deferred_state_index = None
+        self._state_index = 0
+        self._start_time = None
+        self._attempt = 1
+        self._lock = threading.Lock()
+        self._state_timer = None
+        self._job_timer = None
+        self._cache_key = None
+        self._manager = None
+        self._backend = None
+        self._on_closed = None
 
         if job_id is not None and job_parameters is not None:
             raise ValueError("Either job_id or job_parameters should be provided, not both.")
         elif job_id is not None:
-            self._load_from_memory(job_id=job_id)
+            raise ValueError(
+                "Jobs cannot be loaded by ID. Open jobs are recovered by their JobManager on start."
+            )
         elif job_parameters is not None:
             self._create_from_parameters(job_parameters=job_parameters)
         else:
@@ -70,21 +258,319 @@ class Job:
         self.job_status = enums.JobStatus.PENDING
         self.job_result = None
 
-    def _load_from_memory(self, job_id: str):
-        # Load job state from memory or database
-        raise NotImplementedError("This method should be implemented by subclasses.")
+    def _load_from_memory(self, job_status_entry: data.DatabaseEntry.JobStatus) -> None:
+        # Continue a persisted job from the state it last checkpointed
+        self.job_id = job_status_entry.job_id
+        self._state_index = job_status_entry.state_index or 0
+        if job_status_entry.checkpoint is not None:
+            self.load_checkpoint(pickle.loads(job_status_entry.checkpoint))
 
     def _create_from_parameters(self, job_parameters: structs.JobParameters):
         # Load job state from provided parameters
         self.parameters = job_parameters
+        self.init_time = job_parameters.init_time
 
-    def _update_state(self, new_state: enums.JobUpdateType):
+    def _update_state(
+        self,
+        new_state: enums.JobUpdateType,
+        comment: str = "",
+        error_id: int | None = None,
+    ):
         # Update the job state and call the update callback if provided
         if self._update_callback:
             self._update_callback(new_state)
 
-        # TODO: log the job update to db
-        # TODO: start the next state (if there is one and not paused)
+        # Log the job update to db
+        if self._manager is not None:
+            self._manager._record_job_update(
+                job=self,
+                new_state=new_state,
+                comment=comment,
+                error_id=error_id,
+            )
+
+    def _can_transition(self, new_status: enums.JobStatus) -> bool:
+        return new_status in self._transitions[self.job_status]
+
+    def _set_status(
+        self,
+        new_status: enums.JobStatus,
+        expected: list[enums.JobStatus] | None = None,
+    ) -> bool:
+        # Compare-and-set the status. Returns False if it is no longer one of `expected`,
+        # and raises if the transition table does not allow the move.
+        with self._lock:
+            if expected is not None and self.job_status not in expected:
+                return False
+            if not self._can_transition(new_status):
+                raise structs.InvalidTransitionError(self.job_status, new_status)
+            self.job_status = new_status
+            return True
+
+    def _run(
+        self,
+        backend: execution.ExecutionBackend,
+        on_closed: Callable[["Job"], None] | None = None,
+    ) -> None:
+        # Run each state in order on the backend, stopping at the first one that fails
+        self._backend = backend
+        self._on_closed = on_closed
+        self._start_time = dt.datetime.now()
+        self._set_status(enums.JobStatus.RUNNING)
+        comment = "Job started" if self._attempt == 1 else f"Job started (attempt {self._attempt})"
+        self._update_state(enums.JobUpdateType.STATE_CHANGE, comment=comment)
+        if self.template.job_timeout is not None and self._manager is not None:
+            timeout = self.template.job_timeout
+            self._job_timer = self._manager._watchdog.schedule(
+                delay=timeout,
+                callback=lambda: self._on_job_timeout(timeout=timeout),
+            )
+        self._start_state(index=self._state_index)
+
+    def _start_state(self, index: int) -> None:
+        if index >= len(self._states):
+            self._close(return_code=enums.JobReturnCode.SUCCESS)
+            return
+
+        state_class = self._states[index]
+        if issubclass(state_class, Job.ParallelState):
+            state: Job.State = state_class(
+                name=state_class.__name__,
+                job_id=str(self.job_id),
+                update_callback=lambda finished, total: self._on_partitions_finished(
+                    index=index, name=state_class.__name__, finished=finished, total=total
+                ),
+                max_workers=self.parameters.max_threads,
+            )
+        else:
+            state = state_class(name=state_class.__name__, job_id=str(self.job_id))
+        with self._lock:
+            # Closed, or waiting to be retried
+            if self.job_status in [enums.JobStatus.CLOSED, enums.JobStatus.PENDING]:
+                return
+            self._current_state = state
+        timeout = (
+            state_class.timeout if state_class.timeout is not None else self.template.state_timeout
+        )
+        if timeout is not None and self._manager is not None:
+            self._state_timer = self._manager._watchdog.schedule(
+                delay=timeout,
+                callback=lambda: self._on_state_timeout(index=index, state=state, timeout=timeout),
+            )
+        try:
+            if isinstance(state, Job.ParallelState):
+                future = self._backend.run_parallel_state(state)  # type: ignore[union-attr]
+            else:
+                future = self._backend.run_state(state)  # type: ignore[union-attr]
+        except Exception:
+            self._update_state(enums.JobUpdateType.ERROR, comment=traceback.format_exc())
+            self._fail(return_code=enums.JobReturnCode.FAILED, error_code=enums.ErrorCode.UNKNOWN)
+            return
+        future.add_done_callback(
+            lambda future: self._on_state_finished(index=index, state=state, future=future)
+        )
+
+    def _on_state_finished(
+        self,
+        index: int,
+        state: State,
+        future: concurrent.futures.Future,
+    ) -> None:
+        # Late results of states that timed out, or of closed jobs, are dropped
+        if not self._claim_state(state):
+            return
+        error_code = enums.ErrorCode.UNKNOWN
+        try:
+            succeeded = bool(future.result())
+        except BaseException as e:
+            self._update_state(
+                enums.JobUpdateType.ERROR,
+                comment="".join(traceback.format_exception(e)),
+            )
+            if isinstance(e, structs.StateError):
+                error_code = e.error_code
+            succeeded = False
+
+        if not succeeded:
+            self._update_state(
+                enums.JobUpdateType.STATE_CHANGE,
+                comment=f"State {index} ({state.name}) failed",
+            )
+            self._fail(return_code=enums.JobReturnCode.FAILED, error_code=error_code)
+            return
+
+        self._update_state(
+            enums.JobUpdateType.STATE_CHANGE,
+            comment=f"State {index} ({state.name}) finished",
+        )
+        self._state_index = index + 1
+        if self._manager is not None:
+            self._manager._record_checkpoint(job=self)
+
+        # Don't start the next state while paused
+        if self.job_status in [enums.JobStatus.PAUSING, enums.JobStatus.PAUSED]:
+            self._deferred_state_index = index + 1
+            return
+        self._start_state(index=index + 1)
+
+    def _on_partitions_finished(self, index: int, name: str, finished: int, total: int) -> None:
+        # Partitions can still finish after the state timed out or the job closed
+        if self.job_status in [enums.JobStatus.CLOSED, enums.JobStatus.PENDING]:
+            return
+        self._update_state(
+            enums.JobUpdateType.STATE_CHANGE,
+            comment=f"State {index} ({name}) finished partition {finished} of {total}",
+        )
+
+    def _claim_state(self, state: State | None) -> bool:
+        # The outcome of a state is handled once, when it finishes or when it times out
+        with self._lock:
+            if state is None or self._current_state is not state:
+                return False
+            self._current_state = None
+            state_timer, self._state_timer = self._state_timer, None
+        if state_timer is not None and self._manager is not None:
+            self._manager._watchdog.cancel(state_timer)
+        return True
+
+    def _on_state_timeout(self, index: int, state: State, timeout: float) -> None:
+        if not self._claim_state(state):
+            return
+        # Threads cannot be killed, so the state is asked to cancel and its result is dropped
+        self._backend.control_state(state, "cancel")  # type: ignore[union-attr]
+        comment = f"State {index} ({state.name}) timed out after {timeout}s"
+        error_id = self._manager._record_timeout(job=self, comment=comment)  # type: ignore[union-attr]
+        self._update_state(enums.JobUpdateType.ERROR, comment=comment, error_id=error_id)
+        self._fail(return_code=enums.JobReturnCode.KILLED, error_code=enums.ErrorCode.TIMEOUT)
+
+    def _on_job_timeout(self, timeout: float) -> None:
+        with self._lock:
+            if self.job_status in [enums.JobStatus.CLOSED, enums.JobStatus.PENDING]:
+                return
+            state = self._current_state
+            self._job_timer = None
+        if state is not None and self._claim_state(state):
+            self._backend.control_state(state, "cancel")  # type: ignore[union-attr]
+        comment = f"Job timed out after {timeout}s"
+        error_id = self._manager._record_timeout(job=self, comment=comment)  # type: ignore[union-attr]
+        self._update_state(enums.JobUpdateType.ERROR, comment=comment, error_id=error_id)
+        self._fail(return_code=enums.JobReturnCode.KILLED, error_code=enums.ErrorCode.TIMEOUT)
+
+    def _fail(self, return_code: enums.JobReturnCode, error_code: enums.ErrorCode) -> None:
+        # Close the failed attempt, unless the manager schedules another one
+        if self._manager is not None and self._manager._retry_job(job=self, error_code=error_code):
+            return
+        self._close(return_code=return_code)
+
+    def _reset_for_retry(self) -> None:
+        # Return to pending, dropping whatever the failed attempt left running
+        with self._lock:
+            if not self._can_transition(enums.JobStatus.PENDING):
+                return
+            self.job_status = enums.JobStatus.PENDING
+            self._current_state = None
+            self._deferred_state_index = None
+            timers = [self._state_timer, self._job_timer]
+            self._state_timer = self._job_timer = None
+        for timer in timers:
+            if timer is not None and self._manager is not None:
+                self._manager._watchdog.cancel(timer)
+
+    def _pause(self, comment: str) -> concurrent.futures.Future:
+        # Ask the current state to pause. The future resolves to whether it did.
+        self._set_status(enums.JobStatus.PAUSING)
+        state = self._current_state
+        self._update_state(enums.JobUpdateType.STATE_CHANGE, comment=f"Pausing: {comment}")
+        if state is None:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.set_result(True)
+        else:
+            future = self._backend.control_state(state, "pause")  # type: ignore[union-attr]
+        future.add_done_callback(self._on_paused)
+        return future
+
+    def _on_paused(self, future: concurrent.futures.Future) -> None:
+        # The job may have closed or been reset for a retry while pausing
+        paused = future.exception() is None and bool(future.result())
+        new_status = enums.JobStatus.PAUSED if paused else enums.JobStatus.RUNNING
+        if not self._set_status(new_status, expected=[enums.JobStatus.PAUSING]):
+            return
+        if paused:
+            self._update_state(enums.JobUpdateType.STATE_CHANGE, comment="Paused")
+        else:
+            self._update_state(enums.JobUpdateType.WARNING, comment="State refused to pause")
+            if self._deferred_state_index is not None:
+                index, self._deferred_state_index = self._deferred_state_index, None
+                self._start_state(index=index)
+
+    def _resume(self, comment: str) -> concurrent.futures.Future:
+        # Resume the paused state, or start the next one if the state finished while paused
+        self._set_status(enums.JobStatus.RESUMING)
+        state = self._current_state
+        self._update_state(enums.JobUpdateType.STATE_CHANGE, comment=f"Resuming: {comment}")
+        if self._deferred_state_index is not None or state is None:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.set_result(True)
+        else:
+            future = self._backend.control_state(state, "resume")  # type: ignore[union-attr]
+        future.add_done_callback(self._on_resumed)
+        return future
+
+    def _on_resumed(self, future: concurrent.futures.Future) -> None:
+        resumed = future.exception() is None and bool(future.result())
+        new_status = enums.JobStatus.RUNNING if resumed else enums.JobStatus.PAUSED
+        if not self._set_status(new_status, expected=[enums.JobStatus.RESUMING]):
+            return
+        if resumed:
+            self._update_state(enums.JobUpdateType.STATE_CHANGE, comment="Resumed")
+            if self._deferred_state_index is not None:
+                index, self._deferred_state_index = self._deferred_state_index, None
+                self._start_state(index=index)
+        else:
+            self._update_state(enums.JobUpdateType.WARNING, comment="State refused to resume")
+
+    def _close(
+        self,
+        return_code: enums.JobReturnCode,
+        artifacts: list[structs.Artifact] | None = None,
+    ) -> None:
+        with self._lock:
+            if not self._can_transition(enums.JobStatus.CLOSED):
+                return
+            self._current_state = None
+            self.job_result = structs.JobResult(return_code=return_code, artifacts=artifacts or [])
+            self.job_status = enums.JobStatus.CLOSED
+            timers = [self._state_timer, self._job_timer]
+            self._state_timer = self._job_timer = None
+        for timer in timers:
+            if timer is not None and self._manager is not None:
+                self._manager._watchdog.cancel(timer)
+        self._update_state(
+            enums.JobUpdateType.STATE_CHANGE,
+            comment=f"Job closed ({return_code.value})",
+        )
+        if self._manager is not None:
+            self._manager._record_job_closed(job=self)
+        if self._on_closed is not None:
+            self._on_closed(self)
+
+    def _cancel(self) -> None:
+        # Close the job, asking its running state to cancel. Its late result is dropped.
+        with self._lock:
+            if not self._can_transition(enums.JobStatus.CLOSED):
+                raise structs.InvalidTransitionError(self.job_status, enums.JobStatus.CLOSED)
+            state = self._current_state
+        if state is not None and self._claim_state(state):
+            self._backend.control_state(state, "cancel")  # type: ignore[union-attr]
+        self._close(return_code=enums.JobReturnCode.CANCELLED)
+
+    def get_checkpoint(self) -> Any:
+        # Progress to persist between states, restored by `load_checkpoint` after a restart.
+        # Must be picklable.
+        return None
+
+    def load_checkpoint(self, checkpoint: Any) -> None:
+        pass
 
     def get_template(self) -> dict:
         # Return the job template as a dictionary
@@ -96,32 +582,1139 @@ class Job:
 
 
 class JobManager:
+
+    # Data clients
+    config: data.ConfigClient
+    database: data.DatabaseClient
+
+    # Internal
+    _allowed_jobs: list[type[Job]]
+    _shared_queue: bool  # Submitted jobs are left in the database for workers to claim
+    _lease_owner: str  # Holds the lease of jobs run by this manager, kept across restarts
+    _lock: threading.RLock
+    _jobs_closed: threading.Condition
+    _jobs: dict[int, Job]
+    _run_queue: scheduling.FairShareQueue
+    _run_durations: dict[str, tuple[float, int]]  # Template name -> (total seconds, runs)
+    _queued_work: dict[int, float | None]  # Queued job -> expected thread seconds, if known
+    _queued_work_totals: dict[enums.JobPriority, float]
+    _queued_unknown_counts: dict[enums.JobPriority, int]  # Queued jobs with no expected duration
+    _max_queue_depths: dict[enums.JobPriority, int | None]
+    _max_retry_after: int
+    _dependencies: scheduling.DependencyGraph
+    _concurrency_pools: scheduling.ConcurrencyPools
+    _pool_job_ids: set[int]  # Jobs holding a slot of their concurrency pool
+    _result_cache: data.ResultCache
+    _backends: dict[enums.ExecutionBackend, execution.ExecutionBackend]
+    _admission: scheduling.AdmissionController
+    _admission_lookahead: int
+    _watchdog: scheduling.Watchdog
+    _autoscaler: scheduling.Autoscaler | None
+    _autoscale_interval: float
+    _autoscale_timer: int | None
+    _cpu_sample: tuple[float, float] | None  # Wall clock and CPU seconds at the last tick
+    _preemption_priority: enums.JobPriority
+    _pausing_threads: dict[int, int]  # Job ID -> threads freed once paused
+    _preempted_job_ids: set[int]
+    _unpausable_job_ids: set[int]  # Jobs whose state refused to pause for preemption
+    _started: bool
+    _dispatching: bool
+    _dispatch_requested: bool
+    _job_ids: utils.UniqueTimestampGenerator
+    _update_times: utils.UniqueTimestampGenerator
+    _error_ids: utils.UniqueTimestampGenerator
+    _fires_recurring_jobs: bool
+    _recurring_jobs: dict[str, data.DatabaseEntry.RecurringJob] | None  # None until loaded
+    _recurring_schedules: dict[str, scheduling.CronSchedule | scheduling.IntervalSchedule]
+    _recurring_heap: list[tuple[dt.datetime, int, str]]  # (Fire time, sequence, name)
+    _recurring_sequence: int
+    _recurring_timer: int | None
+    _recurring_max_catch_up: int
+
     def __init__(
         self,
         config: data.ConfigClient,
         database: data.DatabaseClient,
+        allowed_jobs: list[type[Job]] | None = None,
+        shared_queue: bool | None = None,
+        lease_owner: str | None = None,
+        fires_recurring_jobs: bool = True,
     ) -> None:
-        pass
+        self.config = config
+        self.database = database
+        self._allowed_jobs = allowed_jobs if allowed_jobs is not None else []
+        self._shared_queue = (
+            shared_queue
+            if shared_queue is not None
+            else bool(self.config.get(enums.ConfigValue.SHARED_QUEUE.value))
+        )
+        self._lease_owner = lease_owner or socket.gethostname()
+
+        self._lock = threading.RLock()
+        self._jobs_closed = threading.Condition(self._lock)
+        self._jobs = {}
+        self._run_queue = scheduling.FairShareQueue(
+            aging_interval=float(
+                self.config.get(enums.ConfigValue.JOB_AGING_INTERVAL.value) or 30.0
+            ),
+            policy=enums.SchedulingPolicy[
+                self.config.get(enums.ConfigValue.SCHEDULING_POLICY.value) or "PRIORITY"
+            ],
+            quantum=float(self.config.get(enums.ConfigValue.FAIR_SHARE_QUANTUM.value) or 1.0),
+            weights={
+                client_token: float(weight)
+                for client_token, weight in (
+                    self.config.get(enums.ConfigValue.CLIENT_WEIGHTS.value) or {}
+                ).items()
+            },
+            default_weight=float(
+                self.config.get(enums.ConfigValue.DEFAULT_CLIENT_WEIGHT.value) or 1.0
+            ),
+        )
+        max_queue_depths: dict = self.config.get(enums.ConfigValue.MAX_QUEUE_DEPTHS.value) or {}
+        self._max_queue_depths = {
+            priority: max_queue_depths.get(priority.name) for priority in enums.JobPriority
+        }
+        self._max_retry_after = int(self.config.get(enums.ConfigValue.MAX_RETRY_AFTER.value) or 60)
+        self._dependencies = scheduling.DependencyGraph()
+        self._run_durations = {}
+        self._queued_work = {}
+        self._queued_work_totals = {priority: 0.0 for priority in enums.JobPriority}
+        self._queued_unknown_counts = {priority: 0 for priority in enums.JobPriority}
+        self._concurrency_pools = scheduling.ConcurrencyPools(
+            aging_interval=self._run_queue.aging_interval,
+            policy=self._run_queue.policy,
+        )
+        self._pool_job_ids = set()
+        self._result_cache = data.ResultCache(
+            database=self.database,
+            max_entries=int(
+                self.config.get(enums.ConfigValue.RESULT_CACHE_MAX_ENTRIES.value) or 1024
+            ),
+            ttl=self.config.get(enums.ConfigValue.RESULT_CACHE_TTL.value),
+        )
+        self._backends = {}
+        self._admission = scheduling.AdmissionController(
+            budget=int(
+                self.config.get(enums.ConfigValue.AVAILABLE_THREADS.value) or os.cpu_count() or 1
+            ),
+            backfill_limit=int(
+                self.config.get(enums.ConfigValue.ADMISSION_BACKFILL_LIMIT.value) or 16
+            ),
+        )
+        self._admission_lookahead = int(
+            self.config.get(enums.ConfigValue.ADMISSION_LOOKAHEAD.value) or 64
+        )
+        self._watchdog = scheduling.Watchdog(
+            tick=float(self.config.get(enums.ConfigValue.WATCHDOG_TICK_INTERVAL.value) or 0.1)
+        )
+        autoscale_max_threads = self.config.get(enums.ConfigValue.AUTOSCALE_MAX_THREADS.value)
+        self._autoscaler = (
+            scheduling.Autoscaler(
+                min_threads=int(
+                    self.config.get(enums.ConfigValue.AUTOSCALE_MIN_THREADS.value) or 1
+                ),
+                max_threads=int(autoscale_max_threads),
+                cooldown=float(self.config.get(enums.ConfigValue.AUTOSCALE_COOLDOWN.value) or 30.0),
+                max_cpu_utilisation=float(
+                    self.config.get(enums.ConfigValue.AUTOSCALE_MAX_CPU_UTILISATION.value) or 0.9
+                ),
+                max_loop_lag=float(
+                    self.config.get(enums.ConfigValue.AUTOSCALE_MAX_LOOP_LAG.value) or 0.1
+                ),
+            )
+            if autoscale_max_threads is not None
+            else None
+        )
+        self._autoscale_interval = float(
+            self.config.get(enums.ConfigValue.AUTOSCALE_INTERVAL.value) or 1.0
+        )
+        self._autoscale_timer = None
+        self._cpu_sample = None
+        self._preemption_priority = enums.JobPriority[
+            self.config.get(enums.ConfigValue.PREEMPTION_PRIORITY.value) or "VERY_HIGH"
+        ]
+        self._pausing_threads = {}
+        self._preempted_job_ids = set()
+        self._unpausable_job_ids = set()
+        self._started = False
+        self._dispatching = False
+        self._dispatch_requested = False
+        self._job_ids = utils.UniqueTimestampGenerator()
+        self._update_times = utils.UniqueTimestampGenerator()
+        self._error_ids = utils.UniqueTimestampGenerator()
+        self._fires_recurring_jobs = fires_recurring_jobs
+        self._recurring_jobs = None
+        self._recurring_schedules = {}
+        self._recurring_heap = []
+        self._recurring_sequence = 0
+        self._recurring_timer = None
+        self._recurring_max_catch_up = int(
+            self.config.get(enums.ConfigValue.RECURRING_MAX_CATCH_UP.value) or 100
+        )
+
+    # region Private
+    def _record_job_update(
+        self,
+        job: Job,
+        new_state: enums.JobUpdateType,
+        comment: str = "",
+        error_id: int | None = None,
+    ) -> None:
+        if job.job_id is None:
+            raise ValueError("Updates are only recorded for jobs added to a manager.")
+        self.database.buffer_entry(
+            data.DatabaseEntry.JobUpdate(
+                job_id=job.job_id,
+                update_time=self._update_times.next(),
+                new_state=new_state.value,
+                comment=comment,
+                client_token=job.client_token,
+                error_id=error_id,
+            )
+        )
+
+    def _record_checkpoint(self, job: Job) -> None:
+        self.database.set_checkpoint(
+            job_id=job.job_id,  # type: ignore[arg-type]
+            state_index=job._state_index,
+            checkpoint=pickle.dumps(job.get_checkpoint()),
+        )
 
+    def _record_job_closed(self, job: Job) -> None:
+        # Archiving also ends the job's lease
+        self.database.archive_job(job.job_id)  # type: ignore[arg-type]
+
+    def _record_server_update(
+        self,
+        update_type: enums.ServerUpdateType,
+        subtype: int,
+        comment: str,
+        job: Job | None = None,
+    ) -> None:
+        self.database.buffer_entry(
+            data.DatabaseEntry.ServerUpdate(
+                update_time=self._update_times.next(),
+                type=update_type.value,
+                subtype=subtype,
+                comment=comment,
+                job_id=job.job_id if job is not None else None,
+                client_token=job.client_token if job is not None else None,
+            )
+        )
+
+    def _record_timeout(self, job: Job, comment: str) -> int:
+        # Log a timeout as an error and a server update, returning the error ID
+        error_id = self._error_ids.next()
+        self.database.buffer_entry(
+            data.DatabaseEntry.Error(
+                error_id=error_id,
+                error_time=dt.datetime.now(),
+                severity_level=enums.ErrorSeverity.NOT_GOOD,
+                traceback=comment,
+                job_id=str(job.job_id),
+                client_token=job.client_token,
+            )
+        )
+        self._record_server_update(
+            update_type=enums.ServerUpdateType.JOB,
+            subtype=enums.ServerUpdateSubtype.Job.COMMAND_TIMEOUT,
+            comment=comment,
+            job=job,
+        )
+        return error_id
+
+    def _get_backend(self, backend_type: enums.ExecutionBackend) -> execution.ExecutionBackend:
+        # Backends are created on first use
+        if backend_type not in self._backends:
+            match backend_type:
+                case enums.ExecutionBackend.THREAD:
+                    self._backends[backend_type] = execution.ThreadBackend()
+                case enums.ExecutionBackend.PROCESS:
+                    self._backends[backend_type] = execution.ProcessBackend(
+                        max_workers=self.config.get(enums.ConfigValue.PROCESS_POOL_WORKERS.value)
+                    )
+                case enums.ExecutionBackend.ASYNCIO:
+                    self._backends[backend_type] = execution.AsyncioBackend()
+        return self._backends[backend_type]
+
+    def _dispatch(self) -> None:
+        # Dispatching can be requested again from callbacks that run synchronously while
+        # dispatching, in which case the running dispatch makes another pass instead
+        with self._lock:
+            if self._dispatching:
+                self._dispatch_requested = True
+                return
+            self._dispatching = True
+            try:
+                self._dispatch_requested = True
+                while self._dispatch_requested:
+                    self._dispatch_requested = False
+                    self._resume_preempted_jobs()
+                    self._start_queued_jobs()
+                    self._preempt_for_queued_job()
+            finally:
+                self._dispatching = False
+
+    def _start_queued_jobs(self) -> None:
+        # Start queued jobs, highest effective priority first, packing them into the thread budget
+        while self._started and self._admission.get_free_threads() > 0:
+            pool_blocked_ids: list[int] = []
+            job_id = self._run_queue.pop_first(
+                predicate=lambda job_id: self._can_start(job_id, pool_blocked_ids),
+                lookahead=self._admission_lookahead,
+            )
+
+            # Park jobs whose pool is full, so they do not block the head of the queue
+            for blocked_id in pool_blocked_ids:
+                blocked_job = self._jobs[blocked_id]
+                self._run_queue.remove(blocked_id)
+                self._remove_queued_work(blocked_id)
+                self._concurrency_pools.park(
+                    pool=blocked_job.template.concurrency_pool,  # type: ignore[arg-type]
+                    job_id=blocked_id,
+                    priority=blocked_job.parameters.priority,
+                    init_time=blocked_job.init_time,
+                    deadline=blocked_job.parameters.deadline,
+                )
+
+            if job_id is None:
+                if pool_blocked_ids:
+                    continue
+                break
+            self._remove_queued_work(job_id)
+            job = self._jobs[job_id]
+            if job.job_status != enums.JobStatus.PENDING:
+                # Closed while it was queued
+                continue
+            self._admission.admit(job_id=job_id, max_threads=job.parameters.max_threads)
+            if job.template.concurrency_pool is not None:
+                self._concurrency_pools.acquire(job.template.concurrency_pool)
+                self._pool_job_ids.add(job_id)
+            job._run(
+                backend=self._get_backend(job.template.execution_backend),
+                on_closed=self._on_job_closed,
+            )
+
+    def _preempt_for_queued_job(self) -> None:
+        # Pause the lowest priority preemptible jobs to free threads for an urgent queued job
+        head_id = self._run_queue.peek()
+        if not self._started or head_id is None:
+            return
+        head_job = self._jobs[head_id]
+        priority = head_job.parameters.priority
+        if priority.value < self._preemption_priority.value:
+            return
+
+        needed_threads = (
+            min(head_job.parameters.max_threads, self._admission.budget)
+            - self._admission.get_free_threads()
+            - sum(self._pausing_threads.values())
+        )
+        candidates = [
+            self._jobs[job_id]
+            for job_id in self._admission.get_admitted_job_ids()
+            if self._jobs[job_id].template.preemptible
+            and self._jobs[job_id].parameters.priority.value < priority.value
+            and self._jobs[job_id].job_status == enums.JobStatus.RUNNING
+            and job_id not in self._pausing_threads
+            and job_id not in self._unpausable_job_ids
+        ]
+        candidates.sort(key=lambda job: (job.parameters.priority.value, -job.init_time.timestamp()))
+        for job in candidates:
+            if needed_threads <= 0:
+                break
+            threads = self._admission.get_threads(job.job_id)  # type: ignore[arg-type]
+            try:
+                future = job._pause(comment=f"Preempted by job {head_id}")
+            except structs.InvalidTransitionError:
+                # Closed or reset for a retry since it was picked
+                continue
+            self._pausing_threads[job.job_id] = threads  # type: ignore[index]
+            needed_threads -= threads
+            future.add_done_callback(functools.partial(self._on_job_paused, job))
+
+    def _on_job_paused(self, job: Job, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self._pausing_threads.pop(job.job_id, None)  # type: ignore[arg-type]
+            if job.job_status != enums.JobStatus.PAUSED:
+                # The state refused, so leave it running until it stops or is retried
+                self._unpausable_job_ids.add(job.job_id)  # type: ignore[arg-type]
+                return
+            self._admission.release(job.job_id)  # type: ignore[arg-type]
+            self._preempted_job_ids.add(job.job_id)  # type: ignore[arg-type]
+        self._dispatch()
+
+    def _resume_preempted_jobs(self) -> None:
+        # Resume preempted jobs once capacity returns, unless an urgent job is still waiting
+        if not self._started or not self._preempted_job_ids:
+            return
+        head_id = self._run_queue.peek()
+        if (
+            head_id is not None
+            and self._jobs[head_id].parameters.priority.value >= self._preemption_priority.value
+        ):
+            return
+
+        preempted_jobs = sorted(
+            (self._jobs[job_id] for job_id in self._preempted_job_ids),
+            key=lambda job: (-job.parameters.priority.value, job.init_time),
+        )
+        for job in preempted_jobs:
+            if not self._admission.fits(max_threads=job.parameters.max_threads):
+                continue
+            self._admission.admit(
+                job_id=job.job_id,  # type: ignore[arg-type]
+                max_threads=job.parameters.max_threads,
+            )
+            self._preempted_job_ids.discard(job.job_id)
+            job._resume(comment="Threads available again").add_done_callback(
+                functools.partial(self._on_job_resumed, job)
+            )
+
+    def _on_job_resumed(self, job: Job, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if job.job_status == enums.JobStatus.PAUSED:
+                # The state refused, so give the threads back and try again later
+                self._admission.release(job.job_id)  # type: ignore[arg-type]
+                self._preempted_job_ids.add(job.job_id)  # type: ignore[arg-type]
+
+    def _get_cpu_utilisation(self) -> float:
+        # Share of the machine's cores used by states since the last call, counting
+        # this process and the states that finished in worker processes
+        wall_time = time.monotonic()
+        cpu_time = time.process_time() + sum(
+            backend.get_cpu_seconds() for backend in self._backends.values()
+        )
+        previous_sample, self._cpu_sample = self._cpu_sample, (wall_time, cpu_time)
+        if previous_sample is None or wall_time <= previous_sample[0]:
+            return 0.0
+        return (cpu_time - previous_sample[1]) / (
+            (wall_time - previous_sample[0]) * (os.cpu_count() or 1)
+        )
+
+    def _autoscale(self) -> None:
+        # Runs on the watchdog every `autoscale_interval` seconds while started
+        with self._lock:
+            self._autoscale_timer = None
+            if not self._started or self._autoscaler is None:
+                return
+            asyncio_backend = self._backends.get(enums.ExecutionBackend.ASYNCIO)
+            thread_stats = self._admission.get_stats()
+            decision = self._autoscaler.decide(
+                budget=thread_stats["budget"],
+                queued_jobs=len(self._run_queue),
+                used_threads=thread_stats["used_threads"],
+                cpu_utilisation=self._get_cpu_utilisation(),
+                loop_lag=(
+                    asyncio_backend.get_loop_lag()  # type: ignore[attr-defined]
+                    if asyncio_backend is not None
+                    else 0.0
+                ),
+            )
+            if decision is not None:
+                budget, reason = decision
+                self._admission.set_budget(budget)
+                self._record_server_update(
+                    update_type=enums.ServerUpdateType.SCALING,
+                    subtype=(
+                        enums.ServerUpdateSubtype.Scaling.SCALE_UP
+                        if budget > thread_stats["budget"]
+                        else enums.ServerUpdateSubtype.Scaling.SCALE_DOWN
+                    ),
+                    comment=f"Thread budget {thread_stats['budget']} -> {budget}: {reason}",
+                )
+            self._autoscale_timer = self._watchdog.schedule(
+                delay=self._autoscale_interval,
+                callback=self._autoscale,
+            )
+        if decision is not None:
+            self._dispatch()
+
+    def _get_job_class(self, template_name: str) -> type[Job]:
+        for job_class in self._allowed_jobs:
+            if job_class.__name__ == template_name:
+                return job_class
+        raise KeyError(f"No job template named {template_name}.")
+
+    def _build_job(self, job_class: type[Job], parameter_set: dict) -> Job:
+        # Build a job from raw parameters, as submitted through the API
+        kwargs = dict(parameter_set)
+        if isinstance(kwargs.get("priority"), str):
+            kwargs["priority"] = enums.JobPriority[kwargs["priority"]]
+        elif "priority" in kwargs:
+            kwargs["priority"] = enums.JobPriority(kwargs["priority"])
+        if isinstance(kwargs.get("deadline"), str):
+            # Deadlines are compared with naive local times
+            deadline = dt.datetime.fromisoformat(kwargs["deadline"])
+            if deadline.tzinfo is not None:
+                deadline = deadline.astimezone().replace(tzinfo=None)
+            kwargs["deadline"] = deadline
+        # Subclasses supply their own template and states
+        job_factory: Callable[..., Job] = job_class
+        return job_factory(job_parameters=job_class.Parameters(**kwargs))
+
+    def _check_queue_capacity(self, jobs: list[Job]) -> None:
+        # Reject submissions that would take a priority level past its depth limit
+        submitted_counts: dict[enums.JobPriority, int] = {}
+        for job in jobs:
+            priority = job.parameters.priority
+            submitted_counts[priority] = submitted_counts.get(priority, 0) + 1
+
+        for priority, submitted_count in submitted_counts.items():
+            max_depth = self._max_queue_depths[priority]
+            if max_depth is None:
+                continue
+            # Jobs waiting on dependencies or parked on a full pool are queued too
+            depth = (
+                self._run_queue.get_depth(priority)
+                + self._dependencies.get_depth(priority)
+                + self._concurrency_pools.get_depth(priority)
+            )
+            excess = depth + submitted_count - max_depth
+            if excess <= 0:
+                continue
+
+            # Estimate how long the queue takes to drain enough to fit the submission
+            drain_rate = self._run_queue.get_drain_rate()
+            retry_after = (
+                min(math.ceil(excess / drain_rate), self._max_retry_after)
+                if drain_rate > 0
+                else self._max_retry_after
+            )
+            raise scheduling.QueueFullError(priority=priority, retry_after=max(1, retry_after))
+
+    def _add_jobs(self, jobs: list[Job], depends_on: list[list[int]]) -> list[int]:
+        with self._lock:
+            if self._shared_queue and any(depends_on):
+                raise ValueError("Dependencies are not supported with a shared queue.")
+            self._check_queue_capacity(jobs)
+
+            # Validate every job before anything is persisted
+            open_upstream_ids: list[list[int]] = []
+            failed_upstream_ids: list[int | None] = []
+            for job, job_depends_on in zip(jobs, depends_on):
+                if job.job_id is not None and job.job_id in self._jobs:
+                    raise ValueError(f"Job {job.job_id} has already been added.")
+                uses_asyncio = job.template.execution_backend == enums.ExecutionBackend.ASYNCIO
+                for state_class in job._states:
+                    if issubclass(state_class, Job.AsyncState) != uses_asyncio:
+                        raise ValueError(
+                            f"State {state_class.__name__} cannot run on the "
+                            f"{job.template.execution_backend.value} execution backend."
+                        )
+
+                # Only wait on upstream jobs that are still open
+                open_upstream_ids.append([])
+                failed_upstream_ids.append(None)
+                for upstream_id in job_depends_on:
+                    upstream_job = self._jobs.get(upstream_id)
+                    if upstream_job is None:
+                        raise ValueError(f"Upstream job {upstream_id} does not exist.")
+                    if upstream_job.job_result is None:
+                        open_upstream_ids[-1].append(upstream_id)
+                    elif upstream_job.job_result.return_code != enums.JobReturnCode.SUCCESS:
+                        failed_upstream_ids[-1] = upstream_id
+
+            # Jobs claimed from a shared queue already have a row. Rows of jobs run here are
+            # leased without an expiry, so workers never claim them.
+            new_jobs = [job for job in jobs if job.job_id is None]
+            for job in jobs:
+                if job.job_id is None:
+                    job.job_id = self._job_ids.next()
+                job._manager = self
+            self.database.set_entries(
+                entries=[
+                    data.DatabaseEntry.JobStatus(
+                        job_id=job.job_id,  # type: ignore[arg-type]
+                        init_time=job.init_time,
+                        archived=False,
+                        template_name=type(job).__name__,
+                        parameters=pickle.dumps(job.parameters),
+                        priority=job.parameters.priority.value,
+                        lease_owner=None if self._shared_queue else self._lease_owner,
+                    )
+                    for job in new_jobs
+                ],
+                set_method=enums.SQLSetMethod.INSERT,
+            )
+            if self._shared_queue:
+                return [job.job_id for job in jobs]  # type: ignore[misc]
+
+            for job, job_open_upstream_ids, failed_upstream_id in zip(
+                jobs, open_upstream_ids, failed_upstream_ids
+            ):
+                self._jobs[job.job_id] = job  # type: ignore[index]
+                if failed_upstream_id is not None:
+                    job._update_state(
+                        enums.JobUpdateType.STATE_CHANGE,
+                        comment=f"Upstream job {failed_upstream_id} did not succeed",
+                    )
+                    job._close(return_code=enums.JobReturnCode.CANCELLED)
+                    continue
+
+                # Skip running jobs whose result is already cached
+                if job.template.cache_results:
+                    job._cache_key = data.ResultCache.get_cache_key(
+                        template_name=job.parameters.name,
+                        parameters=job.parameters,
+                    )
+                    cached_result = self._result_cache.get(job._cache_key)
+                    if cached_result is not None:
+                        job._update_state(
+                            enums.JobUpdateType.STATE_CHANGE,
+                            comment="Result loaded from cache",
+                        )
+                        job._close(
+                            return_code=cached_result.return_code,
+                            artifacts=cached_result.artifacts,
+                        )
+                        continue
+
+                if self._dependencies.add(
+                    job_id=job.job_id,  # type: ignore[arg-type]
+                    depends_on=job_open_upstream_ids,
+                    priority=job.parameters.priority,
+                ):
+                    self._enqueue(job)
+                self._check_deadline(job)
+        self._dispatch()
+        return [job.job_id for job in jobs]  # type: ignore[misc]
+
+    def _can_start(self, job_id: int, pool_blocked_ids: list[int]) -> bool:
+        job = self._jobs[job_id]
+        pool = job.template.concurrency_pool
+        if pool is not None and self._concurrency_pools.is_full(pool):
+            pool_blocked_ids.append(job_id)
+            return False
+        return self._admission.can_admit(job_id=job_id, max_threads=job.parameters.max_threads)
+
+    def _enqueue(self, job: Job) -> None:
+        cost = min(job.parameters.max_threads, self._admission.budget)
+        self._run_queue.push(
+            job_id=job.job_id,  # type: ignore[arg-type]
+            priority=job.parameters.priority,
+            init_time=job.init_time,
+            deadline=job.parameters.deadline,
+            client_token=job.client_token,
+            cost=cost,
+        )
+
+        # Keep running totals of queued work, so estimates do not walk the queue
+        expected_duration = self._get_expected_duration(job)
+        priority = job.parameters.priority
+        if expected_duration is None:
+            self._queued_work[job.job_id] = None  # type: ignore[index]
+            self._queued_unknown_counts[priority] += 1
+        else:
+            self._queued_work[job.job_id] = expected_duration * cost  # type: ignore[index]
+            self._queued_work_totals[priority] += expected_duration * cost
+
+    def _remove_queued_work(self, job_id: int) -> None:
+        # Take a job that left the run queue out of the queued work totals
+        if job_id not in self._queued_work:
+            return
+        work = self._queued_work.pop(job_id)
+        priority = self._jobs[job_id].parameters.priority
+        if work is None:
+            self._queued_unknown_counts[priority] -= 1
+        else:
+            self._queued_work_totals[priority] -= work
+
+    def _get_expected_duration(self, job: Job) -> float | None:
+        # Mean duration of the template's successful runs, or the template's own estimate
+        total_seconds, runs = self._run_durations.get(job.parameters.name, (0.0, 0))
+        if runs > 0:
+            return total_seconds / runs
+        return job.template.expected_duration
+
+    def _estimate_completion_time(self, job: Job) -> dt.datetime | None:
+        # Assumes the work queued ahead of the job and the work left in running jobs
+        # spreads evenly over the thread budget. Queued work at the same or a higher
+        # priority counts as ahead. None if any duration is unknown.
+        expected_duration = self._get_expected_duration(job)
+        if expected_duration is None:
+            return None
+
+        work_ahead = 0.0
+        now = dt.datetime.now()
+        # At most one running job per thread of the budget
+        for job_id in self._admission.get_admitted_job_ids():
+            running_job = self._jobs[job_id]
+            running_duration = self._get_expected_duration(running_job)
+            if running_duration is None:
+                return None
+            start_time = running_job._start_time or now
+            elapsed = (now - start_time).total_seconds()
+            work_ahead += max(0.0, running_duration - elapsed) * self._admission.get_threads(job_id)
+        if job.job_id in self._queued_work:
+            priorities = [
+                priority
+                for priority in enums.JobPriority
+                if priority.value >= job.parameters.priority.value
+            ]
+            if any(self._queued_unknown_counts[priority] > 0 for priority in priorities):
+                return None
+            queued_work = sum(self._queued_work_totals[priority] for priority in priorities)
+            own_work = self._queued_work[job.job_id] or 0.0
+            # Clamped, as the running totals can drift below zero by rounding
+            work_ahead += max(0.0, queued_work - own_work)
+
+        return now + dt.timedelta(seconds=work_ahead / self._admission.budget + expected_duration)
+
+    def _check_deadline(self, job: Job) -> None:
+        # Warn when a job is submitted with a deadline it cannot be expected to meet
+        deadline = job.parameters.deadline
+        if deadline is None:
+            return
+        if deadline <= dt.datetime.now():
+            job._update_state(
+                enums.JobUpdateType.WARNING,
+                comment=f"Deadline {deadline.isoformat()} has already passed",
+            )
+            return
+        completion_time = self._estimate_completion_time(job)
+        if completion_time is not None and completion_time > deadline:
+            job._update_state(
+                enums.JobUpdateType.WARNING,
+                comment=(
+                    f"Deadline {deadline.isoformat()} is unlikely to be met, "
+                    f"estimated completion {completion_time.isoformat()}"
+                ),
+            )
+
+    def _release_job(self, job: Job) -> None:
+        # Give back the threads and pool slot of a job that stopped running
+        self._admission.release(job.job_id)  # type: ignore[arg-type]
+        self._pausing_threads.pop(job.job_id, None)  # type: ignore[arg-type]
+        self._preempted_job_ids.discard(job.job_id)
+        self._unpausable_job_ids.discard(job.job_id)
+        if job.job_id in self._pool_job_ids:
+            self._pool_job_ids.discard(job.job_id)
+            unparked_id = self._concurrency_pools.release(job.template.concurrency_pool)  # type: ignore[arg-type]
+            if unparked_id is not None:
+                self._enqueue(self._jobs[unparked_id])
+
+    def _retry_job(self, job: Job, error_code: enums.ErrorCode) -> bool:
+        # Schedule another attempt of a failed job on the watchdog, if its retry policy allows
+        retry_policy = job.template.retry_policy
+        if retry_policy is None or not retry_policy.should_retry(job._attempt, error_code):
+            return False
+
+        delay = retry_policy.get_delay(job._attempt)
+        with self._lock:
+            job._reset_for_retry()
+            self._release_job(job)
+            job._update_state(
+                enums.JobUpdateType.STATE_CHANGE,
+                comment=(
+                    f"Attempt {job._attempt} failed ({error_code.name}), "
+                    f"retrying in {delay:.3f}s"
+                ),
+            )
+            job._attempt += 1
+            self._watchdog.schedule(delay=delay, callback=lambda: self._on_retry_due(job))
+        self._dispatch()
+        return True
+
+    def _on_retry_due(self, job: Job) -> None:
+        with self._lock:
+            if job.job_status != enums.JobStatus.PENDING:
+                return
+            self._enqueue(job)
+        self._dispatch()
+
+    def _recover_jobs(self) -> None:
+        # Queue the open jobs this manager held before a restart, from their last checkpoint.
+        # Dependencies are not persisted, so recovered jobs no longer wait on each other.
+        recovered_count = 0
+        with self._lock:
+            for job_status_entry in self.database.get_open_jobs(lease_owner=self._lease_owner):
+                if job_status_entry.job_id in self._jobs:
+                    continue
+                try:
+                    job = self.load_job(job_status_entry)
+                except Exception:
+                    traceback.print_exc()
+                    continue
+                job._manager = self
+                self._jobs[job.job_id] = job  # type: ignore[index]
+                self._enqueue(job)
+                recovered_count += 1
+        if recovered_count > 0:
+            self._record_server_update(
+                update_type=enums.ServerUpdateType.JOB,
+                subtype=enums.ServerUpdateSubtype.Job.RECOVERED,
+                comment=f"Recovered {recovered_count} jobs",
+            )
+
+    def _get_schedule(
+        self,
+        cron: str | None,
+        interval: float | None,
+    ) -> scheduling.CronSchedule | scheduling.IntervalSchedule:
+        if (cron is None) == (interval is None):
+            raise ValueError("Recurring jobs need either a cron expression or an interval.")
+        if cron is not None:
+            return scheduling.CronSchedule(cron)
+        return scheduling.IntervalSchedule(interval)  # type: ignore[arg-type]
+
+    def _load_recurring_jobs(self) -> dict[str, data.DatabaseEntry.RecurringJob]:
+        # Definitions are loaded once, the first time they are needed
+        with self._lock:
+            if self._recurring_jobs is not None:
+                return self._recurring_jobs
+            self._recurring_jobs = {}
+            database_entries = self.database.search_entries(table=enums.DatabaseTable.RECURRING_JOB)
+            for database_entry in database_entries or []:
+                recurring_job = data.DatabaseEntry.RecurringJob(**database_entry.__dict__)
+                try:
+                    self._get_job_class(recurring_job.template_name)
+                    schedule = self._get_schedule(
+                        cron=recurring_job.cron,
+                        interval=recurring_job.interval,
+                    )
+                except (KeyError, ValueError):
+                    traceback.print_exc()
+                    continue
+                self._recurring_jobs[recurring_job.name] = recurring_job
+                self._recurring_schedules[recurring_job.name] = schedule
+                self._push_recurring_job(recurring_job)
+            return self._recurring_jobs
+
+    def _push_recurring_job(self, recurring_job: data.DatabaseEntry.RecurringJob) -> None:
+        # Heap entries of removed or rescheduled definitions are skipped when popped
+        self._recurring_sequence += 1
+        heapq.heappush(
+            self._recurring_heap,
+            (recurring_job.next_fire_time, self._recurring_sequence, recurring_job.name),
+        )
+        self._arm_recurring_timer()
+
+    def _arm_recurring_timer(self) -> None:
+        # A single watchdog timer, for the earliest fire time on the heap
+        if self._recurring_timer is not None:
+            self._watchdog.cancel(self._recurring_timer)
+            self._recurring_timer = None
+        if not self._started or not self._recurring_heap:
+            return
+        delay = (self._recurring_heap[0][0] - dt.datetime.now()).total_seconds()
+        self._recurring_timer = self._watchdog.schedule(
+            delay=max(0.0, delay),
+            callback=self._fire_recurring_jobs,
+        )
+
+    def _is_job_open(self, job_id: int) -> bool:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.job_status != enums.JobStatus.CLOSED
+        # Jobs left to workers are only in the database
+        job_status_entry = self.database.get_entry(
+            table=enums.DatabaseTable.JOB_STATUS,
+            primary_key_fields={"job_id": job_id},
+            skip_fields=["parameters", "checkpoint"],
+        )
+        if job_status_entry is None:
+            return False
+        return not job_status_entry.archived  # type: ignore[attr-defined]
+
+    def _fire_recurring_jobs(self) -> None:
+        now = dt.datetime.now()
+        # (Definition, fires, skips)
+        due: list[tuple[data.DatabaseEntry.RecurringJob, int, int]] = []
+        with self._lock:
+            self._recurring_timer = None
+            while self._recurring_heap and self._recurring_heap[0][0] <= now:
+                fire_time, _, name = heapq.heappop(self._recurring_heap)
+                recurring_job = (self._recurring_jobs or {}).get(name)
+                if recurring_job is None or recurring_job.next_fire_time != fire_time:
+                    continue
+
+                # Fire times missed while the server was down or busy
+                schedule = self._recurring_schedules[name]
+                fire_count = 1
+                next_fire_time = schedule.get_next_time(fire_time)
+                while next_fire_time <= now and fire_count < self._recurring_max_catch_up:
+                    fire_count += 1
+                    next_fire_time = schedule.get_next_time(next_fire_time)
+                if next_fire_time <= now:
+                    next_fire_time = schedule.get_next_time(now)
+                recurring_job.next_fire_time = next_fire_time
+
+                submit_count = (
+                    fire_count
+                    if recurring_job.misfire_policy == enums.MisfirePolicy.CATCH_UP
+                    else 1
+                )
+                if not recurring_job.allow_overlap:
+                    last_job_open = recurring_job.last_job_id is not None and self._is_job_open(
+                        recurring_job.last_job_id
+                    )
+                    submit_count = 0 if last_job_open else 1
+                due.append((recurring_job, submit_count, fire_count - submit_count))
+
+        for recurring_job, submit_count, skip_count in due:
+            if submit_count > 0:
+                try:
+                    job_ids = self.submit_jobs(
+                        template_name=recurring_job.template_name,
+                        parameter_sets=[json.loads(recurring_job.parameters)] * submit_count,
+                        client_token=recurring_job.client_token,
+                    )
+                    recurring_job.last_job_id = job_ids[-1]
+                except (KeyError, ValueError, scheduling.QueueFullError) as e:
+                    self._record_server_update(
+                        update_type=enums.ServerUpdateType.JOB,
+                        subtype=enums.ServerUpdateSubtype.Job.RECURRING_FAILED,
+                        comment=f"Recurring job {recurring_job.name} was not submitted: {e}",
+                    )
+            if skip_count > 0:
+                self._record_server_update(
+                    update_type=enums.ServerUpdateType.JOB,
+                    subtype=enums.ServerUpdateSubtype.Job.RECURRING_SKIPPED,
+                    comment=f"Recurring job {recurring_job.name} skipped {skip_count} fire times",
+                )
+
+        with self._lock:
+            for recurring_job, _, _ in due:
+                # Unless removed or replaced in the meantime
+                if (self._recurring_jobs or {}).get(recurring_job.name) is not recurring_job:
+                    continue
+                self.database.set_entry(
+                    entry=recurring_job,
+                    set_method=enums.SQLSetMethod.UPDATE,
+                )
+                self._push_recurring_job(recurring_job)
+            self._arm_recurring_timer()
+
+    def _on_job_closed(self, job: Job) -> None:
+        with self._lock:
+            self._release_job(job)
+
+            # Time successful runs, to estimate whether later deadlines can be met
+            closed_time = dt.datetime.now()
+            if (
+                job._start_time is not None
+                and job.job_result is not None
+                and job.job_result.return_code == enums.JobReturnCode.SUCCESS
+            ):
+                total_seconds, runs = self._run_durations.get(job.parameters.name, (0.0, 0))
+                self._run_durations[job.parameters.name] = (
+                    total_seconds + (closed_time - job._start_time).total_seconds(),
+                    runs + 1,
+                )
+            deadline = job.parameters.deadline
+            if deadline is not None and closed_time > deadline:
+                lateness = (closed_time - deadline).total_seconds()
+                job._update_state(
+                    enums.JobUpdateType.DEADLINE_MISSED,
+                    comment=f"Closed {lateness:.3f}s after its deadline",
+                )
+
+            # Cache the result for identical submissions
+            if (
+                job._cache_key is not None
+                and job.job_result is not None
+                and job.job_result.return_code == enums.JobReturnCode.SUCCESS
+            ):
+                self._result_cache.set(
+                    cache_key=job._cache_key,
+                    template_name=job.parameters.name,
+                    job_result=job.job_result,
+                )
+
+            # Release or cancel the jobs waiting on this one
+            ready_ids, cancelled_ids = self._dependencies.resolve(
+                job_id=job.job_id,  # type: ignore[arg-type]
+                succeeded=(
+                    job.job_result is not None
+                    and job.job_result.return_code == enums.JobReturnCode.SUCCESS
+                ),
+            )
+            for job_id in ready_ids:
+                self._enqueue(self._jobs[job_id])
+            for job_id in cancelled_ids:
+                self._jobs[job_id]._update_state(
+                    enums.JobUpdateType.STATE_CHANGE,
+                    comment=f"Upstream job {job.job_id} did not succeed",
+                )
+                self._jobs[job_id]._close(return_code=enums.JobReturnCode.CANCELLED)
+            self._jobs_closed.notify_all()
+        self._dispatch()
+
+    # endregion Private
+
+    # region Public
     def start(self) -> None:
-        # Start the job manager
-        # TODO: Implement
-        pass
+        # Start the job manager, picking up the jobs it left open
+        self._recover_jobs()
+        if self._fires_recurring_jobs:
+            self._load_recurring_jobs()
+        with self._lock:
+            self._started = True
+            if self._autoscaler is not None and self._autoscale_timer is None:
+                self._autoscale_timer = self._watchdog.schedule(
+                    delay=self._autoscale_interval,
+                    callback=self._autoscale,
+                )
+            self._arm_recurring_timer()
+        self._watchdog.start()
+        self._dispatch()
 
-    def add_job(self, job: Job) -> None:
-        # Add a job to the manager
-        # TODO: Implement
-        raise NotImplementedError()
+    def add_job(self, job: Job, depends_on: list[int] | None = None) -> None:
+        # Add a job to the manager. It is queued once every job in `depends_on` has closed
+        # successfully, and cancelled if any of them does not.
+        self._add_jobs(jobs=[job], depends_on=[depends_on or []])
+
+    def add_jobs(self, jobs: list[Job]) -> list[int]:
+        # Add several jobs at once, persisting them in a single transaction
+        return self._add_jobs(jobs=jobs, depends_on=[[] for _ in jobs])
+
+    def submit_jobs(
+        self,
+        template_name: str,
+        parameter_sets: list[dict],
+        client_token: str | None = None,
+    ) -> list[int]:
+        # Build jobs of an allowed type from raw parameters and add them all, or none of them
+        job_class = self._get_job_class(template_name)
+        jobs: list[Job] = []
+        invalid_parameter_sets: dict[int, str] = {}
+        for index, parameter_set in enumerate(parameter_sets):
+            try:
+                job = self._build_job(job_class=job_class, parameter_set=parameter_set)
+                job.client_token = client_token
+                jobs.append(job)
+            except (TypeError, ValueError, KeyError) as e:
+                invalid_parameter_sets[index] = f"{type(e).__name__}: {e}"
+
+        if invalid_parameter_sets:
+            raise ValueError(
+                f"Invalid parameters for {template_name}: "
+                + "; ".join(f"[{index}] {error}" for index, error in invalid_parameter_sets.items())
+            )
+        return self.add_jobs(jobs)
+
+    def add_recurring_job(
+        self,
+        name: str,
+        template_name: str,
+        parameters: dict | None = None,
+        cron: str | None = None,
+        interval: float | None = None,
+        misfire_policy: enums.MisfirePolicy = enums.MisfirePolicy.SKIP,
+        allow_overlap: bool = False,
+        client_token: str | None = None,
+    ) -> dict:
+        # Submit a job on a cron expression or every `interval` seconds, replacing any
+        # recurring job of the same name. Fire times missed while the server was down or
+        # the previous job was still open are handled by `misfire_policy` and `allow_overlap`.
+        self._build_job(
+            job_class=self._get_job_class(template_name), parameter_set=parameters or {}
+        )
+        schedule = self._get_schedule(cron=cron, interval=interval)
+        recurring_job = data.DatabaseEntry.RecurringJob(
+            name=name,
+            template_name=template_name,
+            parameters=json.dumps(parameters or {}),
+            cron=cron,
+            interval=interval,
+            misfire_policy=misfire_policy,
+            allow_overlap=allow_overlap,
+            client_token=client_token,
+            next_fire_time=schedule.get_next_time(dt.datetime.now()),
+        )
+        recurring_jobs = self._load_recurring_jobs()
+        with self._lock:
+            self.database.delete_entry(
+                table=enums.DatabaseTable.RECURRING_JOB,
+                primary_key_fields={"name": name},
+            )
+            self.database.set_entry(entry=recurring_job, set_method=enums.SQLSetMethod.INSERT)
+            recurring_jobs[name] = recurring_job
+            self._recurring_schedules[name] = schedule
+            self._push_recurring_job(recurring_job)
+        return dict(recurring_job.__dict__)
+
+    def remove_recurring_job(self, name: str) -> None:
+        recurring_jobs = self._load_recurring_jobs()
+        with self._lock:
+            if name not in recurring_jobs:
+                raise KeyError(f"No recurring job named {name}.")
+            del recurring_jobs[name]
+            del self._recurring_schedules[name]
+            self.database.delete_entry(
+                table=enums.DatabaseTable.RECURRING_JOB,
+                primary_key_fields={"name": name},
+            )
+
+    def get_recurring_jobs(self) -> list[dict]:
+        recurring_jobs = self._load_recurring_jobs()
+        with self._lock:
+            return [dict(recurring_job.__dict__) for recurring_job in recurring_jobs.values()]
 
-    def get_job(self, job_id: str) -> Job | None:
+    def get_job(self, job_id: int) -> Job | None:
         # Get a job by its ID
-        # TODO: Implement
-        raise NotImplementedError()
+        return self._jobs.get(job_id)
 
     def get_jobs(self) -> list[Job]:
         # Get all jobs managed by the manager
-        # TODO: Implement
-        raise NotImplementedError()
+        return list(self._jobs.values())
+
+    def load_job(self, job_status_entry: data.DatabaseEntry.JobStatus) -> Job:
+        # Rebuild a persisted job from its status row, without adding it to the manager.
+        # It continues from its last checkpoint.
+        if job_status_entry.template_name is None or job_status_entry.parameters is None:
+            raise ValueError(f"Job {job_status_entry.job_id} was persisted without parameters.")
+        job_factory: Callable[..., Job] = self._get_job_class(job_status_entry.template_name)
+        job = job_factory(job_parameters=pickle.loads(job_status_entry.parameters))
+        job._load_from_memory(job_status_entry)
+        return job
+
+    def get_template_names(self) -> list[str]:
+        # Get the names of the job templates this manager can run
+        return [job_class.__name__ for job_class in self._allowed_jobs]
+
+    def get_queue_stats(self) -> dict[str, dict[str, int | float]]:
+        # Get the depth and wait times of the run queue, per priority level
+        with self._lock:
+            return self._run_queue.get_stats()
+
+    def get_queue_length(self) -> int:
+        # Get how many jobs are waiting in the run queue
+        with self._lock:
+            return len(self._run_queue)
+
+    def get_cache_stats(self) -> dict[str, int]:
+        # Get the size and hit/miss counters of the result cache
+        return self._result_cache.get_stats()
+
+    def get_pool_stats(self) -> dict[str, dict[str, int]]:
+        # Get the limit, running and parked jobs of each concurrency pool
+        with self._lock:
+            return self._concurrency_pools.get_stats()
+
+    def get_thread_stats(self) -> dict[str, int]:
+        # Get the thread budget and how much of it is in use
+        with self._lock:
+            return self._admission.get_stats()
+
+    def get_client_usage(self) -> dict[str, dict[str, int | float]]:
+        # Get each client's fair-share weight, queued jobs and share of the thread budget
+        with self._lock:
+            usage = self._run_queue.get_client_stats()
+            for client_stats in usage.values():
+                client_stats["running_jobs"] = 0
+                client_stats["used_threads"] = 0
+            for job_id in self._admission.get_admitted_job_ids():
+                client_token = self._jobs[job_id].client_token
+                client_stats = usage.setdefault(
+                    client_token if client_token is not None else self._run_queue.ANONYMOUS_CLIENT,
+                    {"running_jobs": 0, "used_threads": 0},
+                )
+                client_stats["running_jobs"] += 1
+                client_stats["used_threads"] += self._admission.get_threads(job_id)
+            return usage
 
     def get_job_template(self, name: str) -> dict:
         # Get a job template by its name
@@ -133,10 +1726,70 @@ class JobManager:
         # TODO: Implement
         raise NotImplementedError()
 
-    def stop(self) -> None:
-        # Stop the job manager
-        # TODO: Implement
-        raise NotImplementedError()
+    def stop(self, wait: bool = False, timeout: float | None = None) -> None:
+        # Stop dispatching queued jobs, running jobs are left to finish
+        with self._lock:
+            self._started = False
+            if self._autoscale_timer is not None:
+                self._watchdog.cancel(self._autoscale_timer)
+                self._autoscale_timer = None
+            if self._recurring_timer is not None:
+                self._watchdog.cancel(self._recurring_timer)
+                self._recurring_timer = None
+            if wait:
+                self._jobs_closed.wait_for(
+                    lambda: self._admission.get_stats()["running_jobs"] == 0,
+                    timeout=timeout,
+                )
+            for backend in self._backends.values():
+                backend.shutdown()
+            self._backends = {}
+        self._watchdog.stop()
+
+    def pause_job(self, job_id: int) -> None:
+        # Pause a running job. It keeps its threads, unlike a preempted job.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"Job {job_id} does not exist.")
+            job._pause(comment="Requested by client")
+
+    def resume_job(self, job_id: int) -> None:
+        # Resume a job paused by `pause_job`. Preempted jobs are resumed by the scheduler.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"Job {job_id} does not exist.")
+            if job_id in self._preempted_job_ids:
+                raise structs.InvalidTransitionError(
+                    job.job_status,
+                    enums.JobStatus.RESUMING,
+                    reason="the job was preempted and resumes once threads are available.",
+                )
+            job._resume(comment="Requested by client")
+
+    def cancel_job(self, job_id: int) -> None:
+        # Cancel a job whether it is waiting, queued or running. Jobs waiting on it are
+        # cancelled too.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(f"Job {job_id} does not exist.")
+            was_pending = job.job_status == enums.JobStatus.PENDING
+            job._cancel()
+            if not was_pending:
+                return
+
+            # Pending jobs, including retries waiting on their backoff, are still waiting
+            # somewhere to start
+            self._run_queue.remove(job_id)
+            self._remove_queued_work(job_id)
+            self._dependencies.remove(job_id)
+            if job.template.concurrency_pool is not None:
+                self._concurrency_pools.remove(pool=job.template.concurrency_pool, job_id=job_id)
+            if job._on_closed is None:
+                # Closing only notifies the manager once the job has been run
+                self._on_job_closed(job)
 
     def pause_all_jobs(self) -> None:
         # Pause all jobs
@@ -144,9 +1797,137 @@ class JobManager:
         raise NotImplementedError()
 
     def update_available_threads(self, available_threads: int) -> None:
-        # Update the number of available threads for job processing
-        # TODO: Implement
-        raise NotImplementedError()
+        # Update the number of available threads for job processing. Running jobs are
+        # not restarted; a smaller budget is reached as they finish.
+        with self._lock:
+            self._admission.set_budget(available_threads)
+        self._dispatch()
+
+    # endregion Public
+
+
+class JobWorker:
+    """Runs jobs claimed from a database shared with other servers and workers.
+
+    Managers in shared-queue mode only persist the jobs submitted to them. Each
+    worker process claims those jobs with a lease, runs them on its own job manager
+    and keeps renewing the leases while they run. Leases of a crashed worker are
+    no longer renewed, so its jobs are claimed again once the leases expire.
+    """
+
+    # Data clients
+    config: data.ConfigClient
+    database: data.DatabaseClient
+
+    # Input
+    worker_id: str
+
+    # Internal
+    _job_manager: JobManager
+    _lease_duration: float
+    _poll_interval: float
+    _stopped: threading.Event
+    _thread: threading.Thread | None
+
+    def __init__(
+        self,
+        config: data.ConfigClient,
+        database: data.DatabaseClient,
+        allowed_jobs: list[type[Job]],
+        worker_id: str | None = None,
+    ) -> None:
+        self.config = config
+        self.database = database
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+        self._job_manager = JobManager(
+            config=config,
+            database=database,
+            allowed_jobs=allowed_jobs,
+            shared_queue=False,
+            lease_owner=self.worker_id,
+            fires_recurring_jobs=False,
+        )
+        self._lease_duration = float(
+            self.config.get(enums.ConfigValue.LEASE_DURATION.value) or 30.0
+        )
+        self._poll_interval = float(
+            self.config.get(enums.ConfigValue.WORKER_POLL_INTERVAL.value) or 0.5
+        )
+        self._stopped = threading.Event()
+        self._thread = None
+
+    # region Private
+    def _get_lease_expiry(self) -> dt.datetime:
+        return dt.datetime.now() + dt.timedelta(seconds=self._lease_duration)
+
+    def _get_open_job_ids(self) -> list[int]:
+        return [
+            job.job_id  # type: ignore[misc]
+            for job in self._job_manager.get_jobs()
+            if job.job_status != enums.JobStatus.CLOSED
+        ]
+
+    def _claim_jobs(self) -> None:
+        # Only claim while there are free threads, leaving the rest to other workers
+        template_names = self._job_manager.get_template_names()
+        while (
+            not self._stopped.is_set()
+            and self._job_manager.get_queue_length() == 0
+            and self._job_manager.get_thread_stats()["free_threads"] > 0
+        ):
+            job_status_entry = self.database.claim_job(
+                lease_owner=self.worker_id,
+                lease_expiry=self._get_lease_expiry(),
+                template_names=template_names,
+            )
+            if job_status_entry is None:
+                return
+
+            self._job_manager.add_job(self._job_manager.load_job(job_status_entry))
+
+    def _run(self) -> None:
+        last_renewal = time.monotonic()
+        while not self._stopped.is_set():
+            if time.monotonic() - last_renewal >= self._lease_duration / 3:
+                self.database.renew_leases(
+                    lease_owner=self.worker_id,
+                    job_ids=self._get_open_job_ids(),
+                    lease_expiry=self._get_lease_expiry(),
+                )
+                last_renewal = time.monotonic()
+            try:
+                self._claim_jobs()
+            except Exception:
+                traceback.print_exc()
+            self._stopped.wait(self._poll_interval)
+
+    # endregion Private
+
+    # region Public
+    def start(self) -> None:
+        # Start claiming jobs on a background thread
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._job_manager.start()
+        self._thread = threading.Thread(target=self._run, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        # Stop claiming, and wait for running jobs. Jobs still open after the timeout are
+        # handed back to be claimed by another worker.
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._job_manager.stop(wait=True, timeout=timeout)
+        self.database.release_leases(lease_owner=self.worker_id)
+
+    def get_job_manager(self) -> JobManager:
+        return self._job_manager
+
+    # endregion Public
 
 
 class JobServer:
@@ -176,7 +1957,11 @@ class JobServer:
         self._init_time = dt.datetime.now()
         self._router = self._get_router()
         self._app = None
-        self._job_manager = JobManager(config=config, database=database)
+        self._job_manager = JobManager(
+            config=config,
+            database=database,
+            allowed_jobs=allowed_jobs,
+        )
 
         if start_at_init:
             self.start()
@@ -203,17 +1988,24 @@ class JobServer:
         router.add_api_route("/status/", self.get_server_status, methods=["GET"])
         router.add_api_route("/server_updates", self.get_server_updates, methods=["GET"])
         router.add_api_route("/active_jobs", self.get_active_jobs, methods=["GET"])
+        router.add_api_route("/clients/usage", self.get_client_usage, methods=["GET"])
         router.add_api_route("/job_updates", self.get_job_updates, methods=["GET"])
 
         # Job Control
         router.add_api_route("/job/status/{job_id}", self.get_job_status, methods=["GET"])
         router.add_api_route("/job/submit/{job_id}", self.submit_job, methods=["POST"])
+        router.add_api_route("/jobs/submit/{template_name}", self.submit_jobs, methods=["POST"])
         router.add_api_route("/job/start/{job_id}", self.start_job, methods=["POST"])
         router.add_api_route("/job/pause/{job_id}", self.pause_job, methods=["POST"])
         router.add_api_route("/job/resume/{job_id}", self.resume_job, methods=["POST"])
         router.add_api_route("/job/cancel/{job_id}", self.cancel_job, methods=["POST"])
         router.add_api_route("/job/subscribe/{job_id}", self.subscribe_to_job, methods=["GET"])
 
+        # Recurring Jobs
+        router.add_api_route("/recurring_jobs", self.get_recurring_jobs, methods=["GET"])
+        router.add_api_route("/recurring_job/{name}", self.add_recurring_job, methods=["POST"])
+        router.add_api_route("/recurring_job/{name}", self.remove_recurring_job, methods=["DELETE"])
+
         return router
 
     def start(self):
@@ -221,6 +2013,47 @@ class JobServer:
         self._app.include_router(self._router)
         self._job_manager.start()
 
+    def _control_job(self, control: Callable[[int], None], job_id: str) -> dict:
+        # Unknown jobs are 404, and actions the job's status does not allow are 409
+        if not job_id.isdigit():
+            raise HTTPException(status_code=404, detail=f"Job {job_id} does not exist.")
+        try:
+            control(int(job_id))
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        except structs.InvalidTransitionError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        job = self._job_manager.get_job(int(job_id))
+        return {"job_id": int(job_id), "job_status": job.job_status.value}  # type: ignore[union-attr]
+
+    def _search_page(
+        self,
+        response: Response,
+        table: enums.DatabaseTable,
+        filters: list[data._Filter],
+        descending: bool,
+        items_per_page: int | None,
+        page: int,
+        cursor: str | None,
+    ) -> list[data._DatabaseEntry]:
+        # Pages are numbered from 1. A full page hands out the cursor of the next one in the
+        # Next-Cursor header, which stays as cheap to follow however deep the page is.
+        try:
+            database_entries = self.database.search_entries(
+                table=table,
+                filters=filters,
+                limit=items_per_page,
+                page=max(page - 1, 0),
+                descending=descending,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        database_entries = database_entries or []
+        if items_per_page is not None and 0 < items_per_page == len(database_entries):
+            response.headers["Next-Cursor"] = database_entries[-1].get_cursor()
+        return database_entries
+
     # region Public API
     async def empty_response(self) -> dict:
         return {}
@@ -241,12 +2074,14 @@ class JobServer:
 
     async def get_connections(
         self,
+        response: Response,
         client_ip: str | None = None,
         init_before: dt.datetime | None = None,  # Filter
         init_after: dt.datetime | None = None,  # Filter
         descending: bool = True,
         items_per_page: int | None = None,
         page: int = 1,
+        cursor: str | None = None,
     ) -> list[dict]:
         filters: list[data._Filter] = []
         if init_before is not None:
@@ -263,13 +2098,16 @@ class JobServer:
                     after_time=init_after,
                 )
             )
-        database_entries = self.database.search_entries(
+        database_entries = self._search_page(
+            response=response,
             table=enums.DatabaseTable.CONNECTION,
             filters=filters,
-            limit=items_per_page,
+            descending=descending,
+            items_per_page=items_per_page,
             page=page,
+            cursor=cursor,
         )
-        if database_entries is None or len(database_entries) < 1:
+        if len(database_entries) < 1:
             return [{}]
 
         connection_entries = []
@@ -298,6 +2136,7 @@ class JobServer:
 
     async def get_errors(
         self,
+        response: Response,
         before: dt.datetime | None = None,  # Filter
         after: dt.datetime | None = None,  # Filter
         severity_level: enums.ErrorSeverity | None = None,  # Filter
@@ -306,6 +2145,7 @@ class JobServer:
         descending: bool = True,
         items_per_page: int | None = None,
         page: int = 1,
+        cursor: str | None = None,
         include_traceback: bool = False,
     ) -> list[dict]:
         filters: list[data._Filter] = []
@@ -347,13 +2187,16 @@ class JobServer:
                     value=client_token,
                 )
             )
-        database_entries = self.database.search_entries(
+        database_entries = self._search_page(
+            response=response,
             table=enums.DatabaseTable.ERROR,
             filters=filters,
-            limit=items_per_page,
+            descending=descending,
+            items_per_page=items_per_page,
             page=page,
+            cursor=cursor,
         )
-        if database_entries is None or len(database_entries) < 1:
+        if len(database_entries) < 1:
             return [{}]
 
         error_entries = []
@@ -377,8 +2220,10 @@ class JobServer:
 
     async def get_active_jobs(
         self,
+        response: Response,
         items_per_page: int = 25,
         page: int = 1,
+        cursor: str | None = None,
     ) -> list[dict]:
         filters: list[data._Filter] = [
             data.Filter.Compare(
@@ -387,29 +2232,38 @@ class JobServer:
                 value=0,
             )
         ]
-        database_entries = self.database.search_entries(
+        database_entries = self._search_page(
+            response=response,
             table=enums.DatabaseTable.JOB_STATUS,
             filters=filters,
-            limit=items_per_page,
+            descending=False,
+            items_per_page=items_per_page,
             page=page,
+            cursor=cursor,
         )
-        if database_entries is None or len(database_entries) < 1:
+        if len(database_entries) < 1:
             return [{}]
 
         job_entries = []
         for database_entry in database_entries:
-            job_entries.append(data.DatabaseEntry.JobStatus(**database_entry.__dict__).__dict__)
+            # Pickled parameters and checkpoints are only for workers
+            job_entry = data.DatabaseEntry.JobStatus(**database_entry.__dict__).__dict__
+            job_entry.pop("parameters")
+            job_entry.pop("checkpoint")
+            job_entries.append(job_entry)
 
         return job_entries
 
     async def get_job_updates(
         self,
+        response: Response,
         job_id: str | None = None,  # Filter
         update_before: dt.datetime | None = None,  # Filter
         update_after: dt.datetime | None = None,  # Filter
         descending: bool = True,
         items_per_page: int | None = None,
         page: int = 1,
+        cursor: str | None = None,
     ) -> list[dict]:
         filters: list[data._Filter] = []
         if update_before is not None:
@@ -434,13 +2288,16 @@ class JobServer:
                     value=job_id,
                 )
             )
-        database_entries = self.database.search_entries(
+        database_entries = self._search_page(
+            response=response,
             table=enums.DatabaseTable.JOB_UPDATE,
             filters=filters,
-            limit=items_per_page,
+            descending=descending,
+            items_per_page=items_per_page,
             page=page,
+            cursor=cursor,
         )
-        if database_entries is None or len(database_entries) < 1:
+        if len(database_entries) < 1:
             return [{}]
 
         job_update_entries = []
@@ -453,11 +2310,13 @@ class JobServer:
 
     async def get_server_updates(
         self,
+        response: Response,
         update_before: dt.datetime | None = None,  # Filter
         update_after: dt.datetime | None = None,  # Filter
         descending: bool = True,
         items_per_page: int | None = None,
         page: int = 1,
+        cursor: str | None = None,
     ) -> list[dict]:
         filters: list[data._Filter] = []
         if update_before is not None:
@@ -475,13 +2334,16 @@ class JobServer:
                 )
             )
 
-        database_entries = self.database.search_entries(
+        database_entries = self._search_page(
+            response=response,
             table=enums.DatabaseTable.SERVER_UPDATE,
             filters=filters,
-            limit=items_per_page,
+            descending=descending,
+            items_per_page=items_per_page,
             page=page,
+            cursor=cursor,
         )
-        if database_entries is None or len(database_entries) < 1:
+        if len(database_entries) < 1:
             return [{}]
 
         server_update_entries = []
@@ -492,6 +2354,11 @@ class JobServer:
 
         return server_update_entries
 
+    async def get_client_usage(
+        self,
+    ) -> dict[str, dict]:
+        return self._job_manager.get_client_usage()
+
     async def get_job_status(
         self,
         job_id: str,
@@ -499,11 +2366,15 @@ class JobServer:
         job_status_entry = self.database.get_entry(
             table=enums.DatabaseTable.JOB_STATUS,
             primary_key_fields={"job_id": job_id},
+            skip_fields=["parameters", "checkpoint"],
         )
         if job_status_entry is None:
             return {}
 
-        return data.DatabaseEntry.JobStatus(**job_status_entry.__dict__).__dict__
+        job_entry = data.DatabaseEntry.JobStatus(**job_status_entry.__dict__).__dict__
+        job_entry.pop("parameters")
+        job_entry.pop("checkpoint")
+        return job_entry
 
     async def get_server_status(
         self,
@@ -520,6 +2391,30 @@ class JobServer:
     ) -> dict:
         raise NotImplementedError()
 
+    async def submit_jobs(
+        self,
+        template_name: str,
+        parameter_sets: list[dict] = Body(...),
+        client_token: str | None = None,
+    ) -> dict:
+        try:
+            job_ids = self._job_manager.submit_jobs(
+                template_name=template_name,
+                parameter_sets=parameter_sets,
+                client_token=client_token,
+            )
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        except scheduling.QueueFullError as e:
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        return {"job_ids": job_ids}
+
     async def start_job(
         self,
         job_id: str,
@@ -530,19 +2425,19 @@ class JobServer:
         self,
         job_id: str,
     ) -> dict:
-        raise NotImplementedError()
+        return self._control_job(self._job_manager.pause_job, job_id)
 
     async def resume_job(
         self,
         job_id: str,
     ) -> dict:
-        raise NotImplementedError
+        return self._control_job(self._job_manager.resume_job, job_id)
 
     async def cancel_job(
         self,
         job_id: str,
     ) -> dict:
-        raise NotImplementedError
+        return self._control_job(self._job_manager.cancel_job, job_id)
 
     async def subscribe_to_job(
         self,
@@ -550,6 +2445,48 @@ class JobServer:
     ) -> dict:
         raise NotImplementedError
 
+    async def get_recurring_jobs(
+        self,
+    ) -> list[dict]:
+        return self._job_manager.get_recurring_jobs()
+
+    async def add_recurring_job(
+        self,
+        name: str,
+        template_name: str,
+        parameters: dict = Body({}),
+        cron: str | None = None,
+        interval: float | None = None,
+        misfire_policy: enums.MisfirePolicy = enums.MisfirePolicy.SKIP,
+        allow_overlap: bool = False,
+        client_token: str | None = None,
+    ) -> dict:
+        try:
+            return self._job_manager.add_recurring_job(
+                name=name,
+                template_name=template_name,
+                parameters=parameters,
+                cron=cron,
+                interval=interval,
+                misfire_policy=misfire_policy,
+                allow_overlap=allow_overlap,
+                client_token=client_token,
+            )
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    async def remove_recurring_job(
+        self,
+        name: str,
+    ) -> dict:
+        try:
+            self._job_manager.remove_recurring_job(name)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        return {}
+
     # endregion Public API
 
 
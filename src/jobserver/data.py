@@ -1,13 +1,23 @@
 import os
 import json
+import base64
+import queue
+import pickle
 import shutil
 import sqlite3
+import hashlib
+import functools
+import itertools
+import threading
+import contextlib
 import datetime as dt
 import importlib.resources
 from enum import Enum
-from typing import Any
+from typing import Any, Callable, Iterator
 from pathlib import Path
+from collections import OrderedDict
 from . import enums
+from . import structs
 
 DEFAULT_CONFIG_FILE_PATH = Path(
     str(importlib.resources.files(__package__).joinpath("assets/default_config.json"))
@@ -115,8 +125,12 @@ class ConfigClient:
 
 class _Filter:
     def apply(self, *args, **kwargs) -> str:
+        # The condition, with a placeholder for each of `get_parameters`
         raise NotImplementedError()
 
+    def get_parameters(self) -> list[Any]:
+        return []
+
 
 class Filter:
     class Compare(_Filter):
@@ -136,7 +150,15 @@ class Filter:
             self.value = value
 
         def apply(self) -> str:
-            return f"{self.field_name} {self.operator.value} {self.value}"
+            # Values are bound, so the statement text is the same for any value
+            return f"{self.field_name} {self.operator.value} ?"
+
+        def get_parameters(self) -> list[Any]:
+            if isinstance(self.value, dt.datetime):
+                return [int(self.value.timestamp() * 1e6)]
+            elif isinstance(self.value, Enum):
+                return [self.value.value]
+            return [self.value]
 
     class Before(Compare):
         def __init__(self, time_field_name: str, before_time: dt.datetime):
@@ -161,6 +183,7 @@ class Filter:
 class _DatabaseEntry:
     _table: enums.DatabaseTable
     _primary_keys: list[str]
+    _order_by: list[str]  # Columns searches are sorted on, unique together and never null
 
     def __init__(self, *args, **kwargs) -> None:
         pass
@@ -224,11 +247,18 @@ class _DatabaseEntry:
     def get_primary_keys(self) -> list[str]:
         return self._primary_keys
 
+    def get_cursor(self) -> str:
+        # Opaque position of the entry in searches, to resume them right after it
+        fields = self.get_fields()
+        values = [fields[column] for column in self._order_by]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
 
 class DatabaseEntry:
     class Connection(_DatabaseEntry):
         _table = enums.DatabaseTable.CONNECTION
         _primary_keys = ["client_token"]
+        _order_by = ["init_time", "client_token"]
 
         client_token: str  # Primary key
         init_time: dt.datetime
@@ -264,6 +294,7 @@ class DatabaseEntry:
     class Error(_DatabaseEntry):
         _table = enums.DatabaseTable.ERROR
         _primary_keys = ["error_id"]
+        _order_by = ["error_time", "error_id"]
 
         error_id: int  # Primary key
         error_time: dt.datetime
@@ -310,20 +341,44 @@ class DatabaseEntry:
     class JobStatus(_DatabaseEntry):
         _table = enums.DatabaseTable.JOB_STATUS
         _primary_keys = ["job_id"]
+        _order_by = ["init_time", "job_id"]
 
         job_id: int  # Primary key
         init_time: dt.datetime
         archived: bool
+        template_name: str | None
+        parameters: bytes | None  # Pickled job parameters
+        priority: int | None
+        lease_owner: str | None  # Process running the job, NULL while it can be claimed
+        lease_expiry: dt.datetime | None  # NULL if the lease never expires
+        state_index: int | None  # State to resume from
+        checkpoint: bytes | None  # Pickled job checkpoint, taken after the previous state finished
 
         def __init__(
             self,
             job_id: int | str,
             init_time: dt.datetime | int | float | str,
             archived: bool,
+            template_name: str | None = None,
+            parameters: bytes | None = None,
+            priority: int | str | None = None,
+            lease_owner: str | None = None,
+            lease_expiry: dt.datetime | int | float | str | None = None,
+            state_index: int | str | None = None,
+            checkpoint: bytes | None = None,
         ) -> None:
             self.job_id = int(job_id)
             self.init_time = self._parse_timestamp(init_time)
             self.archived = archived
+            self.template_name = template_name
+            self.parameters = parameters
+            self.priority = int(priority) if priority is not None else None
+            self.lease_owner = lease_owner
+            self.lease_expiry = (
+                self._parse_timestamp(lease_expiry) if lease_expiry is not None else None
+            )
+            self.state_index = int(state_index) if state_index is not None else None
+            self.checkpoint = checkpoint
 
         def __eq__(self, value) -> bool:
             return self.job_id == value.job_id and self.init_time == value.init_time
@@ -331,6 +386,7 @@ class DatabaseEntry:
     class JobUpdate(_DatabaseEntry):
         _table = enums.DatabaseTable.JOB_UPDATE
         _primary_keys = ["job_id", "update_time"]
+        _order_by = ["update_time", "job_id"]
 
         job_id: int  # Primary key
         update_time: dt.datetime  # Primary key
@@ -368,6 +424,7 @@ class DatabaseEntry:
     class ServerUpdate(_DatabaseEntry):
         _table = enums.DatabaseTable.SERVER_UPDATE
         _primary_keys = ["update_time"]
+        _order_by = ["update_time"]
 
         update_time: dt.datetime  # Primary key
         type: int
@@ -402,15 +459,144 @@ class DatabaseEntry:
                 and self.client_token == value.client_token
             )
 
+    class JobResultCache(_DatabaseEntry):
+        _table = enums.DatabaseTable.JOB_RESULT_CACHE
+        _primary_keys = ["cache_key"]
+        _order_by = ["cache_key"]
+
+        cache_key: str  # Primary key
+        template_name: str
+        return_code: str
+        artifacts: bytes
+        created_time: dt.datetime
+        last_access_time: dt.datetime
+
+        def __init__(
+            self,
+            cache_key: str,
+            template_name: str,
+            return_code: str,
+            artifacts: bytes,
+            created_time: dt.datetime | int | float | str,
+            last_access_time: dt.datetime | int | float | str,
+        ) -> None:
+            self.cache_key = cache_key
+            self.template_name = template_name
+            self.return_code = return_code
+            self.artifacts = artifacts
+            self.created_time = self._parse_timestamp(created_time)
+            self.last_access_time = self._parse_timestamp(last_access_time)
+
+        def __eq__(self, value) -> bool:
+            return (
+                self.cache_key == value.cache_key
+                and self.template_name == value.template_name
+                and self.return_code == value.return_code
+                and self.artifacts == value.artifacts
+                and self.created_time == value.created_time
+                and self.last_access_time == value.last_access_time
+            )
+
+    class RecurringJob(_DatabaseEntry):
+        _table = enums.DatabaseTable.RECURRING_JOB
+        _primary_keys = ["name"]
+        _order_by = ["name"]
+
+        name: str  # Primary key
+        template_name: str
+        parameters: str  # JSON parameter set, as submitted to the job manager
+        cron: str | None  # Either a cron expression or an interval
+        interval: float | None  # Seconds
+        misfire_policy: enums.MisfirePolicy
+        allow_overlap: bool
+        client_token: str | None
+        next_fire_time: dt.datetime
+        last_job_id: int | None
+
+        def __init__(
+            self,
+            name: str,
+            template_name: str,
+            parameters: str,
+            cron: str | None,
+            interval: float | str | None,
+            misfire_policy: enums.MisfirePolicy | str,
+            allow_overlap: bool | int,
+            client_token: str | None,
+            next_fire_time: dt.datetime | int | float | str,
+            last_job_id: int | str | None = None,
+        ) -> None:
+            self.name = name
+            self.template_name = template_name
+            self.parameters = parameters
+            self.cron = cron
+            self.interval = float(interval) if interval is not None else None
+            self.misfire_policy = enums.MisfirePolicy(misfire_policy)
+            self.allow_overlap = bool(allow_overlap)
+            self.client_token = client_token
+            self.next_fire_time = self._parse_timestamp(next_fire_time)
+            self.last_job_id = int(last_job_id) if last_job_id is not None else None
+
+        def __eq__(self, value) -> bool:
+            return (
+                self.name == value.name
+                and self.template_name == value.template_name
+                and self.parameters == value.parameters
+                and self.cron == value.cron
+                and self.interval == value.interval
+                and self.misfire_policy == value.misfire_policy
+                and self.allow_overlap == value.allow_overlap
+                and self.client_token == value.client_token
+                and self.next_fire_time == value.next_fire_time
+                and self.last_job_id == value.last_job_id
+            )
+
 
+@functools.cache
 def get_database_entry_type(table: enums.DatabaseTable) -> type[_DatabaseEntry]:
     return getattr(DatabaseEntry, table.value)
 
 
 class DatabaseClient:
+    """Reads and writes the server's SQLite database.
+
+    The database is kept in WAL mode, so reads never wait on writes. All writes go
+    through a single connection, serialized by `_lock`, while reads borrow one of a
+    bounded pool of read-only connections, so concurrent requests read in parallel.
+
+    Unless durability is FULL, rows of the log tables inserted with `buffer_entry`
+    are written behind: a background thread commits them in batches every
+    `write_behind_interval` seconds, or once `write_behind_max_rows` are waiting.
+    Reads of those tables flush the buffer first, so they always see every row.
+    """
 
     config: ConfigClient
-    _db_connection: sqlite3.Connection
+    busy_timeout: float  # Seconds a connection waits on a locked database before failing
+    max_read_connections: int
+    statement_cache_size: int  # Prepared statements kept by each connection
+    durability: enums.WriteDurability
+    write_behind_interval: float
+    write_behind_max_rows: int
+
+    # Tables whose rows are only ever inserted, so they can be written behind
+    _buffered_tables = [
+        enums.DatabaseTable.JOB_UPDATE,
+        enums.DatabaseTable.SERVER_UPDATE,
+        enums.DatabaseTable.ERROR,
+    ]
+
+    _db_connection: sqlite3.Connection  # The only connection that writes
+    _lock: threading.RLock  # Serializes writes from request and job threads
+    _db_file_path: Path
+    _read_connections: list[sqlite3.Connection]  # Every read connection opened
+    _idle_read_connections: queue.LifoQueue  # Read connections free to borrow
+    _read_lock: threading.Lock
+    _statements: dict[tuple, tuple[str, list[str]]]  # Statement text and its columns, by shape
+    _pending_writes: list[tuple[str, list]]  # Buffered (query, parameters), in write order
+    _unflushed_rows: int  # Buffered rows not yet committed, including a flush in progress
+    _pending_condition: threading.Condition
+    _flush_thread: threading.Thread | None
+    _closing: bool
 
     def __init__(
         self,
@@ -418,6 +604,34 @@ class DatabaseClient:
         create_new_if_missing: bool = True,
     ) -> None:
         self.config = config
+        self.busy_timeout = float(
+            self.config.get(enums.ConfigValue.DATABASE_BUSY_TIMEOUT.value) or 5.0
+        )
+        self.max_read_connections = int(
+            self.config.get(enums.ConfigValue.DATABASE_READ_CONNECTIONS.value) or 4
+        )
+        self.statement_cache_size = int(
+            self.config.get(enums.ConfigValue.DATABASE_STATEMENT_CACHE_SIZE.value) or 512
+        )
+        self.durability = enums.WriteDurability[
+            self.config.get(enums.ConfigValue.DATABASE_DURABILITY.value) or "BATCHED"
+        ]
+        self.write_behind_interval = float(
+            self.config.get(enums.ConfigValue.WRITE_BEHIND_INTERVAL.value) or 0.1
+        )
+        self.write_behind_max_rows = int(
+            self.config.get(enums.ConfigValue.WRITE_BEHIND_MAX_ROWS.value) or 1000
+        )
+        self._lock = threading.RLock()
+        self._read_connections = []
+        self._idle_read_connections = queue.LifoQueue()
+        self._read_lock = threading.Lock()
+        self._statements = {}
+        self._pending_writes = []
+        self._unflushed_rows = 0
+        self._pending_condition = threading.Condition()
+        self._flush_thread = None
+        self._closing = False
         self._connect(create_new_if_missing=create_new_if_missing)
 
     def __del__(self):
@@ -487,7 +701,7 @@ class DatabaseClient:
             CONSTRAINT ServerUpdate_Connection_FK FOREIGN KEY (client_token) REFERENCES "Connection"(client_token)
         );
         """
-        self._db_connection = sqlite3.connect(db_file_path, check_same_thread=False)
+        self._open_write_connection(db_file_path)
         cursor = self._db_connection.cursor()
         cursor.execute(create_connection_table_query)
         cursor.execute(generate_error_table_query)
@@ -495,6 +709,187 @@ class DatabaseClient:
         cursor.execute(create_job_update_table_query)
         cursor.execute(create_server_update_table_query)
         self._db_connection.commit()
+        # The tables above are the original schema, every later change is a migration
+        self._migrate()
+
+    def _open_write_connection(self, db_file_path: Path) -> None:
+        # WAL mode is persisted in the file, so read connections opened later use it too
+        self._db_file_path = db_file_path
+        self._db_connection = sqlite3.connect(
+            db_file_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        self._db_connection.execute("PRAGMA journal_mode = WAL")
+        self._db_connection.execute(
+            "PRAGMA synchronous = NORMAL"
+            if self.durability == enums.WriteDurability.RELAXED
+            else "PRAGMA synchronous = FULL"
+        )
+
+    def _open_read_connection(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            f"{self._db_file_path.resolve().as_uri()}?mode=ro",
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            uri=True,
+        )
+        connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    @contextlib.contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        # Borrow an idle read connection, opening another while the pool has room, and
+        # otherwise wait for one to be handed back
+        try:
+            connection = self._idle_read_connections.get_nowait()
+        except queue.Empty:
+            with self._read_lock:
+                can_open = len(self._read_connections) < self.max_read_connections
+                if can_open:
+                    connection = self._open_read_connection()
+                    self._read_connections.append(connection)
+            if not can_open:
+                try:
+                    connection = self._idle_read_connections.get(timeout=self.busy_timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("No read connection became free in time.")
+        try:
+            yield connection
+        finally:
+            self._idle_read_connections.put(connection)
+
+    def _run_flusher(self) -> None:
+        # Flush every interval, or sooner when the buffer fills up
+        while True:
+            with self._pending_condition:
+                if not self._closing and len(self._pending_writes) < self.write_behind_max_rows:
+                    self._pending_condition.wait(timeout=self.write_behind_interval)
+                if self._closing:
+                    return
+            self.flush()
+
+    def _flush_before_read(self, table: enums.DatabaseTable) -> None:
+        if table in self._buffered_tables and self._unflushed_rows > 0:
+            self.flush()
+
+    def _get_migrations(self) -> list[Callable[[sqlite3.Cursor], None]]:
+        # Schema changes made after the original schema, in order. Only ever append: a file
+        # at version n has run the first n. Files from before versioning are at version 0,
+        # which is why the first migrations tolerate having already run.
+        return [
+            self._create_job_result_cache_table,
+            self._add_job_status_columns,
+            self._create_recurring_job_table,
+            self._create_search_indexes,
+        ]
+
+    def _migrate(self) -> None:
+        # Upgrade the file in place, one transaction per migration
+        migrations = self._get_migrations()
+        cursor = self._db_connection.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version > len(migrations):
+            raise ValueError(
+                f"Database schema version {version} is newer than the latest supported "
+                f"version {len(migrations)}."
+            )
+        for version, migration in enumerate(migrations[version:], start=version + 1):
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                self._db_connection.commit()
+            except sqlite3.Error as e:
+                self._db_connection.rollback()
+                raise e
+
+    def _decode_cursor(self, cursor: str, length: int) -> list[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            raise ValueError(f"Invalid search cursor: {cursor}")
+        if not isinstance(values, list) or len(values) != length:
+            raise ValueError(f"Invalid search cursor: {cursor}")
+        return values
+
+    def _create_job_result_cache_table(self, cursor: sqlite3.Cursor) -> None:
+        create_job_result_cache_table_query = """
+        CREATE TABLE IF NOT EXISTS JobResultCache (
+            cache_key TEXT NOT NULL,
+            template_name TEXT NOT NULL,
+            return_code TEXT NOT NULL,
+            artifacts BLOB NOT NULL,
+            created_time INTEGER NOT NULL,
+            last_access_time INTEGER NOT NULL,
+            CONSTRAINT JobResultCache_PK PRIMARY KEY (cache_key)
+        );
+        """
+        cursor.execute(create_job_result_cache_table_query)
+
+    def _create_recurring_job_table(self, cursor: sqlite3.Cursor) -> None:
+        create_recurring_job_table_query = """
+        CREATE TABLE IF NOT EXISTS RecurringJob (
+            name TEXT NOT NULL,
+            template_name TEXT NOT NULL,
+            parameters TEXT NOT NULL,
+            cron TEXT,
+            interval REAL,
+            misfire_policy TEXT NOT NULL,
+            allow_overlap INTEGER NOT NULL,
+            client_token TEXT,
+            next_fire_time INTEGER NOT NULL,
+            last_job_id INTEGER,
+            CONSTRAINT RecurringJob_PK PRIMARY KEY (name)
+        );
+        """
+        cursor.execute(create_recurring_job_table_query)
+
+    def _add_job_status_columns(self, cursor: sqlite3.Cursor) -> None:
+        added_columns = {
+            "template_name": "TEXT",
+            "parameters": "BLOB",
+            "priority": "INTEGER",
+            "lease_owner": "TEXT",
+            "lease_expiry": "INTEGER",
+            "state_index": "INTEGER",
+            "checkpoint": "BLOB",
+        }
+        # Only open jobs are indexed, so finding them stays fast however many are archived
+        create_open_job_index_query = """
+        CREATE INDEX IF NOT EXISTS JobStatus_Open_IX ON JobStatus (lease_owner)
+        WHERE archived = 0
+        """
+        existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(JobStatus)")}
+        for column, column_type in added_columns.items():
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE JobStatus ADD COLUMN {column} {column_type}")
+        cursor.execute(create_open_job_index_query)
+
+    def _create_search_indexes(self, cursor: sqlite3.Cursor) -> None:
+        # Columns the API filters and sorts on, beyond the primary keys. Indexes on a sort
+        # column cover the full sort order of searches, so a cursor seeks to its page.
+        create_index_queries = [
+            "CREATE INDEX IF NOT EXISTS JobUpdate_Order_IX ON JobUpdate (update_time, job_id)",
+            "CREATE INDEX IF NOT EXISTS Error_Order_IX ON Error (error_time, error_id)",
+            "CREATE INDEX IF NOT EXISTS Error_JobID_IX ON Error (job_id)",
+            """
+            CREATE INDEX IF NOT EXISTS JobStatus_Archived_Order_IX
+            ON JobStatus (archived, init_time, job_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS Connection_Order_IX
+            ON "Connection" (init_time, client_token)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS Connection_LastMessageTime_IX
+            ON "Connection" (last_message_time)
+            """,
+        ]
+        for create_index_query in create_index_queries:
+            cursor.execute(create_index_query)
 
     def _connect(
         self,
@@ -506,7 +901,8 @@ class DatabaseClient:
             db_file_path = Path(_db_path)
             if db_file_path.exists():
                 # Connect to existing database
-                self._db_connection = sqlite3.connect(db_file_path, check_same_thread=False)
+                self._open_write_connection(db_file_path)
+                self._migrate()
             elif create_new_if_missing:
                 # Create a new database file
                 self._create_new_database_file()
@@ -523,19 +919,33 @@ class DatabaseClient:
 
     # region Public
     def disconnect(self) -> None:
-        self._db_connection.close()
-
-    def set_entry(
+        # Buffered rows are written before the connections close
+        with self._pending_condition:
+            self._closing = True
+            flush_thread, self._flush_thread = self._flush_thread, None
+            self._pending_condition.notify_all()
+        if flush_thread is not None:
+            flush_thread.join()
+        self.flush()
+        with self._read_lock:
+            for connection in self._read_connections:
+                connection.close()
+            self._read_connections = []
+            self._idle_read_connections = queue.LifoQueue()
+        with self._lock:
+            self._db_connection.close()
+
+    def _get_set_query(
         self,
         entry: _DatabaseEntry,
         set_method: enums.SQLSetMethod,
-    ) -> None:
-        entries = entry.get_fields()
-        columns = list(entries.keys())
-        values = list(entries.values())
-
+    ) -> tuple[str, list[str]]:
+        # Returns the query, and the order its parameters are taken from the entry's fields
+        columns = list(entry.get_fields().keys())
+        statement_key = ("set", entry.get_table(), set_method, tuple(columns))
+        if statement_key in self._statements:
+            return self._statements[statement_key]
         primary_keys = entry.get_primary_keys()
-
         table_name = entry.get_table().value
 
         match set_method:
@@ -545,12 +955,15 @@ class DatabaseClient:
                     ", ".join(columns),
                     ", ".join("?" * len(columns)),
                 )
+                parameter_columns = columns
             case enums.SQLSetMethod.UPDATE:
+                value_columns = [column for column in columns if column not in primary_keys]
                 query = "UPDATE {} SET {} WHERE {}".format(
                     table_name,
-                    ", ".join(f"{column} = ?" for column in columns if column not in primary_keys),
+                    ", ".join(f"{column} = ?" for column in value_columns),
                     " AND ".join(f"{column} = ?" for column in primary_keys),
                 )
+                parameter_columns = value_columns + primary_keys
             case enums.SQLSetMethod.UPSERT:
                 query = "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}".format(
                     table_name,
@@ -563,11 +976,128 @@ class DatabaseClient:
                         if column not in primary_keys
                     ),
                 )
+                parameter_columns = columns
+
+        self._statements[statement_key] = (query, parameter_columns)
+        return query, parameter_columns
+
+    def set_entry(
+        self,
+        entry: _DatabaseEntry,
+        set_method: enums.SQLSetMethod,
+    ) -> None:
+        query, parameter_columns = self._get_set_query(entry=entry, set_method=set_method)
+        fields = entry.get_fields()
 
         # Execute the query and commit the changes
-        cursor = self._db_connection.cursor()
-        cursor.execute(query, values)
-        self._db_connection.commit()
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(query, [fields[column] for column in parameter_columns])
+            self._db_connection.commit()
+
+    def set_entries(
+        self,
+        entries: list[_DatabaseEntry],
+        set_method: enums.SQLSetMethod,
+    ) -> None:
+        """Set several entries of one table in a single transaction."""
+        if len(entries) < 1:
+            return
+        query, parameter_columns = self._get_set_query(entry=entries[0], set_method=set_method)
+
+        rows = []
+        for entry in entries:
+            fields = entry.get_fields()
+            if entry.get_table() != entries[0].get_table() or fields.keys() != set(
+                parameter_columns
+            ):
+                raise ValueError("All entries must be from the same table and set the same fields.")
+            rows.append([fields[column] for column in parameter_columns])
+
+        # Execute the query for every entry, then commit once
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            try:
+                cursor.executemany(query, rows)
+                self._db_connection.commit()
+            except sqlite3.Error as e:
+                self._db_connection.rollback()
+                raise e
+
+    def buffer_entry(self, entry: _DatabaseEntry) -> None:
+        """Insert a log row in the background, batched with other buffered rows."""
+        if entry.get_table() not in self._buffered_tables:
+            raise ValueError(f"Rows of {entry.get_table().value} cannot be written behind.")
+        if self.durability == enums.WriteDurability.FULL:
+            self.set_entry(entry=entry, set_method=enums.SQLSetMethod.INSERT)
+            return
+
+        query, parameter_columns = self._get_set_query(
+            entry=entry, set_method=enums.SQLSetMethod.INSERT
+        )
+        fields = entry.get_fields()
+        with self._pending_condition:
+            if self._closing:
+                raise sqlite3.ProgrammingError("Cannot write to a disconnected database.")
+            self._pending_writes.append((query, [fields[column] for column in parameter_columns]))
+            self._unflushed_rows += 1
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(
+                    target=self._run_flusher,
+                    name="database-write-behind",
+                    daemon=True,
+                )
+                self._flush_thread.start()
+            if len(self._pending_writes) >= self.write_behind_max_rows:
+                self._pending_condition.notify_all()
+
+    def flush(self) -> None:
+        """Write every buffered row now, one transaction for the whole batch."""
+        # The write lock is taken first, so concurrent flushes commit in buffer order
+        with self._lock:
+            with self._pending_condition:
+                pending_writes, self._pending_writes = self._pending_writes, []
+            if len(pending_writes) < 1:
+                return
+            cursor = self._db_connection.cursor()
+            try:
+                for query, writes in itertools.groupby(pending_writes, key=lambda write: write[0]):
+                    cursor.executemany(query, [parameters for _, parameters in writes])
+                self._db_connection.commit()
+            except sqlite3.Error:
+                # Write row by row, so one bad row does not lose the rest of the batch
+                self._db_connection.rollback()
+                for query, parameters in pending_writes:
+                    try:
+                        cursor.execute(query, parameters)
+                    except sqlite3.Error as e:
+                        print(f"Error writing buffered entry: {e}")
+                self._db_connection.commit()
+            finally:
+                with self._pending_condition:
+                    self._unflushed_rows -= len(pending_writes)
+
+    def delete_entry(
+        self,
+        table: enums.DatabaseTable,
+        primary_key_fields: dict[str, str | int | float],
+    ) -> None:
+        statement_key = ("delete", table, tuple(primary_key_fields.keys()))
+        if statement_key not in self._statements:
+            self._statements[statement_key] = (
+                "DELETE FROM {} WHERE {}".format(
+                    table.value,
+                    " AND ".join(f"{key} = ?" for key in primary_key_fields.keys()),
+                ),
+                [],
+            )
+        query, _ = self._statements[statement_key]
+
+        # Execute the query and commit the changes
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(query, list(primary_key_fields.values()))
+            self._db_connection.commit()
 
     def get_entry(
         self,
@@ -577,23 +1107,32 @@ class DatabaseClient:
     ) -> _DatabaseEntry | None:
         database_entry_type = get_database_entry_type(table=table)
         table = database_entry_type._table
-        columns = {_ for _ in database_entry_type.__annotations__.keys()}
-
-        for field in skip_fields:
-            columns.remove(field)
-
-        query = "SELECT {} FROM {} WHERE {}".format(
-            ", ".join(columns),
-            table.value,
-            " AND ".join(f"{key} = ?" for key in primary_key_fields.keys()),
-        )
+        self._flush_before_read(table)
+
+        statement_key = ("get", table, tuple(primary_key_fields.keys()), tuple(skip_fields))
+        if statement_key not in self._statements:
+            selected_columns = [
+                column
+                for column in database_entry_type.__annotations__.keys()
+                if column not in skip_fields
+            ]
+            self._statements[statement_key] = (
+                "SELECT {} FROM {} WHERE {}".format(
+                    ", ".join(selected_columns),
+                    table.value,
+                    " AND ".join(f"{key} = ?" for key in primary_key_fields.keys()),
+                ),
+                selected_columns,
+            )
+        query, columns = self._statements[statement_key]
 
         try:
-            cursor = self._db_connection.cursor()
-            cursor.execute(query, list(primary_key_fields.values()))
+            with self._read_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, list(primary_key_fields.values()))
+                row = cursor.fetchone()
 
             kwargs = {}
-            row = cursor.fetchone()
             if row is None:
                 return None
 
@@ -611,40 +1150,288 @@ class DatabaseClient:
         filters: list[_Filter] = [],
         limit: int | None = None,
         page: int | None = None,
+        descending: bool = False,
+        cursor: str | None = None,
         *args,
         **kwargs,
     ) -> list[_DatabaseEntry] | None:
-        conditions = [filter.apply() for filter in filters]
-        parameters = []
+        """Search a table, sorted on its entries' `_order_by` columns.
 
-        query = f"SELECT * FROM {table.value}"
-        if len(conditions) > 0:
-            query += " WHERE "
-        query += " AND ".join(conditions)
+        Pass the `get_cursor` of the last entry of a page to get the page after it. Unlike
+        `page`, which skips every earlier row, a cursor seeks straight to the next one.
+        """
+        self._flush_before_read(table)
+        database_entry_type = get_database_entry_type(table=table)
+        order_by = database_entry_type._order_by
+        conditions = [filter.apply() for filter in filters]
+        parameters = [parameter for filter in filters for parameter in filter.get_parameters()]
+        if cursor is not None:
+            # Rows after the cursor, compared on all the sort columns at once
+            conditions.append(
+                "({}) {} ({})".format(
+                    ", ".join(order_by),
+                    "<" if descending else ">",
+                    ", ".join("?" * len(order_by)),
+                )
+            )
+            parameters += self._decode_cursor(cursor=cursor, length=len(order_by))
+
+        statement_key = ("search", table, tuple(conditions), descending, limit is not None)
+        if statement_key not in self._statements:
+            query = f"SELECT * FROM {table.value}"
+            if len(conditions) > 0:
+                query += " WHERE "
+            query += " AND ".join(conditions)
+            query += " ORDER BY " + ", ".join(
+                f"{column} DESC" if descending else column for column in order_by
+            )
+            if limit is not None:
+                query += " LIMIT ? OFFSET ?"
+            self._statements[statement_key] = (query, [])
+        query, _ = self._statements[statement_key]
 
         if limit is not None:
-            # Set the page limit
-            query += " LIMIT ?"
-            parameters.append(limit)
-
-            # Set the page offset
-            if page is None:
+            # Set the page limit and offset. A cursor already starts at the right row.
+            if page is None or cursor is not None:
                 page = 0
-            offset = page * limit
-            query += " OFFSET ?"
-            parameters.append(offset)
+            parameters += [limit, page * limit]
 
-        cursor = self._db_connection.cursor()
-        query_result = cursor.execute(query, parameters)
+        with self._read_connection() as connection:
+            db_cursor = connection.cursor()
+            rows = db_cursor.execute(query, parameters).fetchall()
+            column_names = [_[0] for _ in db_cursor.description]
 
         retrieved_entries = []
-        for row in query_result.fetchall():
+        for row in rows:
             if row is None:
                 break
-            kwargs = {key: value for key, value in zip([_[0] for _ in cursor.description], row)}
-            database_entry = get_database_entry_type(table=table)(**kwargs)
+            kwargs = {key: value for key, value in zip(column_names, row)}
+            database_entry = database_entry_type(**kwargs)
             retrieved_entries.append(database_entry)
 
         return retrieved_entries
 
+    def claim_job(
+        self,
+        lease_owner: str,
+        lease_expiry: dt.datetime,
+        template_names: list[str],
+    ) -> "DatabaseEntry.JobStatus | None":
+        """Atomically lease the next unclaimed job, or a job whose lease has expired."""
+        if len(template_names) < 1:
+            return None
+        now = int(dt.datetime.now().timestamp() * 1e6)
+        query = """
+        UPDATE JobStatus SET lease_owner = ?, lease_expiry = ?
+        WHERE job_id = (
+            SELECT job_id FROM JobStatus
+            WHERE archived = 0
+                AND template_name IN ({})
+                AND (lease_owner IS NULL OR lease_expiry < ?)
+            ORDER BY priority DESC, init_time
+            LIMIT 1
+        )
+        RETURNING *
+        """.format(", ".join("?" * len(template_names)))
+
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            try:
+                row = cursor.execute(
+                    query,
+                    [lease_owner, int(lease_expiry.timestamp() * 1e6), *template_names, now],
+                ).fetchone()
+                column_names = [_[0] for _ in cursor.description]
+                self._db_connection.commit()
+            except sqlite3.Error as e:
+                self._db_connection.rollback()
+                raise e
+        if row is None:
+            return None
+        return DatabaseEntry.JobStatus(**dict(zip(column_names, row)))
+
+    def renew_leases(
+        self,
+        lease_owner: str,
+        job_ids: list[int],
+        lease_expiry: dt.datetime,
+    ) -> None:
+        if len(job_ids) < 1:
+            return
+        query = "UPDATE JobStatus SET lease_expiry = ? WHERE lease_owner = ? AND job_id IN ({})"
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(
+                query.format(", ".join("?" * len(job_ids))),
+                [int(lease_expiry.timestamp() * 1e6), lease_owner, *job_ids],
+            )
+            self._db_connection.commit()
+
+    def release_leases(self, lease_owner: str) -> None:
+        """Hand the open jobs of a lease owner back to be claimed."""
+        query = """
+        UPDATE JobStatus SET lease_owner = NULL, lease_expiry = NULL
+        WHERE lease_owner = ? AND archived = 0
+        """
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(query, [lease_owner])
+            self._db_connection.commit()
+
+    def get_open_jobs(self, lease_owner: str) -> list["DatabaseEntry.JobStatus"]:
+        """Get the unarchived jobs leased to an owner."""
+        query = "SELECT * FROM JobStatus WHERE archived = 0 AND lease_owner = ?"
+        with self._read_connection() as connection:
+            cursor = connection.cursor()
+            rows = cursor.execute(query, [lease_owner]).fetchall()
+            column_names = [_[0] for _ in cursor.description]
+        return [DatabaseEntry.JobStatus(**dict(zip(column_names, row))) for row in rows]
+
+    def set_checkpoint(self, job_id: int, state_index: int, checkpoint: bytes) -> None:
+        query = "UPDATE JobStatus SET state_index = ?, checkpoint = ? WHERE job_id = ?"
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(query, [state_index, checkpoint, job_id])
+            self._db_connection.commit()
+
+    def archive_job(self, job_id: int) -> None:
+        """Mark a job as closed, ending its lease."""
+        query = """
+        UPDATE JobStatus SET archived = 1, lease_owner = NULL, lease_expiry = NULL
+        WHERE job_id = ?
+        """
+        with self._lock:
+            cursor = self._db_connection.cursor()
+            cursor.execute(query, [job_id])
+            self._db_connection.commit()
+
     # endregion Public
+
+
+class ResultCache:
+    """Persistent cache of successful job results, keyed on template name and parameters.
+
+    Entries live in the JobResultCache table, with an in-memory LRU index so
+    misses never touch the database. The least recently used entries are evicted
+    past `max_entries`, and entries older than `ttl` seconds are treated as misses.
+    """
+
+    database: DatabaseClient
+    max_entries: int
+    ttl: float | None
+
+    _index: OrderedDict[str, dt.datetime]  # Cache key -> created time, least recent first
+    _lock: threading.Lock
+    _hits: int
+    _misses: int
+    _evictions: int
+
+    def __init__(
+        self,
+        database: DatabaseClient,
+        max_entries: int = 1024,
+        ttl: float | None = None,
+    ) -> None:
+        self.database = database
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._index = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        # Rebuild the LRU order from the persisted access times
+        entries = self.database.search_entries(table=enums.DatabaseTable.JOB_RESULT_CACHE) or []
+        entries.sort(key=lambda entry: entry.last_access_time)  # type: ignore[attr-defined]
+        for entry in entries:
+            self._index[entry.cache_key] = entry.created_time  # type: ignore[attr-defined]
+        self._evict()
+
+    def _delete(self, cache_key: str) -> None:
+        self._index.pop(cache_key, None)
+        self.database.delete_entry(
+            table=enums.DatabaseTable.JOB_RESULT_CACHE,
+            primary_key_fields={"cache_key": cache_key},
+        )
+        self._evictions += 1
+
+    def _evict(self) -> None:
+        # Evict the least recently used entries past the size limit
+        while len(self._index) > self.max_entries:
+            self._delete(next(iter(self._index)))
+
+    @staticmethod
+    def get_cache_key(template_name: str, parameters: structs.JobParameters) -> str:
+        # Hash the template name and the parameters that define the job's output
+        fields = {
+            key: value.name if isinstance(value, Enum) else value
+            for key, value in sorted(vars(parameters).items())
+            if key not in parameters._scheduling_fields
+        }
+        payload = json.dumps([template_name, fields], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, cache_key: str) -> structs.JobResult | None:
+        with self._lock:
+            created_time = self._index.get(cache_key)
+            if created_time is None:
+                self._misses += 1
+                return None
+            if (
+                self.ttl is not None
+                and (dt.datetime.now() - created_time).total_seconds() > self.ttl
+            ):
+                self._delete(cache_key)
+                self._misses += 1
+                return None
+
+            entry = self.database.get_entry(
+                table=enums.DatabaseTable.JOB_RESULT_CACHE,
+                primary_key_fields={"cache_key": cache_key},
+            )
+            if entry is None:
+                self._index.pop(cache_key)
+                self._misses += 1
+                return None
+
+            # Mark as most recently used
+            self._index.move_to_end(cache_key)
+            entry.last_access_time = dt.datetime.now()  # type: ignore[attr-defined]
+            self.database.set_entry(entry=entry, set_method=enums.SQLSetMethod.UPDATE)
+            self._hits += 1
+            return structs.JobResult(
+                return_code=enums.JobReturnCode(entry.return_code),  # type: ignore[attr-defined]
+                artifacts=pickle.loads(entry.artifacts),  # type: ignore[attr-defined]
+            )
+
+    def set(self, cache_key: str, template_name: str, job_result: structs.JobResult) -> None:
+        now = dt.datetime.now()
+        with self._lock:
+            self.database.set_entry(
+                entry=DatabaseEntry.JobResultCache(
+                    cache_key=cache_key,
+                    template_name=template_name,
+                    return_code=job_result.return_code.value,
+                    artifacts=pickle.dumps(job_result.artifacts),
+                    created_time=now,
+                    last_access_time=now,
+                ),
+                set_method=enums.SQLSetMethod.UPSERT,
+            )
+            self._index[cache_key] = now
+            self._index.move_to_end(cache_key)
+            self._evict()
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -17,6 +17,7 @@ class ErrorCode(Enum):
     INPUT_FILE_INVALID = 3
     OUTPUT_FILE_MISSING = 4
     OUTPUT_FILE_INVALID = 5
+    TIMEOUT = 6
 
 
 class JobPriority(Enum):
@@ -37,6 +38,28 @@ class JobStatus(Enum):
     CLOSED = "Closed"
 
 
+class WriteDurability(Enum):
+    FULL = "Full"  # Every write is committed and synced before returning
+    BATCHED = "Batched"  # Log rows are written behind in batches, each synced
+    RELAXED = "Relaxed"  # As batched, but WAL commits are only synced at checkpoints
+
+
+class SchedulingPolicy(Enum):
+    PRIORITY = "Priority"
+    DEADLINE = "Deadline"
+
+
+class MisfirePolicy(Enum):
+    SKIP = "Skip"  # Missed fire times are coalesced into one job
+    CATCH_UP = "Catch up"  # One job per missed fire time
+
+
+class ExecutionBackend(Enum):
+    THREAD = "Thread"
+    PROCESS = "Process"
+    ASYNCIO = "Asyncio"
+
+
 class JobReturnCode(Enum):
     SUCCESS = "Success"
     FAILED = "Failed"
@@ -50,6 +73,7 @@ class JobUpdateType(Enum):
     WARNING = 2
     ERROR = 3
     WEBHOOK_OPENED = 4
+    DEADLINE_MISSED = 5
 
 
 class ServerUpdateType(Enum):
@@ -59,6 +83,7 @@ class ServerUpdateType(Enum):
     JOB = 3
     ARTIFACT = 4
     CLIENT = 5
+    SCALING = 6
 
 
 class ServerUpdateSubtype:
@@ -80,12 +105,20 @@ class ServerUpdateSubtype:
         STAGE_ERROR = 1
         PROCESS_ERROR = 2
         COMMAND_TIMEOUT = 3
+        RECOVERED = 4
+        RECURRING_SKIPPED = 5
+        RECURRING_FAILED = 6
 
     class Artifact:
         UNKNOWN = 0
         FILE_MISSING = 1
         FILE_INVALID = 2
 
+    class Scaling:
+        UNKNOWN = 0
+        SCALE_UP = 1
+        SCALE_DOWN = 2
+
 
 class ConfigValue(Enum):
     # Paths
@@ -93,6 +126,37 @@ class ConfigValue(Enum):
     DATABASE_PATH = "database_path"
 
     # Preferences
+    AVAILABLE_THREADS = "available_threads"
+    AUTOSCALE_MIN_THREADS = "autoscale_min_threads"
+    AUTOSCALE_MAX_THREADS = "autoscale_max_threads"
+    AUTOSCALE_INTERVAL = "autoscale_interval"
+    AUTOSCALE_COOLDOWN = "autoscale_cooldown"
+    AUTOSCALE_MAX_CPU_UTILISATION = "autoscale_max_cpu_utilisation"
+    AUTOSCALE_MAX_LOOP_LAG = "autoscale_max_loop_lag"
+    ADMISSION_LOOKAHEAD = "admission_lookahead"
+    ADMISSION_BACKFILL_LIMIT = "admission_backfill_limit"
+    PROCESS_POOL_WORKERS = "process_pool_workers"
+    RESULT_CACHE_MAX_ENTRIES = "result_cache_max_entries"
+    RESULT_CACHE_TTL = "result_cache_ttl"
+    JOB_AGING_INTERVAL = "job_aging_interval"
+    MAX_QUEUE_DEPTHS = "max_queue_depths"
+    MAX_RETRY_AFTER = "max_retry_after"
+    PREEMPTION_PRIORITY = "preemption_priority"
+    SCHEDULING_POLICY = "scheduling_policy"
+    WATCHDOG_TICK_INTERVAL = "watchdog_tick_interval"
+    FAIR_SHARE_QUANTUM = "fair_share_quantum"
+    CLIENT_WEIGHTS = "client_weights"
+    DEFAULT_CLIENT_WEIGHT = "default_client_weight"
+    SHARED_QUEUE = "shared_queue"
+    LEASE_DURATION = "lease_duration"
+    WORKER_POLL_INTERVAL = "worker_poll_interval"
+    RECURRING_MAX_CATCH_UP = "recurring_max_catch_up"
+    DATABASE_READ_CONNECTIONS = "database_read_connections"
+    DATABASE_BUSY_TIMEOUT = "database_busy_timeout"
+    DATABASE_STATEMENT_CACHE_SIZE = "database_statement_cache_size"
+    DATABASE_DURABILITY = "database_durability"
+    WRITE_BEHIND_INTERVAL = "write_behind_interval"
+    WRITE_BEHIND_MAX_ROWS = "write_behind_max_rows"
 
 
 class DatabaseTable(Enum):
@@ -101,6 +165,8 @@ class DatabaseTable(Enum):
     JOB_STATUS = "JobStatus"
     JOB_UPDATE = "JobUpdate"
     SERVER_UPDATE = "ServerUpdate"
+    JOB_RESULT_CACHE = "JobResultCache"
+    RECURRING_JOB = "RecurringJob"
 
 
 class SQLSetMethod(Enum):
@@ -0,0 +1,299 @@
+import os
+import time
+import asyncio
+import inspect
+import threading
+import concurrent.futures
+from typing import Any, Callable
+
+
+def _start_state(state_class: type, name: str, job_id: str) -> tuple[bool, float]:
+    # Runs in a worker process, so the state is rebuilt there from its class. The CPU
+    # time is sent back, as the server cannot measure it from its own process.
+    cpu_time = time.process_time()
+    state = state_class(name=name, job_id=job_id)
+    result = bool(state.start())
+    return result, time.process_time() - cpu_time
+
+
+def _map_state_partition(
+    state_class: type, name: str, job_id: str, partition: Any
+) -> tuple[Any, float]:
+    # Runs in a worker process, like `_start_state`
+    cpu_time = time.process_time()
+    state = state_class(name=name, job_id=job_id)
+    result = state.map(partition)
+    return result, time.process_time() - cpu_time
+
+
+def _get_completed_future(result: bool) -> concurrent.futures.Future:
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+class ExecutionBackend:
+    """Runs the `start` of job states, reporting the outcome through a future."""
+
+    def run_state(self, state: Any) -> concurrent.futures.Future:
+        raise NotImplementedError()
+
+    def map_partition(self, state: Any, partition: Any) -> concurrent.futures.Future:
+        raise NotImplementedError()
+
+    def _run_parallel_state(self, state: Any, future: concurrent.futures.Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(
+                state.run_partitions(lambda partition: self.map_partition(state, partition))
+            )
+        except BaseException as e:
+            future.set_exception(e)
+
+    def run_parallel_state(self, state: Any) -> concurrent.futures.Future:
+        # Partitions are mapped on the backend, coordinated from a thread of the server
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._run_parallel_state,
+            args=(state, future),
+            name=f"job-{state.job_id}-{state.name}",
+            daemon=True,
+        )
+        thread.start()
+        return future
+
+    def control_state(self, state: Any, action: str) -> concurrent.futures.Future:
+        # Call the state's pause, resume or cancel hook
+        try:
+            return _get_completed_future(bool(getattr(state, action)()))
+        except Exception as e:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.set_exception(e)
+            return future
+
+    def get_cpu_seconds(self) -> float:
+        # CPU time used by states outside of the server process
+        return 0.0
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ThreadBackend(ExecutionBackend):
+    """Runs each state on its own thread inside the server process."""
+
+    def _run(self, target: Callable[[], Any], future: concurrent.futures.Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(target())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def run_state(self, state: Any) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._run,
+            args=(lambda: bool(state.start()), future),
+            name=f"job-{state.job_id}-{state.name}",
+            daemon=True,
+        )
+        thread.start()
+        return future
+
+    def map_partition(self, state: Any, partition: Any) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._run,
+            args=(lambda: state.map(partition), future),
+            name=f"job-{state.job_id}-{state.name}-partition",
+            daemon=True,
+        )
+        thread.start()
+        return future
+
+
+class ProcessBackend(ExecutionBackend):
+    """Runs each state in a pool of worker processes, outside of the server's GIL.
+
+    Only the state class, name and job ID are sent to the worker, so state classes
+    must be importable by module path and should not rely on in-process attributes.
+    """
+
+    max_workers: int
+
+    _executor: concurrent.futures.ProcessPoolExecutor | None
+    _lock: threading.Lock
+    _cpu_seconds: float
+    _parallel_states: set[Any]  # Coordinated from this process, so their hooks can be called
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cpu_seconds = 0.0
+        self._parallel_states = set()
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        # The pool is started on first use, so servers without CPU-bound jobs never pay for it
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers
+                )
+            return self._executor
+
+    def _on_worker_finished(
+        self,
+        worker_future: concurrent.futures.Future,
+        future: concurrent.futures.Future,
+    ) -> None:
+        try:
+            result, cpu_seconds = worker_future.result()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._cpu_seconds += cpu_seconds
+        future.set_result(result)
+
+    def run_state(self, state: Any) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        worker_future = self._get_executor().submit(
+            _start_state, type(state), state.name, state.job_id
+        )
+        worker_future.add_done_callback(
+            lambda worker_future: self._on_worker_finished(worker_future, future)
+        )
+        return future
+
+    def map_partition(self, state: Any, partition: Any) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        worker_future = self._get_executor().submit(
+            _map_state_partition, type(state), state.name, state.job_id, partition
+        )
+        worker_future.add_done_callback(
+            lambda worker_future: self._on_worker_finished(worker_future, future)
+        )
+        return future
+
+    def run_parallel_state(self, state: Any) -> concurrent.futures.Future:
+        with self._lock:
+            self._parallel_states.add(state)
+        future = super().run_parallel_state(state)
+        future.add_done_callback(lambda _: self._on_parallel_state_finished(state))
+        return future
+
+    def _on_parallel_state_finished(self, state: Any) -> None:
+        with self._lock:
+            self._parallel_states.discard(state)
+
+    def get_cpu_seconds(self) -> float:
+        # Only counts states that have finished
+        with self._lock:
+            return self._cpu_seconds
+
+    def control_state(self, state: Any, action: str) -> concurrent.futures.Future:
+        # The running state lives in another process, so it cannot be reached. Parallel
+        # states only map their partitions there.
+        with self._lock:
+            is_parallel_state = state in self._parallel_states
+        if is_parallel_state:
+            return super().control_state(state, action)
+        return _get_completed_future(False)
+
+    def shutdown(self) -> None:
+        # Submitted states still run to completion
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class AsyncioBackend(ExecutionBackend):
+    """Runs coroutine states on a single event loop, on a dedicated thread.
+
+    Every state of an asyncio job shares one thread, so many I/O-bound jobs can
+    wait concurrently without a thread each. A heartbeat on the loop measures
+    how late it wakes up, which shows when states block the loop.
+    """
+
+    heartbeat_interval: float
+
+    _loop: asyncio.AbstractEventLoop | None
+    _lock: threading.Lock
+    _heartbeat: concurrent.futures.Future | None
+    _loop_lag: float
+
+    def __init__(self, heartbeat_interval: float = 0.1) -> None:
+        self.heartbeat_interval = heartbeat_interval
+        self._loop = None
+        self._lock = threading.Lock()
+        self._heartbeat = None
+        self._loop_lag = 0.0
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        # The loop thread is started on first use
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(self._loop,),
+                    name="job-event-loop",
+                    daemon=True,
+                )
+                thread.start()
+                self._heartbeat = asyncio.run_coroutine_threadsafe(self._measure_lag(), self._loop)
+            return self._loop
+
+    async def _measure_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_time = loop.time() + self.heartbeat_interval
+            await asyncio.sleep(self.heartbeat_interval)
+            self._loop_lag = max(self._loop_lag, loop.time() - expected_time)
+
+    def get_loop_lag(self) -> float:
+        # Most seconds a heartbeat woke up late since the last call
+        loop_lag, self._loop_lag = self._loop_lag, 0.0
+        return loop_lag
+
+    def _run_coroutine(self, state: Any, method_name: str) -> concurrent.futures.Future:
+        method = getattr(state, method_name)
+        if not inspect.iscoroutinefunction(method):
+            raise TypeError(
+                f"{type(state).__name__}.{method_name} must be a coroutine "
+                "to run on the event loop."
+            )
+        return asyncio.run_coroutine_threadsafe(method(), self._get_loop())
+
+    def run_state(self, state: Any) -> concurrent.futures.Future:
+        return self._run_coroutine(state=state, method_name="start")
+
+    def control_state(self, state: Any, action: str) -> concurrent.futures.Future:
+        return self._run_coroutine(state=state, method_name=action)
+
+    async def _drain(self, heartbeat: concurrent.futures.Future | None) -> None:
+        # Let running states finish, then stop the loop
+        if heartbeat is not None:
+            heartbeat.cancel()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.get_running_loop().stop()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(self._drain(self._heartbeat), self._loop)
+                self._loop = None
+                self._heartbeat = None
+                self._loop_lag = 0.0
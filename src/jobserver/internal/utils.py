@@ -1,3 +1,5 @@
+import threading
+import datetime as dt
 from typing import Any
 from pathlib import Path
 
@@ -7,4 +9,32 @@ def get_answer():
     return True
 
 
+def get_timestamp(time: dt.datetime | None = None) -> int:
+    """Get a timestamp in microseconds, the format times are stored in the database."""
+    if time is None:
+        time = dt.datetime.now()
+    return int(time.timestamp() * 1e6)
+
+
+class UniqueTimestampGenerator:
+    """Generates strictly increasing microsecond timestamps.
+
+    Used for primary keys that are timestamps, where two calls landing on the
+    same microsecond would otherwise collide.
+    """
+
+    _last_timestamp: int
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self._last_timestamp = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            timestamp = max(get_timestamp(), self._last_timestamp + 1)
+            self._last_timestamp = timestamp
+            return timestamp
+
+
 # def get_config_value(key:str) -> Any:
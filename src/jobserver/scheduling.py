@@ -0,0 +1,1029 @@
+import math
+import time
+import heapq
+import itertools
+import threading
+import traceback
+import datetime as dt
+from . import enums
+from . import structs
+from typing import Callable
+from collections import deque
+
+
+class QueueFullError(Exception):
+    """Raised when a submission would take a priority level past its queue depth limit."""
+
+    priority: enums.JobPriority
+    retry_after: int
+
+    def __init__(self, priority: enums.JobPriority, retry_after: int) -> None:
+        super().__init__(f"The {priority.name} queue is full, retry after {retry_after} seconds.")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class RunQueue:
+    """Priority heap of pending job IDs.
+
+    Jobs are keyed on a virtual start time: their init time, moved earlier by
+    `aging_interval` seconds for every priority level above VERY_LOW. A waiting
+    job therefore overtakes newer submissions one priority level higher for
+    every `aging_interval` it has waited, so a steady stream of high priority
+    jobs cannot starve low priority ones, and keys never need to be recomputed.
+
+    Under the DEADLINE policy, jobs with a deadline come first, earliest
+    deadline first, followed by the jobs without one in aged priority order.
+    """
+
+    aging_interval: float
+    drain_rate_window: float
+    policy: enums.SchedulingPolicy
+
+    _heap: list[list]
+    _entries: dict[int, list]
+    _counter: itertools.count
+    _depths: dict[enums.JobPriority, int]
+    _wait_totals: dict[enums.JobPriority, float]
+    _wait_maximums: dict[enums.JobPriority, float]
+    _dequeued: dict[enums.JobPriority, int]
+    _dequeue_times: deque[float]
+
+    def __init__(
+        self,
+        aging_interval: float = 30.0,
+        drain_rate_window: float = 60.0,
+        policy: enums.SchedulingPolicy = enums.SchedulingPolicy.PRIORITY,
+    ) -> None:
+        self.aging_interval = aging_interval
+        self.drain_rate_window = drain_rate_window
+        self.policy = policy
+
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._depths = {priority: 0 for priority in enums.JobPriority}
+        self._wait_totals = {priority: 0.0 for priority in enums.JobPriority}
+        self._wait_maximums = {priority: 0.0 for priority in enums.JobPriority}
+        self._dequeued = {priority: 0 for priority in enums.JobPriority}
+        self._dequeue_times = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._entries
+
+    def _get_key(
+        self,
+        priority: enums.JobPriority,
+        init_time: dt.datetime,
+        deadline: dt.datetime | None,
+    ) -> tuple[int, float]:
+        if self.policy == enums.SchedulingPolicy.DEADLINE and deadline is not None:
+            return (0, deadline.timestamp())
+        levels = priority.value - enums.JobPriority.VERY_LOW.value
+        return (1, init_time.timestamp() - levels * self.aging_interval)
+
+    def _discard_removed(self) -> None:
+        # Drop lazily removed entries from the top of the heap
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+
+    def push(
+        self,
+        job_id: int,
+        priority: enums.JobPriority,
+        init_time: dt.datetime,
+        deadline: dt.datetime | None = None,
+    ) -> None:
+        if job_id in self._entries:
+            raise ValueError(f"Job {job_id} is already queued.")
+
+        # Entry layout: [key, tiebreaker, priority, enqueue time, job ID]
+        entry = [
+            self._get_key(priority=priority, init_time=init_time, deadline=deadline),
+            next(self._counter),
+            priority,
+            dt.datetime.now(),
+            job_id,
+        ]
+        self._entries[job_id] = entry
+        self._depths[priority] += 1
+        heapq.heappush(self._heap, entry)
+
+    def peek(self) -> int | None:
+        self._discard_removed()
+        if not self._heap:
+            return None
+        return self._heap[0][-1]
+
+    def pop(self) -> int | None:
+        return self.pop_first(predicate=lambda job_id: True)
+
+    def find_first(
+        self,
+        predicate: Callable[[int], bool],
+        lookahead: int | None = None,
+    ) -> int | None:
+        # Find the first job, in queue order, that satisfies the predicate, without
+        # dequeuing it. At most `lookahead` jobs are inspected.
+        inspected: list[list] = []
+        found: list | None = None
+        try:
+            while lookahead is None or len(inspected) < lookahead:
+                self._discard_removed()
+                if not self._heap:
+                    break
+                entry = heapq.heappop(self._heap)
+                inspected.append(entry)
+                if predicate(entry[-1]):
+                    found = entry
+                    break
+        finally:
+            for entry in inspected:
+                heapq.heappush(self._heap, entry)
+        return found[-1] if found is not None else None
+
+    def pop_first(
+        self,
+        predicate: Callable[[int], bool],
+        lookahead: int | None = None,
+    ) -> int | None:
+        # Pop the first job, in queue order, that satisfies the predicate. At most
+        # `lookahead` jobs are inspected; skipped jobs keep their place in the queue.
+        job_id = self.find_first(predicate=predicate, lookahead=lookahead)
+        if job_id is None:
+            return None
+        self.dequeue(job_id)
+        return job_id
+
+    def dequeue(self, job_id: int) -> None:
+        # Take a queued job out to run it, recording how long it waited
+        entry = self._entries.pop(job_id)
+        _, _, priority, enqueue_time, _ = entry
+        self._depths[priority] -= 1
+        entry[-1] = None
+
+        wait_time = (dt.datetime.now() - enqueue_time).total_seconds()
+        self._dequeued[priority] += 1
+        self._wait_totals[priority] += wait_time
+        self._wait_maximums[priority] = max(self._wait_maximums[priority], wait_time)
+        self._dequeue_times.append(time.monotonic())
+        self._discard_old_dequeue_times()
+
+    def _discard_old_dequeue_times(self) -> None:
+        cutoff = time.monotonic() - self.drain_rate_window
+        while self._dequeue_times and self._dequeue_times[0] < cutoff:
+            self._dequeue_times.popleft()
+
+    def get_key(self, job_id: int) -> tuple[int, float]:
+        return self._entries[job_id][0]
+
+    def get_depth(self, priority: enums.JobPriority) -> int:
+        return self._depths[priority]
+
+    def get_drain_rate(self) -> float:
+        # Jobs dequeued per second, over the last `drain_rate_window` seconds
+        self._discard_old_dequeue_times()
+        return len(self._dequeue_times) / self.drain_rate_window
+
+    def remove(self, job_id: int) -> bool:
+        # Mark the entry as removed, it is dropped once it reaches the top of the heap
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return False
+        self._depths[entry[2]] -= 1
+        entry[-1] = None
+        return True
+
+    def get_stats(self) -> dict[str, dict[str, int | float]]:
+        stats: dict[str, dict[str, int | float]] = {}
+        for priority in enums.JobPriority:
+            dequeued = self._dequeued[priority]
+            stats[priority.name] = {
+                "depth": self._depths[priority],
+                "dequeued": dequeued,
+                "mean_wait_seconds": self._wait_totals[priority] / dequeued if dequeued else 0.0,
+                "max_wait_seconds": self._wait_maximums[priority],
+            }
+        return stats
+
+
+class FairShareQueue:
+    """Run queue split into one sub-queue per client, served by deficit round-robin.
+
+    Each client with queued jobs takes turns at the front of a rotation. A
+    client's job is dequeued when its deficit covers the job's cost, its thread
+    count; otherwise the client is credited `quantum` times its weight and the
+    turn passes on. Over time every client is served in proportion to its
+    weight, however many jobs it has queued. Within a client, jobs are ordered
+    by their aged priority or deadline, as in `RunQueue`.
+    """
+
+    aging_interval: float
+    drain_rate_window: float
+    policy: enums.SchedulingPolicy
+    quantum: float
+    weights: dict[str, float]
+    default_weight: float
+
+    _queues: dict[str, RunQueue]
+    _active: deque[str]  # Clients with queued jobs, in turn order
+    _deficits: dict[str, float]
+    _entries: dict[int, tuple[str, int]]  # Job ID -> (client token, cost)
+    _dequeued_costs: dict[str, int]
+
+    ANONYMOUS_CLIENT = ""
+
+    def __init__(
+        self,
+        aging_interval: float = 30.0,
+        drain_rate_window: float = 60.0,
+        policy: enums.SchedulingPolicy = enums.SchedulingPolicy.PRIORITY,
+        quantum: float = 1.0,
+        weights: dict[str, float] | None = None,
+        default_weight: float = 1.0,
+    ) -> None:
+        if quantum <= 0:
+            raise ValueError("The fair share quantum must be positive.")
+        weights = weights or {}
+        if default_weight <= 0 or any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Client weights must be positive.")
+        self.aging_interval = aging_interval
+        self.drain_rate_window = drain_rate_window
+        self.policy = policy
+        self.quantum = quantum
+        self.weights = weights
+        self.default_weight = default_weight
+
+        self._queues = {}
+        self._active = deque()
+        self._deficits = {}
+        self._entries = {}
+        self._dequeued_costs = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._entries
+
+    def get_weight(self, client_token: str) -> float:
+        return self.weights.get(client_token, self.default_weight)
+
+    def _get_queue(self, client_token: str) -> RunQueue:
+        if client_token not in self._queues:
+            self._queues[client_token] = RunQueue(
+                aging_interval=self.aging_interval,
+                drain_rate_window=self.drain_rate_window,
+                policy=self.policy,
+            )
+            self._deficits[client_token] = 0.0
+            self._dequeued_costs[client_token] = 0
+        return self._queues[client_token]
+
+    def _on_taken(self, job_id: int) -> None:
+        # Clients leave the rotation, and forfeit their deficit, once they have nothing queued
+        client_token, _ = self._entries.pop(job_id)
+        if not self._queues[client_token]:
+            self._active.remove(client_token)
+            self._deficits[client_token] = 0.0
+
+    def push(
+        self,
+        job_id: int,
+        priority: enums.JobPriority,
+        init_time: dt.datetime,
+        deadline: dt.datetime | None = None,
+        client_token: str | None = None,
+        cost: int = 1,
+    ) -> None:
+        if job_id in self._entries:
+            raise ValueError(f"Job {job_id} is already queued.")
+        client_token = client_token if client_token is not None else self.ANONYMOUS_CLIENT
+        queue = self._get_queue(client_token)
+        queue.push(job_id=job_id, priority=priority, init_time=init_time, deadline=deadline)
+        self._entries[job_id] = (client_token, max(1, cost))
+        if client_token not in self._active:
+            self._active.append(client_token)
+
+    def get_key(self, job_id: int) -> tuple[int, float]:
+        return self._queues[self._entries[job_id][0]].get_key(job_id)
+
+    def get_job_ids(self) -> list[int]:
+        return list(self._entries.keys())
+
+    def peek(self) -> int | None:
+        # The job with the earliest key across all clients
+        head_ids = [
+            job_id
+            for job_id in (queue.peek() for queue in self._queues.values())
+            if job_id is not None
+        ]
+        if not head_ids:
+            return None
+        return min(head_ids, key=self.get_key)
+
+    def pop(self) -> int | None:
+        return self.pop_first(predicate=lambda job_id: True)
+
+    def pop_first(
+        self,
+        predicate: Callable[[int], bool],
+        lookahead: int | None = None,
+    ) -> int | None:
+        # Pop the next job in deficit round-robin order that satisfies the predicate.
+        # The predicate is evaluated at most once per client, with `lookahead` jobs
+        # inspected in each client's queue.
+        candidates: dict[str, int | None] = {}
+        while True:
+            any_candidate = False
+            for _ in range(len(self._active)):
+                client_token = self._active[0]
+                if client_token not in candidates:
+                    candidates[client_token] = self._queues[client_token].find_first(
+                        predicate=predicate,
+                        lookahead=lookahead,
+                    )
+                job_id = candidates[client_token]
+                if job_id is not None:
+                    any_candidate = True
+                    _, cost = self._entries[job_id]
+                    if self._deficits[client_token] >= cost:
+                        # The client keeps its turn while its deficit lasts
+                        self._deficits[client_token] -= cost
+                        self._dequeued_costs[client_token] += cost
+                        self._queues[client_token].dequeue(job_id)
+                        self._on_taken(job_id)
+                        return job_id
+                    self._deficits[client_token] += self.quantum * self.get_weight(client_token)
+                self._active.rotate(-1)
+            if not any_candidate:
+                return None
+
+    def remove(self, job_id: int) -> bool:
+        if job_id not in self._entries:
+            return False
+        client_token, _ = self._entries[job_id]
+        self._queues[client_token].remove(job_id)
+        self._on_taken(job_id)
+        return True
+
+    def get_depth(self, priority: enums.JobPriority) -> int:
+        return sum(queue.get_depth(priority) for queue in self._queues.values())
+
+    def get_drain_rate(self) -> float:
+        return sum(queue.get_drain_rate() for queue in self._queues.values())
+
+    def get_stats(self) -> dict[str, dict[str, int | float]]:
+        # Per priority level stats, combined across clients
+        stats: dict[str, dict[str, int | float]] = {
+            priority.name: {
+                "depth": 0,
+                "dequeued": 0,
+                "mean_wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            }
+            for priority in enums.JobPriority
+        }
+        for queue in self._queues.values():
+            for name, queue_stats in queue.get_stats().items():
+                combined = stats[name]
+                dequeued = combined["dequeued"] + queue_stats["dequeued"]
+                if dequeued:
+                    combined["mean_wait_seconds"] = (
+                        combined["mean_wait_seconds"] * combined["dequeued"]
+                        + queue_stats["mean_wait_seconds"] * queue_stats["dequeued"]
+                    ) / dequeued
+                combined["dequeued"] = dequeued
+                combined["depth"] += queue_stats["depth"]
+                combined["max_wait_seconds"] = max(
+                    combined["max_wait_seconds"], queue_stats["max_wait_seconds"]
+                )
+        return stats
+
+    def get_client_stats(self) -> dict[str, dict[str, int | float]]:
+        return {
+            client_token: {
+                "weight": self.get_weight(client_token),
+                "deficit": self._deficits[client_token],
+                "queued_jobs": len(queue),
+                "dequeued_jobs": sum(
+                    queue_stats["dequeued"] for queue_stats in queue.get_stats().values()
+                ),
+                "dequeued_threads": self._dequeued_costs[client_token],
+            }
+            for client_token, queue in self._queues.items()
+        }
+
+
+class AdmissionController:
+    """Packs running jobs into the available thread budget.
+
+    Jobs are admitted when their `max_threads` fit in the free part of the
+    budget, so narrow jobs can fill the gaps around a wide one. The first wide
+    job that does not fit gets a reservation: once `backfill_limit` other jobs
+    have been admitted past it, nothing else is admitted until it fits.
+    """
+
+    budget: int
+    backfill_limit: int
+
+    _allocations: dict[int, int]
+    _used_threads: int
+    _reserved_job_id: int | None
+    _backfills: int
+
+    def __init__(self, budget: int, backfill_limit: int = 16) -> None:
+        if budget < 1:
+            raise ValueError("The thread budget must be at least one thread.")
+        self.budget = budget
+        self.backfill_limit = backfill_limit
+
+        self._allocations = {}
+        self._used_threads = 0
+        self._reserved_job_id = None
+        self._backfills = 0
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._allocations
+
+    def _get_threads(self, max_threads: int) -> int:
+        # Jobs wider than the whole budget run alone, on the whole budget
+        return max(1, min(max_threads, self.budget))
+
+    def get_free_threads(self) -> int:
+        # May be zero while running jobs drain after the budget shrinks
+        return max(0, self.budget - self._used_threads)
+
+    def set_budget(self, budget: int) -> None:
+        # Running jobs keep their threads, the new budget applies to future admissions
+        if budget < 1:
+            raise ValueError("The thread budget must be at least one thread.")
+        self.budget = budget
+
+    def fits(self, max_threads: int) -> bool:
+        return self._get_threads(max_threads) <= self.get_free_threads()
+
+    def can_admit(self, job_id: int, max_threads: int) -> bool:
+        threads = self._get_threads(max_threads)
+        backfill_allowed = (
+            self._reserved_job_id is None
+            or self._reserved_job_id == job_id
+            or self._backfills < self.backfill_limit
+        )
+        if threads <= self.get_free_threads() and backfill_allowed:
+            return True
+
+        if self._reserved_job_id is None and threads > self.get_free_threads():
+            self._reserved_job_id = job_id
+            self._backfills = 0
+        return False
+
+    def admit(self, job_id: int, max_threads: int) -> int:
+        if job_id in self._allocations:
+            raise ValueError(f"Job {job_id} has already been admitted.")
+        threads = self._get_threads(max_threads)
+        self._allocations[job_id] = threads
+        self._used_threads += threads
+
+        if self._reserved_job_id == job_id:
+            self._reserved_job_id = None
+        elif self._reserved_job_id is not None:
+            self._backfills += 1
+        return threads
+
+    def get_threads(self, job_id: int) -> int:
+        return self._allocations.get(job_id, 0)
+
+    def get_admitted_job_ids(self) -> list[int]:
+        return list(self._allocations.keys())
+
+    def release(self, job_id: int) -> None:
+        self._used_threads -= self._allocations.pop(job_id, 0)
+        if self._reserved_job_id == job_id:
+            self._reserved_job_id = None
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "budget": self.budget,
+            "used_threads": self._used_threads,
+            "free_threads": self.get_free_threads(),
+            "running_jobs": len(self._allocations),
+        }
+
+
+class DependencyGraph:
+    """Tracks jobs waiting on upstream jobs.
+
+    Only unresolved edges are stored: each waiting job keeps a count of the
+    upstream jobs it still waits on, and each upstream job keeps the list of
+    jobs waiting on it, so resolving a completion costs O(out-degree).
+    """
+
+    _indegrees: dict[int, int]
+    _dependents: dict[int, list[int]]
+    _priorities: dict[int, enums.JobPriority]  # Waiting job -> its priority
+    _depths: dict[enums.JobPriority, int]
+
+    def __init__(self) -> None:
+        self._indegrees = {}
+        self._dependents = {}
+        self._priorities = {}
+        self._depths = {priority: 0 for priority in enums.JobPriority}
+
+    def __len__(self) -> int:
+        return len(self._indegrees)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._indegrees
+
+    def add(
+        self,
+        job_id: int,
+        depends_on: list[int],
+        priority: enums.JobPriority = enums.JobPriority.NORMAL,
+    ) -> bool:
+        # Returns True if the job has nothing to wait on. Upstream jobs must still be open.
+        if job_id in self._indegrees:
+            raise ValueError(f"Job {job_id} is already waiting on dependencies.")
+        upstream_ids = set(depends_on)
+        if job_id in upstream_ids:
+            raise ValueError(f"Job {job_id} cannot depend on itself.")
+        if not upstream_ids:
+            return True
+
+        self._indegrees[job_id] = len(upstream_ids)
+        self._priorities[job_id] = priority
+        self._depths[priority] += 1
+        for upstream_id in upstream_ids:
+            self._dependents.setdefault(upstream_id, []).append(job_id)
+        return False
+
+    def remove(self, job_id: int) -> bool:
+        # Stop waiting on upstream jobs. Their stale edges are skipped when they resolve.
+        if self._indegrees.pop(job_id, None) is None:
+            return False
+        self._depths[self._priorities.pop(job_id)] -= 1
+        return True
+
+    def get_depth(self, priority: enums.JobPriority) -> int:
+        return self._depths[priority]
+
+    def resolve(self, job_id: int, succeeded: bool) -> tuple[list[int], list[int]]:
+        # Returns the jobs that became ready, and the jobs cancelled because an
+        # upstream job (directly or transitively) did not succeed
+        ready: list[int] = []
+        cancelled: list[int] = []
+        if succeeded:
+            for dependent_id in self._dependents.pop(job_id, []):
+                if dependent_id not in self._indegrees:
+                    continue
+                if self._indegrees[dependent_id] == 1:
+                    self.remove(dependent_id)
+                    ready.append(dependent_id)
+                else:
+                    self._indegrees[dependent_id] -= 1
+            return ready, cancelled
+
+        failed_ids = [job_id]
+        while failed_ids:
+            for dependent_id in self._dependents.pop(failed_ids.pop(), []):
+                if self.remove(dependent_id):
+                    cancelled.append(dependent_id)
+                    failed_ids.append(dependent_id)
+        return ready, cancelled
+
+
+class ConcurrencyPools:
+    """Caps how many jobs from each named pool run at once.
+
+    Jobs whose pool is full are parked in a per-pool queue instead of staying at
+    the head of the run queue, so jobs from other pools keep flowing past them.
+    Parked jobs are handed back one at a time as jobs from their pool finish.
+    """
+
+    aging_interval: float
+    policy: enums.SchedulingPolicy
+
+    _limits: dict[str, int]
+    _running: dict[str, int]
+    _parked: dict[str, RunQueue]
+
+    def __init__(
+        self,
+        aging_interval: float = 30.0,
+        policy: enums.SchedulingPolicy = enums.SchedulingPolicy.PRIORITY,
+    ) -> None:
+        self.aging_interval = aging_interval
+        self.policy = policy
+        self._limits = {}
+        self._running = {}
+        self._parked = {}
+
+    def _register(self, pool: structs.ConcurrencyPool) -> None:
+        if pool.name not in self._limits:
+            self._limits[pool.name] = pool.max_jobs
+            self._running[pool.name] = 0
+            self._parked[pool.name] = RunQueue(
+                aging_interval=self.aging_interval,
+                policy=self.policy,
+            )
+
+    def is_full(self, pool: structs.ConcurrencyPool) -> bool:
+        self._register(pool)
+        return self._running[pool.name] >= self._limits[pool.name]
+
+    def acquire(self, pool: structs.ConcurrencyPool) -> None:
+        self._register(pool)
+        self._running[pool.name] += 1
+
+    def release(self, pool: structs.ConcurrencyPool) -> int | None:
+        # Returns the next parked job of the pool, if there is one
+        self._running[pool.name] -= 1
+        return self._parked[pool.name].pop()
+
+    def park(
+        self,
+        pool: structs.ConcurrencyPool,
+        job_id: int,
+        priority: enums.JobPriority,
+        init_time: dt.datetime,
+        deadline: dt.datetime | None = None,
+    ) -> None:
+        self._register(pool)
+        self._parked[pool.name].push(
+            job_id=job_id,
+            priority=priority,
+            init_time=init_time,
+            deadline=deadline,
+        )
+
+    def remove(self, pool: structs.ConcurrencyPool, job_id: int) -> bool:
+        self._register(pool)
+        return self._parked[pool.name].remove(job_id)
+
+    def get_depth(self, priority: enums.JobPriority) -> int:
+        return sum(queue.get_depth(priority) for queue in self._parked.values())
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {
+                "max_jobs": limit,
+                "running_jobs": self._running[name],
+                "parked_jobs": len(self._parked[name]),
+            }
+            for name, limit in self._limits.items()
+        }
+
+
+class TimingWheel:
+    """Hierarchical timing wheel of one-shot timers.
+
+    Level 0 has `slots` slots of one tick each; each level above covers
+    `slots` times the span of the one below. Timers are placed on the lowest
+    level that spans their delay and cascade down a level as the wheel turns,
+    so scheduling, cancelling and each tick cost O(1) however many timers are
+    live. Timers further out than the top level are parked in its furthest
+    slot and re-placed when it comes round.
+    """
+
+    tick: float
+    slots: int
+    levels: int
+
+    _origin: float
+    _current_tick: int
+    _wheels: list[list[dict[int, list]]]  # Level -> slot -> timer ID -> timer
+    _timers: dict[int, list]
+    _counter: itertools.count
+
+    def __init__(
+        self,
+        tick: float = 0.1,
+        slots: int = 256,
+        levels: int = 4,
+        now: float | None = None,
+    ) -> None:
+        if tick <= 0:
+            raise ValueError("The timing wheel tick must be positive.")
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+
+        self._origin = now if now is not None else time.monotonic()
+        self._current_tick = 0
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._timers = {}
+        self._counter = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def _place(self, timer: list) -> None:
+        # Timer layout: [expiry tick, callback, level, slot, timer ID]
+        expiry_tick = max(timer[0], self._current_tick + 1)
+        delta = expiry_tick - self._current_tick
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots ** (level + 1):
+            level += 1
+        span = self.slots**level
+        if delta >= span * self.slots:
+            # Beyond the top level, wait in the slot that comes round last
+            slot = (self._current_tick // span - 1) % self.slots
+        else:
+            slot = (expiry_tick // span) % self.slots
+        timer[2] = level
+        timer[3] = slot
+        self._wheels[level][slot][timer[4]] = timer
+
+    def schedule(
+        self,
+        delay: float,
+        callback: Callable[[], None],
+        now: float | None = None,
+    ) -> int:
+        # Returns the timer ID, used to cancel it
+        now = now if now is not None else time.monotonic()
+        expiry_tick = math.ceil((now + delay - self._origin) / self.tick)
+        timer_id = next(self._counter)
+        timer = [expiry_tick, callback, 0, 0, timer_id]
+        self._timers[timer_id] = timer
+        self._place(timer)
+        return timer_id
+
+    def cancel(self, timer_id: int) -> bool:
+        timer = self._timers.pop(timer_id, None)
+        if timer is None:
+            return False
+        del self._wheels[timer[2]][timer[3]][timer_id]
+        return True
+
+    def advance(self, now: float | None = None) -> list[Callable[[], None]]:
+        # Turn the wheel up to `now`, returning the callbacks of expired timers
+        now = now if now is not None else time.monotonic()
+        target_tick = math.floor((now - self._origin) / self.tick)
+        expired: list[Callable[[], None]] = []
+        while self._current_tick < target_tick:
+            self._current_tick += 1
+
+            # Cascade the higher level slots that have come round
+            level = 1
+            while level < self.levels and self._current_tick % self.slots**level == 0:
+                slot = (self._current_tick // self.slots**level) % self.slots
+                cascaded = self._wheels[level][slot]
+                self._wheels[level][slot] = {}
+                for timer_id, timer in cascaded.items():
+                    if timer[0] <= self._current_tick:
+                        del self._timers[timer_id]
+                        expired.append(timer[1])
+                    else:
+                        self._place(timer)
+                level += 1
+
+            slot_timers = self._wheels[0][self._current_tick % self.slots]
+            self._wheels[0][self._current_tick % self.slots] = {}
+            for timer_id, timer in slot_timers.items():
+                if timer[0] > self._current_tick:
+                    self._place(timer)
+                    continue
+                del self._timers[timer_id]
+                expired.append(timer[1])
+        return expired
+
+
+class Watchdog:
+    """Fires timeouts from a `TimingWheel`, turned by a single daemon thread."""
+
+    _wheel: TimingWheel
+    _lock: threading.Lock
+    _stopped: threading.Event
+    _thread: threading.Thread | None
+
+    def __init__(self, tick: float = 0.1) -> None:
+        self._wheel = TimingWheel(tick=tick)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._wheel.tick):
+            with self._lock:
+                expired = self._wheel.advance()
+            for callback in expired:
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="job-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> int:
+        with self._lock:
+            return self._wheel.schedule(delay=delay, callback=callback)
+
+    def cancel(self, timer_id: int) -> bool:
+        with self._lock:
+            return self._wheel.cancel(timer_id)
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"timers": len(self._wheel)}
+
+
+class Autoscaler:
+    """Grows and shrinks the thread budget between `min_threads` and `max_threads`.
+
+    The budget grows, at most doubling per decision, while jobs are queued and
+    the server has capacity to spare. It shrinks by one thread while the CPU
+    is saturated or the event loop lags, and back down to the threads in use
+    once nothing has been queued and threads have sat idle for `cooldown`
+    seconds. At most one decision is taken per `cooldown`, so the budget does
+    not flap.
+    """
+
+    min_threads: int
+    max_threads: int
+    cooldown: float
+    max_cpu_utilisation: float
+    max_loop_lag: float
+
+    _last_scaled_time: float | None
+    _idle_since: float | None
+
+    def __init__(
+        self,
+        min_threads: int,
+        max_threads: int,
+        cooldown: float = 30.0,
+        max_cpu_utilisation: float = 0.9,
+        max_loop_lag: float = 0.1,
+    ) -> None:
+        if min_threads < 1 or max_threads < min_threads:
+            raise ValueError("Autoscaling needs 1 <= min_threads <= max_threads.")
+        self.min_threads = min_threads
+        self.max_threads = max_threads
+        self.cooldown = cooldown
+        self.max_cpu_utilisation = max_cpu_utilisation
+        self.max_loop_lag = max_loop_lag
+
+        self._last_scaled_time = None
+        self._idle_since = None
+
+    def decide(
+        self,
+        budget: int,
+        queued_jobs: int,
+        used_threads: int,
+        cpu_utilisation: float,
+        loop_lag: float,
+        now: float | None = None,
+    ) -> tuple[int, str] | None:
+        # Returns the new budget and the reason for it, or None to keep the budget
+        now = now if now is not None else time.monotonic()
+        if queued_jobs == 0 and used_threads < budget:
+            self._idle_since = self._idle_since if self._idle_since is not None else now
+        else:
+            self._idle_since = None
+
+        decision: tuple[int, str] | None = None
+        overloaded = cpu_utilisation > self.max_cpu_utilisation or loop_lag > self.max_loop_lag
+        if not self.min_threads <= budget <= self.max_threads:
+            decision = (
+                min(max(budget, self.min_threads), self.max_threads),
+                f"Budget outside of {self.min_threads}-{self.max_threads} threads",
+            )
+        elif self._last_scaled_time is not None and now - self._last_scaled_time < self.cooldown:
+            return None
+        elif overloaded and budget > self.min_threads:
+            decision = (
+                budget - 1,
+                f"CPU utilisation {cpu_utilisation:.0%}, event loop lag {loop_lag:.3f}s",
+            )
+        elif queued_jobs > 0 and not overloaded and budget < self.max_threads:
+            decision = (
+                min(self.max_threads, budget + min(queued_jobs, budget)),
+                f"{queued_jobs} jobs queued, CPU utilisation {cpu_utilisation:.0%}",
+            )
+        elif (
+            self._idle_since is not None
+            and now - self._idle_since >= self.cooldown
+            and budget > max(self.min_threads, used_threads)
+        ):
+            decision = (
+                max(self.min_threads, used_threads),
+                f"{budget - used_threads} threads idle for {now - self._idle_since:.0f}s",
+            )
+
+        if decision is not None:
+            self._last_scaled_time = now
+            self._idle_since = None
+        return decision
+
+
+class CronSchedule:
+    """Fire times of a five-field cron expression: minute, hour, day of month, month and
+    day of week.
+
+    Fields accept `*`, values, ranges and steps (`*/15`, `1-5`, `0,30`). Days of week
+    run from 0 (Sunday) to 7 (also Sunday). As in cron, when both day fields are
+    restricted a day matching either of them fires.
+    """
+
+    expression: str
+
+    _minutes: set[int]
+    _hours: set[int]
+    _days: set[int]
+    _months: set[int]
+    _weekdays: set[int]
+    _any_day: bool
+    _any_weekday: bool
+
+    _field_ranges = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+    _max_search_days = 366 * 5
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} must have five fields.")
+        self.expression = expression
+        self._minutes, self._hours, self._days, self._months, self._weekdays = [
+            self._parse_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields, self._field_ranges)
+        ]
+        if 7 in self._weekdays:
+            self._weekdays = (self._weekdays - {7}) | {0}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _parse_field(self, field: str, minimum: int, maximum: int) -> set[int]:
+        values: set[int] = set()
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+            try:
+                if value_range == "*":
+                    start, stop = minimum, maximum
+                elif "-" in value_range:
+                    start, stop = (int(value) for value in value_range.split("-", 1))
+                else:
+                    start = stop = int(value_range)
+                    if step:
+                        stop = maximum
+                interval = int(step) if step else 1
+            except ValueError:
+                raise ValueError(f"Invalid cron field {field!r}.")
+            if not minimum <= start <= stop <= maximum or interval < 1:
+                raise ValueError(f"Cron field {field!r} is outside of {minimum}-{maximum}.")
+            values.update(range(start, stop + 1, interval))
+        return values
+
+    def _matches_day(self, day: dt.datetime) -> bool:
+        if day.month not in self._months:
+            return False
+        matches_day = day.day in self._days
+        matches_weekday = (day.weekday() + 1) % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return matches_day and matches_weekday
+        return matches_day or matches_weekday
+
+    def get_next_time(self, after: dt.datetime) -> dt.datetime:
+        # First fire time strictly after `after`
+        next_time = after.replace(second=0, microsecond=0) + dt.timedelta(minutes=1)
+        for _ in range(self._max_search_days):
+            if self._matches_day(next_time):
+                for hour in sorted(self._hours):
+                    if hour < next_time.hour:
+                        continue
+                    for minute in sorted(self._minutes):
+                        if hour == next_time.hour and minute < next_time.minute:
+                            continue
+                        return next_time.replace(hour=hour, minute=minute)
+            next_time = next_time.replace(hour=0, minute=0) + dt.timedelta(days=1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires.")
+
+
+class IntervalSchedule:
+    """Fire times a fixed number of seconds apart."""
+
+    interval: float
+
+    def __init__(self, interval: float) -> None:
+        if interval <= 0:
+            raise ValueError("The schedule interval must be positive.")
+        self.interval = interval
+
+    def get_next_time(self, after: dt.datetime) -> dt.datetime:
+        return after + dt.timedelta(seconds=self.interval)
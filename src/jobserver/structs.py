@@ -1,3 +1,4 @@
+import random
 import datetime as dt
 from . import enums
 from pathlib import Path
@@ -13,6 +14,10 @@ class JobParameters:
     priority: enums.JobPriority
     max_threads: int
     init_time: dt.datetime
+    deadline: dt.datetime | None  # Time the job should be closed by
+
+    # Fields that only affect scheduling, not what the job produces
+    _scheduling_fields = ["priority", "max_threads", "init_time", "deadline"]
 
     def __init__(
         self,
@@ -21,12 +26,101 @@ class JobParameters:
         max_threads: int,
         init_time: dt.datetime | None = None,
         *args,
+        deadline: dt.datetime | None = None,
         **kwargs,
     ) -> None:
         self.name = name
         self.priority = priority
         self.max_threads = max_threads
         self.init_time = init_time if init_time is not None else dt.datetime.now()
+        self.deadline = deadline
+
+
+class ConcurrencyPool:
+    name: str
+    max_jobs: int
+
+    def __init__(self, name: str, max_jobs: int) -> None:
+        if max_jobs < 1:
+            raise ValueError("A concurrency pool must allow at least one job.")
+        self.name = name
+        self.max_jobs = max_jobs
+
+
+class RetryPolicy:
+    """When and how soon a failed job is run again.
+
+    Attempt `n` is retried after `backoff_base * 2 ** (n - 1)` seconds, capped at
+    `backoff_cap`. `jitter` is the fraction of that delay that is randomized,
+    from 0 for a fixed delay to 1 for a delay anywhere between zero and it.
+    """
+
+    max_attempts: int
+    backoff_base: float
+    backoff_cap: float
+    jitter: float
+    retryable_error_codes: list[enums.ErrorCode]
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        jitter: float = 1.0,
+        retryable_error_codes: list[enums.ErrorCode] | None = None,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("A retry policy must allow at least one attempt.")
+        if not 0 <= jitter <= 1:
+            raise ValueError("Retry jitter must be between 0 and 1.")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retryable_error_codes = (
+            retryable_error_codes
+            if retryable_error_codes is not None
+            else [enums.ErrorCode.UNKNOWN, enums.ErrorCode.DATABASE_ERROR, enums.ErrorCode.TIMEOUT]
+        )
+
+    def should_retry(self, attempt: int, error_code: enums.ErrorCode) -> bool:
+        return attempt < self.max_attempts and error_code in self.retryable_error_codes
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+
+class StateError(Exception):
+    """Raised by job states to fail with a specific error code."""
+
+    error_code: enums.ErrorCode
+
+    def __init__(self, error_code: enums.ErrorCode, message: str = "") -> None:
+        super().__init__(message or error_code.name)
+        self.error_code = error_code
+
+    def __reduce__(self):
+        # Keep the error code when raised in a worker process
+        return (StateError, (self.error_code, str(self)))
+
+
+class InvalidTransitionError(ValueError):
+    """Raised when a job is asked to move to a status it cannot reach from its current one."""
+
+    from_status: enums.JobStatus
+    to_status: enums.JobStatus
+
+    def __init__(
+        self,
+        from_status: enums.JobStatus,
+        to_status: enums.JobStatus,
+        reason: str = "",
+    ) -> None:
+        message = f"Cannot move a job from {from_status.value} to {to_status.value}"
+        super().__init__(f"{message}: {reason}" if reason else f"{message}.")
+        self.from_status = from_status
+        self.to_status = to_status
 
 
 class JobTemplate:
@@ -35,6 +129,20 @@ class JobTemplate:
     args: dict
     parameter_class: type[JobParameters]
 
+    # Scheduling
+    execution_backend: enums.ExecutionBackend = enums.ExecutionBackend.THREAD
+    cache_results: bool = False
+    concurrency_pool: ConcurrencyPool | None = None
+    preemptible: bool = False
+    expected_duration: float | None = None  # Seconds, until runs of the template have been timed
+
+    # Timeouts, in seconds
+    state_timeout: float | None = None
+    job_timeout: float | None = None
+
+    # Failed attempts are only retried with a policy
+    retry_policy: RetryPolicy | None = None
+
     def __init__(
         self,
         name: str,
@@ -54,6 +162,7 @@ class JobTemplate:
             priority=filled_args.get("priority", enums.JobPriority.NORMAL),
             max_threads=filled_args.get("max_threads", 1),
             init_time=filled_args.get("init_time", dt.datetime.now()),
+            deadline=filled_args.get("deadline"),
         )
 
 
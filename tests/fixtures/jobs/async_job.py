@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import jobserver as jserv
+
+
+class AsyncJob(jserv.Job):
+    """Job with a single I/O-bound state, run as a coroutine."""
+
+    thread_names: set[str] = set()
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[AsyncJob.State1_Wait],
+            job_parameters=job_parameters,
+        )
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 1,
+        ):
+            super().__init__(
+                name="AsyncJob",
+                priority=priority,
+                max_threads=max_threads,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        execution_backend = jserv.enums.ExecutionBackend.ASYNCIO
+
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=AsyncJob.Parameters,
+            )
+
+    class State1_Wait(jserv.Job.AsyncState):
+        async def start(self) -> bool:
+            AsyncJob.thread_names.add(threading.current_thread().name)
+            await asyncio.sleep(0.1)
+            return True
+
+        async def cancel(self) -> bool:
+            return True
@@ -0,0 +1,129 @@
+import pytest
+import threading
+import datetime as dt
+import jobserver as jserv
+from typing import Generator
+from fastapi.testclient import TestClient
+
+
+class BlockingJob(jserv.Job):
+    """Job with a single state that blocks until `release` is set."""
+
+    release = threading.Event()
+    started_job_ids: list[str] = []
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[BlockingJob.State1_Block],
+            job_parameters=job_parameters,
+        )
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 1,
+            deadline: dt.datetime | None = None,
+        ):
+            super().__init__(
+                name="BlockingJob",
+                priority=priority,
+                max_threads=max_threads,
+                deadline=deadline,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=BlockingJob.Parameters,
+            )
+
+    class State1_Block(jserv.Job.State):
+        def start(self) -> bool:
+            BlockingJob.started_job_ids.append(self.job_id)
+            return BlockingJob.release.wait(timeout=10)
+
+
+class PausableJob(BlockingJob):
+    """Preemptible job whose state accepts pause and resume requests."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        jserv.Job.__init__(
+            self,
+            _template=self.Template,
+            _states=[PausableJob.State1_Block],
+            job_parameters=job_parameters,
+        )
+
+    class Template(BlockingJob.Template):
+        preemptible = True
+
+    class State1_Block(BlockingJob.State1_Block):
+        def pause(self) -> bool:
+            return True
+
+        def resume(self) -> bool:
+            return True
+
+
+class UnpausableJob(BlockingJob):
+    """Preemptible job whose state refuses pause requests."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        jserv.Job.__init__(
+            self,
+            _template=self.Template,
+            _states=[UnpausableJob.State1_Block],
+            job_parameters=job_parameters,
+        )
+
+    class Template(BlockingJob.Template):
+        preemptible = True
+
+
+@pytest.fixture
+def blocking_job() -> Generator[type[BlockingJob], None, None]:
+    BlockingJob.release.clear()
+    BlockingJob.started_job_ids = []
+    yield BlockingJob
+    BlockingJob.release.set()
+
+
+@pytest.fixture
+def job_manager(
+    config_client: jserv.ConfigClient,
+    database_client: jserv.DatabaseClient,
+) -> Generator[jserv.JobManager, None, None]:
+    job_manager = jserv.JobManager(
+        config=config_client,
+        database=database_client,
+        allowed_jobs=[BlockingJob],
+    )
+    yield job_manager
+    BlockingJob.release.set()
+    job_manager.stop(wait=True, timeout=10)
+
+
+@pytest.fixture
+def blocking_job_server(
+    config_client: jserv.ConfigClient,
+    database_client: jserv.DatabaseClient,
+) -> Generator[jserv.JobServer, None, None]:
+    job_server = jserv.JobServer(
+        config=config_client,
+        database=database_client,
+        allowed_jobs=[BlockingJob],
+    )
+    yield job_server
+    BlockingJob.release.set()
+    job_server._job_manager.stop(wait=True, timeout=10)
+
+
+@pytest.fixture
+def blocking_job_client(blocking_job_server: jserv.JobServer) -> TestClient:
+    assert blocking_job_server._app is not None
+    return TestClient(blocking_job_server._app)
@@ -0,0 +1,57 @@
+import threading
+import jobserver as jserv
+from typing import Any
+
+
+class CheckpointJob(jserv.Job):
+    """Job whose second state blocks until `release` is set, checkpointing a note."""
+
+    release = threading.Event()
+    started_states: list[tuple[str, str]] = []  # (job ID, state name)
+
+    note: str | None
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[CheckpointJob.State1_Record, CheckpointJob.State2_Block],
+            job_parameters=job_parameters,
+        )
+        self.note = None
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 1,
+        ):
+            super().__init__(
+                name="CheckpointJob",
+                priority=priority,
+                max_threads=max_threads,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=CheckpointJob.Parameters,
+            )
+
+    class State1_Record(jserv.Job.State):
+        def start(self) -> bool:
+            CheckpointJob.started_states.append((self.job_id, self.name))
+            return True
+
+    class State2_Block(jserv.Job.State):
+        def start(self) -> bool:
+            CheckpointJob.started_states.append((self.job_id, self.name))
+            return CheckpointJob.release.wait(timeout=10)
+
+    def get_checkpoint(self) -> Any:
+        return {"note": self.note}
+
+    def load_checkpoint(self, checkpoint: Any) -> None:
+        self.note = checkpoint["note"]
@@ -0,0 +1,37 @@
+import jobserver as jserv
+
+
+class FailingJob(jserv.Job):
+    """Job with a single state that always fails."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[FailingJob.State1_Fail],
+            job_parameters=job_parameters,
+        )
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 1,
+        ):
+            super().__init__(
+                name="FailingJob",
+                priority=priority,
+                max_threads=max_threads,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=FailingJob.Parameters,
+            )
+
+    class State1_Fail(jserv.Job.State):
+        def start(self) -> bool:
+            return False
@@ -0,0 +1,84 @@
+import time
+import threading
+import multiprocessing
+import jobserver as jserv
+from typing import Any
+
+
+class ParallelJob(jserv.Job):
+    """Job with a parallel state summing squares over eight partitions."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[ParallelJob.State1_SumSquares],
+            job_parameters=job_parameters,
+        )
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 4,
+        ):
+            super().__init__(
+                name="ParallelJob",
+                priority=priority,
+                max_threads=max_threads,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=ParallelJob.Parameters,
+            )
+
+    class State1_SumSquares(jserv.Job.ParallelState):
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def partition(self) -> list[Any]:
+            return [range(start, start + 1000) for start in range(0, 8000, 1000)]
+
+        def map(self, partition: Any) -> Any:
+            cls = ParallelJob.State1_SumSquares
+            with cls.lock:
+                cls.running += 1
+                cls.max_running = max(cls.max_running, cls.running)
+            time.sleep(0.05)
+            with cls.lock:
+                cls.running -= 1
+            return sum(i * i for i in partition)
+
+        def reduce(self, results: list[Any]) -> bool:
+            return sum(results) == sum(i * i for i in range(8000))
+
+
+class ProcessParallelJob(ParallelJob):
+    """Parallel job whose partitions only succeed when mapped outside of the server process."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        jserv.Job.__init__(
+            self,
+            _template=self.Template,
+            _states=[ProcessParallelJob.State1_SumSquares],
+            job_parameters=job_parameters,
+        )
+
+    class Template(ParallelJob.Template):
+        execution_backend = jserv.enums.ExecutionBackend.PROCESS
+
+    class State1_SumSquares(jserv.Job.ParallelState):
+        def partition(self) -> list[Any]:
+            return [range(start, start + 1000) for start in range(0, 8000, 1000)]
+
+        def map(self, partition: Any) -> Any:
+            assert multiprocessing.parent_process() is not None
+            return sum(i * i for i in partition)
+
+        def reduce(self, results: list[Any]) -> bool:
+            return sum(results) == sum(i * i for i in range(8000))
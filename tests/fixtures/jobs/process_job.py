@@ -0,0 +1,43 @@
+import multiprocessing
+import jobserver as jserv
+
+
+class ProcessJob(jserv.Job):
+    """Job whose states only succeed when run outside of the server process."""
+
+    def __init__(self, job_parameters: jserv.structs.JobParameters):
+        super().__init__(
+            _template=self.Template,
+            _states=[ProcessJob.State1_Sum, ProcessJob.State2_Sum],
+            job_parameters=job_parameters,
+        )
+
+    class Parameters(jserv.structs.JobParameters):
+        def __init__(
+            self,
+            priority: jserv.enums.JobPriority = jserv.enums.JobPriority.NORMAL,
+            max_threads: int = 1,
+        ):
+            super().__init__(
+                name="ProcessJob",
+                priority=priority,
+                max_threads=max_threads,
+            )
+
+    class Template(jserv.structs.JobTemplate):
+        execution_backend = jserv.enums.ExecutionBackend.PROCESS
+
+        def __init__(self, name: str, description: str, args: dict):
+            super().__init__(
+                name=name,
+                description=description,
+                args=args,
+                parameter_class=ProcessJob.Parameters,
+            )
+
+    class State1_Sum(jserv.Job.State):
+        def start(self) -> bool:
+            return sum(range(100_000)) > 0 and multiprocessing.parent_process() is not None
+
+    class State2_Sum(State1_Sum):
+        pass
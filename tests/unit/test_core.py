@@ -1,11 +1,30 @@
+import time
+import pickle
+import threading
+import datetime as dt
 import pytest
 import jobserver as jserv
+from typing import Callable
 from fastapi.testclient import TestClient
 from tests.fixtures.clients import (
     temporary_directory,
     config_client,
     database_client,
 )
+from tests.fixtures.jobs.blocking_job import (
+    BlockingJob,
+    PausableJob,
+    UnpausableJob,
+    blocking_job,
+    blocking_job_client,
+    blocking_job_server,
+    job_manager,
+)
+from tests.fixtures.jobs.async_job import AsyncJob
+from tests.fixtures.jobs.checkpoint_job import CheckpointJob
+from tests.fixtures.jobs.failing_job import FailingJob
+from tests.fixtures.jobs.process_job import ProcessJob
+from tests.fixtures.jobs.parallel_job import ParallelJob, ProcessParallelJob
 from tests.fixtures.jobs.file_write_read_job import (
     FileWriteReadJob,
     file_write_read_job_server,
@@ -37,6 +56,1215 @@ class TestJobManagerBasicFunctionality:
         )
 
 
+def wait_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for condition"
+        time.sleep(0.01)
+
+
+def wait_for_jobs_to_close(jobs: list[jserv.Job], timeout: float = 5.0) -> None:
+    wait_until(
+        lambda: all(job.job_status == jserv.enums.JobStatus.CLOSED for job in jobs),
+        timeout=timeout,
+    )
+
+
+def get_job_updates(job_manager: jserv.JobManager, job: jserv.Job) -> list:
+    job_updates = job_manager.database.search_entries(
+        table=jserv.enums.DatabaseTable.JOB_UPDATE,
+        filters=[
+            jserv.data.Filter.Compare(
+                field_name="job_id",
+                operator=jserv.enums.SQLCompareOperator.EQUALS,
+                value=job.job_id,
+            )
+        ],
+    )
+    return job_updates or []
+
+
+@pytest.mark.dependency(depends=["test_job_manager_can_start"])
+class TestJobManagerScheduling:
+    def test_added_job_runs_to_completion(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job = blocking_job(blocking_job.Parameters())
+        job_manager.add_job(job)
+        job_manager.start()
+        blocking_job.release.set()
+        wait_for_jobs_to_close([job])
+
+        assert job.job_result is not None
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+        assert job_manager.get_job(job.job_id) is job  # type: ignore[arg-type]
+
+    def test_queued_jobs_start_in_priority_order(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager.update_available_threads(1)
+        jobs = [
+            blocking_job(blocking_job.Parameters(priority=priority))
+            for priority in [
+                jserv.enums.JobPriority.LOW,
+                jserv.enums.JobPriority.VERY_HIGH,
+                jserv.enums.JobPriority.NORMAL,
+            ]
+        ]
+        for job in jobs:
+            job_manager.add_job(job)
+        assert job_manager.get_queue_stats()["NORMAL"]["depth"] == 1
+
+        job_manager.start()
+        blocking_job.release.set()
+        wait_for_jobs_to_close(jobs)
+
+        assert blocking_job.started_job_ids == [str(jobs[i].job_id) for i in [1, 2, 0]]
+        assert all(stats["depth"] == 0 for stats in job_manager.get_queue_stats().values())
+
+    def test_narrow_jobs_fill_thread_budget(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager.update_available_threads(4)
+        wide_job = blocking_job(blocking_job.Parameters(max_threads=3))
+        blocked_job = blocking_job(blocking_job.Parameters(max_threads=3))
+        narrow_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW, max_threads=1)
+        )
+        for job in [wide_job, blocked_job, narrow_job]:
+            job_manager.add_job(job)
+        job_manager.start()
+
+        assert job_manager.get_thread_stats()["used_threads"] == 4
+        assert str(blocked_job.job_id) not in blocking_job.started_job_ids
+
+        blocking_job.release.set()
+        wait_for_jobs_to_close([wide_job, blocked_job, narrow_job])
+        wait_until(lambda: job_manager.get_thread_stats()["used_threads"] == 0)
+
+    def test_process_backend_runs_states_in_worker_process(
+        self,
+        job_manager: jserv.JobManager,
+    ) -> None:
+        job = ProcessJob(ProcessJob.Parameters())
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close([job], timeout=30.0)
+
+        assert job.job_result is not None
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+        wait_until(lambda: len(get_job_updates(job_manager, job)) == 4)
+
+    @pytest.mark.parametrize("job_class", [ParallelJob, ProcessParallelJob])
+    def test_parallel_state_reports_partition_progress(
+        self,
+        job_manager: jserv.JobManager,
+        job_class: type[ParallelJob],
+    ) -> None:
+        job_manager.update_available_threads(4)
+        job = job_class(job_class.Parameters(max_threads=4))
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close([job], timeout=30.0)
+
+        assert job.job_result is not None
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+        comments = [job_update.comment for job_update in get_job_updates(job_manager, job)]
+        assert "State 0 (State1_SumSquares) finished partition 8 of 8" in comments
+
+    def test_asyncio_jobs_share_one_thread(
+        self,
+        job_manager: jserv.JobManager,
+    ) -> None:
+        job_manager.update_available_threads(50)
+        jobs = [AsyncJob(AsyncJob.Parameters()) for _ in range(50)]
+        for job in jobs:
+            job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close(jobs)
+
+        assert AsyncJob.thread_names == {"job-event-loop"}
+        assert all(
+            job.job_result is not None
+            and job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+            for job in jobs
+        )
+
+    def test_async_state_on_thread_backend_is_rejected(
+        self,
+        job_manager: jserv.JobManager,
+    ) -> None:
+        class MismatchedJob(AsyncJob):
+            class Template(AsyncJob.Template):
+                execution_backend = jserv.enums.ExecutionBackend.THREAD
+
+        with pytest.raises(ValueError):
+            job_manager.add_job(MismatchedJob(AsyncJob.Parameters()))
+
+    def test_dependent_job_runs_after_upstream_succeeds(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        upstream_job = blocking_job(blocking_job.Parameters())
+        downstream_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.HIGH)
+        )
+        job_manager.start()
+        job_manager.add_job(upstream_job)
+        job_manager.add_job(downstream_job, depends_on=[upstream_job.job_id])  # type: ignore[list-item]
+
+        wait_until(lambda: blocking_job.started_job_ids == [str(upstream_job.job_id)])
+        blocking_job.release.set()
+        wait_for_jobs_to_close([upstream_job, downstream_job])
+        assert blocking_job.started_job_ids == [
+            str(upstream_job.job_id),
+            str(downstream_job.job_id),
+        ]
+
+    def test_failed_upstream_cancels_downstream_jobs(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        upstream_job = FailingJob(FailingJob.Parameters())
+        middle_job = blocking_job(blocking_job.Parameters())
+        downstream_job = blocking_job(blocking_job.Parameters())
+        job_manager.add_job(upstream_job)
+        job_manager.add_job(middle_job, depends_on=[upstream_job.job_id])  # type: ignore[list-item]
+        job_manager.add_job(downstream_job, depends_on=[middle_job.job_id])  # type: ignore[list-item]
+        job_manager.start()
+        wait_for_jobs_to_close([upstream_job, middle_job, downstream_job])
+
+        for job in [middle_job, downstream_job]:
+            assert job.job_result is not None
+            assert job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED
+        assert blocking_job.started_job_ids == []
+
+        # Jobs added after the upstream job failed are cancelled straight away
+        late_job = blocking_job(blocking_job.Parameters())
+        job_manager.add_job(late_job, depends_on=[upstream_job.job_id])  # type: ignore[list-item]
+        assert late_job.job_result is not None
+        assert late_job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED
+
+    def test_submit_jobs_validates_whole_batch(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        with pytest.raises(ValueError):
+            job_manager.submit_jobs(
+                template_name="BlockingJob",
+                parameter_sets=[{"priority": "HIGH"}, {"not_a_parameter": 1}],
+            )
+        with pytest.raises(KeyError):
+            job_manager.submit_jobs(template_name="NotARealJob", parameter_sets=[{}])
+        assert job_manager.get_jobs() == []
+
+        job_ids = job_manager.submit_jobs(
+            template_name="BlockingJob",
+            parameter_sets=[{"priority": "HIGH"}, {"priority": 1, "max_threads": 2}],
+        )
+        jobs = [job_manager.get_job(job_id) for job_id in job_ids]
+        assert [job.parameters.priority for job in jobs] == [  # type: ignore[union-attr]
+            jserv.enums.JobPriority.HIGH,
+            jserv.enums.JobPriority.VERY_LOW,
+        ]
+
+    def test_cached_result_skips_execution(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class CachedJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                cache_results = True
+
+        job_manager.start()
+        first_job = CachedJob(CachedJob.Parameters())
+        job_manager.add_job(first_job)
+        blocking_job.release.set()
+        wait_for_jobs_to_close([first_job])
+        wait_until(lambda: job_manager.get_cache_stats()["entries"] == 1)
+
+        second_job = CachedJob(CachedJob.Parameters(priority=jserv.enums.JobPriority.HIGH))
+        job_manager.add_job(second_job)
+        assert second_job.job_result is not None
+        assert second_job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+        assert blocking_job.started_job_ids == [str(first_job.job_id)]
+        assert job_manager.get_cache_stats()["hits"] == 1
+
+    def test_full_queue_rejects_submissions(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        config_client.set(
+            jserv.enums.ConfigValue.MAX_QUEUE_DEPTHS.value,
+            {"LOW": 1, "VERY_HIGH": None},
+        )
+        job_manager = jserv.JobManager(config=config_client, database=database_client)
+        job_manager.add_job(
+            blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+        )
+
+        with pytest.raises(jserv.scheduling.QueueFullError) as exc_info:
+            job_manager.add_job(
+                blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+            )
+        assert exc_info.value.retry_after > 0
+
+        # Other priority levels still get in
+        job_manager.add_job(
+            blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.VERY_HIGH))
+        )
+        assert len(job_manager.get_jobs()) == 2
+
+    def test_waiting_jobs_count_towards_queue_depth(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        config_client.set(jserv.enums.ConfigValue.MAX_QUEUE_DEPTHS.value, {"LOW": 2})
+        job_manager = jserv.JobManager(config=config_client, database=database_client)
+        upstream_job = blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+        downstream_job = blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+        job_manager.add_job(upstream_job)
+        job_manager.add_job(downstream_job, depends_on=[upstream_job.job_id])  # type: ignore[list-item]
+
+        with pytest.raises(jserv.scheduling.QueueFullError):
+            job_manager.add_job(
+                blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+            )
+
+    def test_concurrency_pool_does_not_block_other_jobs(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class PooledJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                concurrency_pool = jserv.structs.ConcurrencyPool(name="licence", max_jobs=1)
+
+        job_manager.update_available_threads(3)
+        pooled_jobs = [
+            PooledJob(PooledJob.Parameters(priority=jserv.enums.JobPriority.HIGH)) for _ in range(3)
+        ]
+        other_job = blocking_job(blocking_job.Parameters(priority=jserv.enums.JobPriority.LOW))
+        for job in [*pooled_jobs, other_job]:
+            job_manager.add_job(job)
+        job_manager.start()
+
+        wait_until(lambda: len(blocking_job.started_job_ids) == 2)
+        assert set(blocking_job.started_job_ids) == {
+            str(pooled_jobs[0].job_id),
+            str(other_job.job_id),
+        }
+        assert job_manager.get_pool_stats()["licence"] == {
+            "max_jobs": 1,
+            "running_jobs": 1,
+            "parked_jobs": 2,
+        }
+
+        blocking_job.release.set()
+        wait_for_jobs_to_close([*pooled_jobs, other_job])
+
+    def test_urgent_job_preempts_lowest_priority_job(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager.update_available_threads(2)
+        low_job = PausableJob(PausableJob.Parameters(priority=jserv.enums.JobPriority.LOW))
+        normal_job = PausableJob(PausableJob.Parameters(priority=jserv.enums.JobPriority.NORMAL))
+        job_manager.add_job(low_job)
+        job_manager.add_job(normal_job)
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 2)
+
+        urgent_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.VERY_HIGH)
+        )
+        job_manager.add_job(urgent_job)
+        wait_until(lambda: str(urgent_job.job_id) in blocking_job.started_job_ids)
+        assert low_job.job_status == jserv.enums.JobStatus.PAUSED
+        assert normal_job.job_status == jserv.enums.JobStatus.RUNNING
+
+        blocking_job.release.set()
+        wait_for_jobs_to_close([low_job, normal_job, urgent_job])
+        comments = [update.comment for update in get_job_updates(job_manager, low_job)]
+        assert f"Pausing: Preempted by job {urgent_job.job_id}" in comments
+        assert "Paused" in comments
+        assert "Resumed" in comments
+        assert low_job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS  # type: ignore[union-attr]
+
+    def test_job_refusing_preemption_is_not_asked_again(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager.update_available_threads(1)
+        low_job = UnpausableJob(UnpausableJob.Parameters(priority=jserv.enums.JobPriority.LOW))
+        job_manager.add_job(low_job)
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+
+        urgent_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.VERY_HIGH)
+        )
+        job_manager.add_job(urgent_job)
+        time.sleep(0.2)
+        assert low_job.job_status == jserv.enums.JobStatus.RUNNING
+        assert urgent_job.job_status == jserv.enums.JobStatus.PENDING
+
+        blocking_job.release.set()
+        wait_for_jobs_to_close([low_job, urgent_job])
+        comments = [update.comment for update in get_job_updates(job_manager, low_job)]
+        assert comments.count(f"Pausing: Preempted by job {urgent_job.job_id}") == 1
+        assert comments.count("State refused to pause") == 1
+        assert urgent_job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS  # type: ignore[union-attr]
+
+    def test_illegal_transitions_are_rejected(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job = PausableJob(PausableJob.Parameters())
+        job_manager.add_job(job)
+        with pytest.raises(jserv.structs.InvalidTransitionError):
+            job_manager.pause_job(job.job_id)  # type: ignore[arg-type]
+        with pytest.raises(jserv.structs.InvalidTransitionError):
+            job_manager.resume_job(job.job_id)  # type: ignore[arg-type]
+
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+        job_manager.pause_job(job.job_id)  # type: ignore[arg-type]
+        assert job.job_status == jserv.enums.JobStatus.PAUSED
+        with pytest.raises(jserv.structs.InvalidTransitionError):
+            job_manager.pause_job(job.job_id)  # type: ignore[arg-type]
+        job_manager.resume_job(job.job_id)  # type: ignore[arg-type]
+        assert job.job_status == jserv.enums.JobStatus.RUNNING
+
+        job_manager.cancel_job(job.job_id)  # type: ignore[arg-type]
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED  # type: ignore[union-attr]
+        with pytest.raises(jserv.structs.InvalidTransitionError):
+            job_manager.cancel_job(job.job_id)  # type: ignore[arg-type]
+        with pytest.raises(KeyError):
+            job_manager.cancel_job(0)
+
+    def test_concurrent_pause_and_cancel_leave_job_closed(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job = PausableJob(PausableJob.Parameters())
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+
+        def control(action: Callable[[int], None]) -> None:
+            for _ in range(200):
+                try:
+                    action(job.job_id)  # type: ignore[arg-type]
+                except jserv.structs.InvalidTransitionError:
+                    pass
+
+        threads = [
+            threading.Thread(target=control, args=(action,))
+            for action in [job_manager.pause_job, job_manager.resume_job] * 4
+        ]
+        threads.append(threading.Thread(target=control, args=(job_manager.cancel_job,)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert job.job_status == jserv.enums.JobStatus.CLOSED
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED  # type: ignore[union-attr]
+        assert job_manager.get_thread_stats()["free_threads"] == job_manager._admission.budget
+        closed_updates = [
+            update
+            for update in get_job_updates(job_manager, job)
+            if update.comment.startswith("Job closed")
+        ]
+        assert len(closed_updates) == 1
+
+    def test_cancelled_queued_job_cancels_dependents(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class PooledJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                concurrency_pool = jserv.structs.ConcurrencyPool(name="licence", max_jobs=1)
+
+        job_manager.update_available_threads(2)
+        running_job = PooledJob(PooledJob.Parameters())
+        parked_job = PooledJob(PooledJob.Parameters())
+        queued_job = blocking_job(blocking_job.Parameters(max_threads=2))
+        downstream_job = blocking_job(blocking_job.Parameters())
+        for job in [running_job, parked_job, queued_job]:
+            job_manager.add_job(job)
+        job_manager.add_job(downstream_job, depends_on=[queued_job.job_id])  # type: ignore[list-item]
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+
+        job_manager.cancel_job(parked_job.job_id)  # type: ignore[arg-type]
+        job_manager.cancel_job(queued_job.job_id)  # type: ignore[arg-type]
+        for job in [parked_job, queued_job, downstream_job]:
+            assert job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED  # type: ignore[union-attr]
+        assert job_manager.get_pool_stats()["licence"] == {
+            "max_jobs": 1,
+            "running_jobs": 1,
+            "parked_jobs": 0,
+        }
+
+        blocking_job.release.set()
+        wait_for_jobs_to_close([running_job])
+        assert blocking_job.started_job_ids == [str(running_job.job_id)]
+        assert job_manager.get_pool_stats()["licence"]["running_jobs"] == 0
+
+    def test_deadline_policy_runs_earliest_deadline_first(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        config_client.set(jserv.enums.ConfigValue.SCHEDULING_POLICY.value, "DEADLINE")
+        job_manager = jserv.JobManager(config=config_client, database=database_client)
+        job_manager.update_available_threads(1)
+        now = dt.datetime.now()
+        urgent_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.VERY_HIGH)
+        )
+        later_job = blocking_job(blocking_job.Parameters(deadline=now + dt.timedelta(minutes=10)))
+        overdue_job = blocking_job(blocking_job.Parameters(deadline=now - dt.timedelta(seconds=1)))
+        for job in [urgent_job, later_job, overdue_job]:
+            job_manager.add_job(job)
+
+        job_manager.start()
+        blocking_job.release.set()
+        wait_for_jobs_to_close([urgent_job, later_job, overdue_job])
+        job_manager.stop(wait=True, timeout=10)
+
+        assert blocking_job.started_job_ids == [
+            str(job.job_id) for job in [overdue_job, later_job, urgent_job]
+        ]
+        update_types = [update.new_state for update in get_job_updates(job_manager, overdue_job)]
+        assert jserv.enums.JobUpdateType.WARNING.value in update_types
+        assert jserv.enums.JobUpdateType.DEADLINE_MISSED.value in update_types
+        update_types = [update.new_state for update in get_job_updates(job_manager, later_job)]
+        assert jserv.enums.JobUpdateType.DEADLINE_MISSED.value not in update_types
+
+    def test_infeasible_deadline_warns_at_submit(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(blocking_job.Template, "expected_duration", 60.0)
+        deadline = dt.datetime.now() + dt.timedelta(seconds=30)
+        job = blocking_job(blocking_job.Parameters(deadline=deadline))
+        job_manager.add_job(job)
+
+        comments = [update.comment for update in get_job_updates(job_manager, job)]
+        assert f"Deadline {deadline.isoformat()} is unlikely" in " ".join(comments)
+
+    def test_deadline_estimate_counts_work_queued_ahead(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(blocking_job.Template, "expected_duration", 10.0)
+        job_manager.update_available_threads(1)
+        for _ in range(3):
+            job_manager.add_job(blocking_job(blocking_job.Parameters()))
+
+        deadline = dt.datetime.now() + dt.timedelta(seconds=25)
+        late_job = blocking_job(blocking_job.Parameters(deadline=deadline))
+        urgent_job = blocking_job(
+            blocking_job.Parameters(priority=jserv.enums.JobPriority.HIGH, deadline=deadline)
+        )
+        job_manager.add_jobs([late_job, urgent_job])
+
+        comments = [update.comment for update in get_job_updates(job_manager, late_job)]
+        assert "is unlikely" in " ".join(comments)
+        comments = [update.comment for update in get_job_updates(job_manager, urgent_job)]
+        assert "is unlikely" not in " ".join(comments)
+
+    def test_state_timeout_kills_job(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class TimeoutJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                state_timeout = 0.2
+
+        job = TimeoutJob(TimeoutJob.Parameters())
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close([job])
+
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.KILLED  # type: ignore[union-attr]
+        error_updates = [
+            update
+            for update in get_job_updates(job_manager, job)
+            if update.new_state == jserv.enums.JobUpdateType.ERROR.value
+        ]
+        assert len(error_updates) == 1
+        assert "timed out after 0.2s" in error_updates[0].comment
+        assert (
+            job_manager.database.get_entry(
+                table=jserv.enums.DatabaseTable.ERROR,
+                primary_key_fields={"error_id": error_updates[0].error_id},
+            )
+            is not None
+        )
+        server_updates = job_manager.database.search_entries(
+            table=jserv.enums.DatabaseTable.SERVER_UPDATE,
+            filters=[],
+        )
+        assert [update.subtype for update in server_updates or []] == [
+            jserv.enums.ServerUpdateSubtype.Job.COMMAND_TIMEOUT
+        ]
+
+    def test_timed_out_job_is_retried_under_same_id(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class RetriedJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                retry_policy = jserv.structs.RetryPolicy(
+                    max_attempts=2,
+                    backoff_base=0.05,
+                    jitter=0,
+                )
+
+        class State1_BlockOnce(blocking_job.State1_Block):  # type: ignore[name-defined]
+            timeout = 0.2
+
+            def start(self) -> bool:
+                # Only the first attempt blocks
+                if blocking_job.started_job_ids:
+                    return True
+                return super().start()
+
+        job = RetriedJob(RetriedJob.Parameters())
+        job._states = [State1_BlockOnce]
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close([job])
+
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS  # type: ignore[union-attr]
+        comments = [update.comment for update in get_job_updates(job_manager, job)]
+        assert "Attempt 1 failed (TIMEOUT), retrying in 0.050s" in comments
+        assert "Job started (attempt 2)" in comments
+        assert job_manager.get_thread_stats()["used_threads"] == 0
+
+    def test_cancelled_retry_is_not_started(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class RetriedJob(FailingJob):
+            class Template(FailingJob.Template):
+                retry_policy = jserv.structs.RetryPolicy(
+                    max_attempts=2,
+                    backoff_base=0.05,
+                    jitter=0,
+                )
+
+        job_manager.update_available_threads(1)
+        job = RetriedJob(RetriedJob.Parameters())
+        other_job = blocking_job(blocking_job.Parameters())
+        job_manager.add_job(job)
+        job_manager.add_job(other_job)
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+        wait_until(lambda: job.job_id in job_manager._run_queue.get_job_ids())
+
+        job_manager.cancel_job(job.job_id)  # type: ignore[arg-type]
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.CANCELLED  # type: ignore[union-attr]
+        assert job.job_id not in job_manager._run_queue.get_job_ids()
+
+        blocking_job.release.set()
+        next_job = blocking_job(blocking_job.Parameters())
+        job_manager.add_job(next_job)
+        wait_for_jobs_to_close([other_job, next_job])
+        wait_until(lambda: job_manager.get_thread_stats()["used_threads"] == 0)
+
+    def test_non_retryable_error_code_is_not_retried(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        class RetriedJob(blocking_job):  # type: ignore[valid-type,misc]
+            class Template(blocking_job.Template):  # type: ignore[name-defined]
+                retry_policy = jserv.structs.RetryPolicy(backoff_base=0.01)
+
+        class State1_MissingInput(blocking_job.State1_Block):  # type: ignore[name-defined]
+            attempts = 0
+
+            def start(self) -> bool:
+                State1_MissingInput.attempts += 1
+                if State1_MissingInput.attempts == 1:
+                    raise jserv.structs.StateError(jserv.enums.ErrorCode.DATABASE_ERROR)
+                raise jserv.structs.StateError(jserv.enums.ErrorCode.INPUT_FILE_MISSING)
+
+        job = RetriedJob(RetriedJob.Parameters())
+        job._states = [State1_MissingInput]
+        job_manager.add_job(job)
+        job_manager.start()
+        wait_for_jobs_to_close([job])
+
+        assert job.job_result.return_code == jserv.enums.JobReturnCode.FAILED  # type: ignore[union-attr]
+        assert State1_MissingInput.attempts == 2
+
+    def test_autoscaler_grows_and_reclaims_thread_budget(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        config_client.set(jserv.enums.ConfigValue.AVAILABLE_THREADS.value, 1)
+        config_client.set(jserv.enums.ConfigValue.AUTOSCALE_MAX_THREADS.value, 4)
+        config_client.set(jserv.enums.ConfigValue.AUTOSCALE_INTERVAL.value, 0.05)
+        config_client.set(jserv.enums.ConfigValue.AUTOSCALE_COOLDOWN.value, 0.2)
+        config_client.set(jserv.enums.ConfigValue.AUTOSCALE_MAX_CPU_UTILISATION.value, 1.0)
+        job_manager = jserv.JobManager(config=config_client, database=database_client)
+        jobs = [blocking_job(blocking_job.Parameters()) for _ in range(4)]
+        for job in jobs:
+            job_manager.add_job(job)
+
+        job_manager.start()
+        try:
+            wait_until(lambda: len(blocking_job.started_job_ids) == 4)
+            assert job_manager.get_thread_stats()["budget"] == 4
+            blocking_job.release.set()
+            wait_for_jobs_to_close(jobs)
+            wait_until(lambda: job_manager.get_thread_stats()["budget"] == 1)
+        finally:
+            blocking_job.release.set()
+            job_manager.stop(wait=True, timeout=10)
+
+        server_updates = job_manager.database.search_entries(
+            table=jserv.enums.DatabaseTable.SERVER_UPDATE,
+            filters=[],
+        )
+        subtypes = [
+            update.subtype
+            for update in server_updates or []
+            if update.type == jserv.enums.ServerUpdateType.SCALING.value
+        ]
+        assert subtypes[0] == jserv.enums.ServerUpdateSubtype.Scaling.SCALE_UP
+        assert subtypes[-1] == jserv.enums.ServerUpdateSubtype.Scaling.SCALE_DOWN
+
+
+class TestRecurringJobs:
+    def get_server_update_subtypes(self, job_manager: jserv.JobManager) -> list[int]:
+        server_updates = job_manager.database.search_entries(
+            table=jserv.enums.DatabaseTable.SERVER_UPDATE,
+            filters=[],
+        )
+        return [update.subtype for update in server_updates or []]  # type: ignore[attr-defined]
+
+    def test_interval_job_is_submitted_repeatedly(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        blocking_job.release.set()
+        job_manager.start()
+        job_manager.add_recurring_job(
+            name="every_200ms",
+            template_name="BlockingJob",
+            parameters={"priority": "HIGH"},
+            interval=0.2,
+        )
+        wait_until(lambda: len(job_manager.get_jobs()) >= 2)
+        job_manager.remove_recurring_job("every_200ms")
+        assert all(
+            job.parameters.priority == jserv.enums.JobPriority.HIGH
+            for job in job_manager.get_jobs()
+        )
+
+    def test_overlapping_fire_times_are_skipped(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager.start()
+        job_manager.add_recurring_job(name="blocked", template_name="BlockingJob", interval=0.1)
+        wait_until(
+            lambda: jserv.enums.ServerUpdateSubtype.Job.RECURRING_SKIPPED
+            in self.get_server_update_subtypes(job_manager)
+        )
+        assert len(job_manager.get_jobs()) == 1
+
+    @pytest.mark.parametrize(
+        "misfire_policy, expected_jobs",
+        [(jserv.enums.MisfirePolicy.SKIP, 1), (jserv.enums.MisfirePolicy.CATCH_UP, 5)],
+    )
+    def test_misfires_after_restart(
+        self,
+        job_manager: jserv.JobManager,
+        blocking_job: type[BlockingJob],
+        misfire_policy: jserv.enums.MisfirePolicy,
+        expected_jobs: int,
+    ) -> None:
+        # Missed at -250s, -190s, -130s, -70s and -10s while the server was down
+        job_manager.database.set_entry(
+            entry=jserv.DatabaseEntry.RecurringJob(
+                name="every_minute",
+                template_name="BlockingJob",
+                parameters="{}",
+                cron=None,
+                interval=60,
+                misfire_policy=misfire_policy,
+                allow_overlap=True,
+                client_token=None,
+                next_fire_time=dt.datetime.now() - dt.timedelta(seconds=250),
+            ),
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+        job_manager.start()
+        wait_until(lambda: len(job_manager.get_jobs()) >= expected_jobs)
+        time.sleep(0.2)
+        assert len(job_manager.get_jobs()) == expected_jobs
+        next_fire_time = job_manager.get_recurring_jobs()[0]["next_fire_time"]
+        assert next_fire_time > dt.datetime.now() + dt.timedelta(seconds=40)
+
+    def test_recurring_job_endpoints(self, blocking_job_client: TestClient) -> None:
+        response = blocking_job_client.post(
+            "/recurring_job/nightly",
+            params={"template_name": "BlockingJob", "cron": "0 2 * * *"},
+            json={"priority": "LOW"},
+        )
+        assert response.status_code == 200
+        response = blocking_job_client.get("/recurring_jobs")
+        assert [recurring_job["name"] for recurring_job in response.json()] == ["nightly"]
+
+        response = blocking_job_client.post(
+            "/recurring_job/invalid",
+            params={"template_name": "BlockingJob", "cron": "0 2 * *"},
+        )
+        assert response.status_code == 422
+        assert blocking_job_client.delete("/recurring_job/nightly").status_code == 200
+        assert blocking_job_client.delete("/recurring_job/nightly").status_code == 404
+
+
+class TestJobRecovery:
+    def get_job_manager(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> jserv.JobManager:
+        return jserv.JobManager(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[CheckpointJob],
+            lease_owner="server",
+        )
+
+    def test_job_cannot_be_loaded_by_id(self) -> None:
+        with pytest.raises(ValueError, match="recovered by their JobManager"):
+            jserv.Job(
+                _template=CheckpointJob.Template,
+                _states=[CheckpointJob.State1_Record],
+                job_id="1",
+            )
+
+    def test_open_job_resumes_from_checkpoint(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        CheckpointJob.release.clear()
+        CheckpointJob.started_states = []
+        crashed_job_manager = self.get_job_manager(config_client, database_client)
+        crashed_job_manager.start()
+        job = CheckpointJob(CheckpointJob.Parameters())
+        job.note = "checkpointed"
+        crashed_job_manager.add_job(job)
+        wait_until(lambda: len(CheckpointJob.started_states) == 2)
+
+        # The first manager is abandoned mid-job, as if its process had crashed
+        job_manager = self.get_job_manager(config_client, database_client)
+        job_manager.start()
+        try:
+            recovered_job = job_manager.get_job(job.job_id)  # type: ignore[arg-type]
+            assert isinstance(recovered_job, CheckpointJob)
+            assert recovered_job.note == "checkpointed"
+            wait_until(lambda: len(CheckpointJob.started_states) == 3)
+            assert CheckpointJob.started_states[2] == (str(job.job_id), "State2_Block")
+
+            CheckpointJob.release.set()
+            wait_for_jobs_to_close([recovered_job])
+            assert recovered_job.job_result.return_code == jserv.enums.JobReturnCode.SUCCESS  # type: ignore[union-attr]
+        finally:
+            CheckpointJob.release.set()
+            job_manager.stop(wait=True, timeout=10)
+            crashed_job_manager.stop(wait=True, timeout=10)
+
+    def test_closed_jobs_are_not_recovered(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        CheckpointJob.release.set()
+        job_manager = self.get_job_manager(config_client, database_client)
+        job_manager.start()
+        job = CheckpointJob(CheckpointJob.Parameters())
+        job_manager.add_job(job)
+        wait_for_jobs_to_close([job])
+        job_manager.stop(wait=True, timeout=10)
+
+        job_manager = self.get_job_manager(config_client, database_client)
+        job_manager.start()
+        assert job_manager.get_jobs() == []
+        job_manager.stop()
+
+
+class TestJobWorker:
+    def get_worker(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        worker_id: str,
+    ) -> jserv.JobWorker:
+        config_client.set(jserv.enums.ConfigValue.WORKER_POLL_INTERVAL.value, 0.01)
+        config_client.set(jserv.enums.ConfigValue.AVAILABLE_THREADS.value, 2)
+        return jserv.JobWorker(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[BlockingJob],
+            worker_id=worker_id,
+        )
+
+    def get_job_status_entry(
+        self,
+        database_client: jserv.DatabaseClient,
+        job_id: int,
+    ) -> jserv.DatabaseEntry.JobStatus:
+        job_status_entry = database_client.get_entry(
+            table=jserv.enums.DatabaseTable.JOB_STATUS,
+            primary_key_fields={"job_id": job_id},
+        )
+        assert isinstance(job_status_entry, jserv.DatabaseEntry.JobStatus)
+        return job_status_entry
+
+    def test_shared_queue_jobs_run_on_worker(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager = jserv.JobManager(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[BlockingJob],
+            shared_queue=True,
+        )
+        job_manager.start()
+        job_ids = job_manager.submit_jobs("BlockingJob", [{}, {"priority": "HIGH"}])
+        assert job_manager.get_jobs() == []
+        assert self.get_job_status_entry(database_client, job_ids[0]).lease_owner is None
+
+        job_worker = self.get_worker(config_client, database_client, worker_id="worker")
+        job_worker.start()
+        try:
+            wait_until(lambda: len(blocking_job.started_job_ids) == 2)
+            assert blocking_job.started_job_ids == [str(job_ids[1]), str(job_ids[0])]
+            assert self.get_job_status_entry(database_client, job_ids[0]).lease_owner == "worker"
+
+            blocking_job.release.set()
+            wait_until(
+                lambda: all(
+                    self.get_job_status_entry(database_client, job_id).archived
+                    for job_id in job_ids
+                )
+            )
+        finally:
+            job_worker.stop(timeout=10)
+            job_manager.stop()
+
+    def test_dependencies_are_rejected_with_shared_queue(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        job_manager = jserv.JobManager(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[BlockingJob],
+            shared_queue=True,
+        )
+        job_id = job_manager.submit_jobs("BlockingJob", [{}])[0]
+        with pytest.raises(ValueError):
+            job_manager.add_job(BlockingJob(BlockingJob.Parameters()), depends_on=[job_id])
+
+    def test_stopped_worker_hands_back_open_jobs(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager = jserv.JobManager(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[BlockingJob],
+            shared_queue=True,
+        )
+        job_id = job_manager.submit_jobs("BlockingJob", [{}])[0]
+
+        job_worker_1 = self.get_worker(config_client, database_client, worker_id="worker_1")
+        job_worker_1.start()
+        wait_until(lambda: blocking_job.started_job_ids == [str(job_id)])
+        job_worker_1.stop(timeout=0)
+        assert self.get_job_status_entry(database_client, job_id).lease_owner is None
+
+        job_worker_2 = self.get_worker(config_client, database_client, worker_id="worker_2")
+        job_worker_2.start()
+        try:
+            wait_until(lambda: blocking_job.started_job_ids == [str(job_id), str(job_id)])
+            assert self.get_job_status_entry(database_client, job_id).lease_owner == "worker_2"
+        finally:
+            blocking_job.release.set()
+            job_worker_2.stop(timeout=10)
+
+    def test_expired_lease_is_reclaimed_from_checkpoint(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        CheckpointJob.release.clear()
+        CheckpointJob.started_states = []
+        job_manager = jserv.JobManager(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[CheckpointJob],
+            shared_queue=True,
+        )
+        job_id = job_manager.submit_jobs("CheckpointJob", [{}])[0]
+
+        # A crashed worker finished the first state, then stopped renewing its lease
+        database_client.claim_job(
+            lease_owner="crashed_worker",
+            lease_expiry=dt.datetime.now() - dt.timedelta(seconds=1),
+            template_names=["CheckpointJob"],
+        )
+        database_client.set_checkpoint(
+            job_id=job_id,
+            state_index=1,
+            checkpoint=pickle.dumps({"note": "checkpointed"}),
+        )
+
+        config_client.set(jserv.enums.ConfigValue.WORKER_POLL_INTERVAL.value, 0.01)
+        job_worker = jserv.JobWorker(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[CheckpointJob],
+            worker_id="worker",
+        )
+        job_worker.start()
+        try:
+            wait_until(lambda: len(CheckpointJob.started_states) == 1)
+            assert CheckpointJob.started_states == [(str(job_id), "State2_Block")]
+            reclaimed_job = job_worker.get_job_manager().get_job(job_id)
+            assert isinstance(reclaimed_job, CheckpointJob)
+            assert reclaimed_job.note == "checkpointed"
+        finally:
+            CheckpointJob.release.set()
+            job_worker.stop(timeout=10)
+
+
+class TestJobServerBatchSubmit:
+    def test_batch_submit_returns_ids_in_order(
+        self,
+        blocking_job_server: jserv.JobServer,
+        blocking_job_client: TestClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        response = blocking_job_client.post(
+            "/jobs/submit/BlockingJob",
+            json=[{"priority": "LOW"}, {}, {"priority": "VERY_HIGH"}],
+        )
+        assert response.status_code == 200
+        job_ids = response.json()["job_ids"]
+        assert len(job_ids) == 3
+        assert job_ids == sorted(job_ids)
+
+        for job_id in job_ids:
+            response = blocking_job_client.get(f"/job/status/{job_id}")
+            assert response.json()["job_id"] == job_id
+
+    def test_batch_submit_rejects_invalid_parameters(
+        self,
+        blocking_job_client: TestClient,
+    ) -> None:
+        response = blocking_job_client.post("/jobs/submit/BlockingJob", json=[{}, {"bad": 1}])
+        assert response.status_code == 422
+        response = blocking_job_client.post("/jobs/submit/NotARealJob", json=[{}])
+        assert response.status_code == 404
+
+    def test_batch_submit_over_queue_limit_returns_429(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        config_client.set(jserv.enums.ConfigValue.MAX_QUEUE_DEPTHS.value, {"NORMAL": 2})
+        job_server = jserv.JobServer(
+            config=config_client,
+            database=database_client,
+            allowed_jobs=[blocking_job],
+            start_at_init=False,
+        )
+        job_server.start()
+        job_server._job_manager.stop()
+        client = TestClient(job_server._app)  # type: ignore[arg-type]
+
+        response = client.post("/jobs/submit/BlockingJob", json=[{}, {}, {}])
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        response = client.post("/jobs/submit/BlockingJob", json=[{}, {"priority": "VERY_HIGH"}])
+        assert response.status_code == 200
+
+    def test_fair_share_across_client_tokens(
+        self,
+        blocking_job_server: jserv.JobServer,
+        blocking_job_client: TestClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        job_manager = blocking_job_server._job_manager
+        job_manager.stop()
+        job_manager.update_available_threads(1)
+        noisy_ids = blocking_job_client.post(
+            "/jobs/submit/BlockingJob?client_token=noisy",
+            json=[{}, {}, {}],
+        ).json()["job_ids"]
+        quiet_ids = blocking_job_client.post(
+            "/jobs/submit/BlockingJob?client_token=quiet",
+            json=[{}],
+        ).json()["job_ids"]
+
+        job_manager.start()
+        wait_until(lambda: len(blocking_job.started_job_ids) == 1)
+        usage = blocking_job_client.get("/clients/usage").json()
+        assert usage["noisy"]["running_jobs"] == 1
+        assert usage["noisy"]["used_threads"] == 1
+        assert usage["noisy"]["queued_jobs"] == 2
+        assert usage["quiet"]["queued_jobs"] == 1
+
+        blocking_job.release.set()
+        jobs = [job_manager.get_job(job_id) for job_id in noisy_ids + quiet_ids]
+        wait_for_jobs_to_close(jobs)  # type: ignore[arg-type]
+        assert blocking_job.started_job_ids[:2] == [str(noisy_ids[0]), str(quiet_ids[0])]
+        assert blocking_job_client.get("/clients/usage").json()["noisy"]["dequeued_jobs"] == 3
+
+
+class TestJobServerJobControl:
+    def test_job_control_endpoints(
+        self,
+        blocking_job_server: jserv.JobServer,
+        blocking_job_client: TestClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        response = blocking_job_client.post("/jobs/submit/BlockingJob", json=[{}])
+        job_id = response.json()["job_ids"][0]
+        wait_until(lambda: blocking_job.started_job_ids == [str(job_id)])
+
+        # The blocking state refuses to pause, so the job goes back to running
+        response = blocking_job_client.post(f"/job/pause/{job_id}")
+        assert response.status_code == 200
+        assert response.json() == {"job_id": job_id, "job_status": "Running"}
+        assert blocking_job_client.post(f"/job/resume/{job_id}").status_code == 409
+
+        response = blocking_job_client.post(f"/job/cancel/{job_id}")
+        assert response.json() == {"job_id": job_id, "job_status": "Closed"}
+        assert blocking_job_client.post(f"/job/cancel/{job_id}").status_code == 409
+        assert blocking_job_client.post(f"/job/pause/{job_id + 1}").status_code == 404
+
+    def test_finished_job_status_endpoints(
+        self,
+        blocking_job_server: jserv.JobServer,
+        blocking_job_client: TestClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        response = blocking_job_client.post("/jobs/submit/BlockingJob", json=[{}])
+        job_id = response.json()["job_ids"][0]
+        blocking_job.release.set()
+        wait_for_jobs_to_close([blocking_job_server._job_manager.get_job(job_id)])  # type: ignore[list-item]
+
+        response = blocking_job_client.get(f"/job/status/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["job_id"] == job_id
+        assert "checkpoint" not in response.json()
+        response = blocking_job_client.get("/active_jobs/")
+        assert response.status_code == 200
+        assert all("checkpoint" not in job_entry for job_entry in response.json())
+
+    def test_endpoint_job_pause(self, file_write_read_job_client: TestClient) -> None:
+        response = file_write_read_job_client.post("/job/pause/NOT_REAL_JOB_ID")
+        assert response.status_code == 404
+
+    def test_endpoint_job_resume(self, file_write_read_job_client: TestClient) -> None:
+        response = file_write_read_job_client.post("/job/resume/NOT_REAL_JOB_ID")
+        assert response.status_code == 404
+
+    def test_endpoint_job_cancel(self, file_write_read_job_client: TestClient) -> None:
+        response = file_write_read_job_client.post("/job/cancel/NOT_REAL_JOB_ID")
+        assert response.status_code == 404
+
+
+class TestJobServerPagination:
+    def test_job_updates_are_paged_by_cursor(
+        self,
+        blocking_job_server: jserv.JobServer,
+        blocking_job_client: TestClient,
+        blocking_job: type[BlockingJob],
+    ) -> None:
+        blocking_job.release.set()
+        response = blocking_job_client.post("/jobs/submit/BlockingJob", json=[{}, {}, {}])
+        job_ids = response.json()["job_ids"]
+        wait_until(
+            lambda: all(
+                blocking_job_server._job_manager.get_job(job_id).job_status  # type: ignore[union-attr]
+                == jserv.enums.JobStatus.CLOSED
+                for job_id in job_ids
+            )
+        )
+
+        update_times = []
+        params: dict = {"items_per_page": 2}
+        while True:
+            response = blocking_job_client.get("/job_updates", params=params)
+            assert response.status_code == 200
+            update_times += [job_update.get("update_time") for job_update in response.json()]
+            if "Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["Next-Cursor"]
+        update_times = [update_time for update_time in update_times if update_time is not None]
+
+        # Three updates per job: started, state finished and closed
+        assert len(update_times) == len(set(update_times)) == 9
+        assert update_times == sorted(update_times, reverse=True)
+
+        response = blocking_job_client.get("/job_updates", params={"cursor": "not a cursor"})
+        assert response.status_code == 400
+
+
 class TestJobServerBasicFunctionality:
     @pytest.mark.dependency(
         name="test_server_can_start",
@@ -119,18 +1347,6 @@ class TestJobServerEndpoints:
         response = file_write_read_job_client.post("/job/start/NOT_REAL_JOB_ID")
         assert response.status_code == 200
 
-    def test_endpoint_job_pause(self, file_write_read_job_client: TestClient) -> None:
-        response = file_write_read_job_client.post("/job/pause/NOT_REAL_JOB_ID")
-        assert response.status_code == 200
-
-    def test_endpoint_job_resume(self, file_write_read_job_client: TestClient) -> None:
-        response = file_write_read_job_client.post("/job/resume/NOT_REAL_JOB_ID")
-        assert response.status_code == 200
-
-    def test_endpoint_job_cancel(self, file_write_read_job_client: TestClient) -> None:
-        response = file_write_read_job_client.post("/job/cancel/NOT_REAL_JOB_ID")
-        assert response.status_code == 200
-
     def test_endpoint_job_subscribe(self, file_write_read_job_client: TestClient) -> None:
         response = file_write_read_job_client.get("/job/subscribe/NOT_REAL_JOB_ID")
         assert response.status_code == 200
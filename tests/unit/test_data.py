@@ -1,4 +1,7 @@
+import time
 import pytest
+import sqlite3
+import threading
 import datetime as dt
 import jobserver as jserv
 from pathlib import Path
@@ -47,6 +50,205 @@ class TestDatabaseClientBasicFunctionality:
         assert database
 
 
+class TestDatabaseConnections:
+    def insert_job(self, database_client: jserv.DatabaseClient, job_id: int) -> None:
+        database_client.set_entry(
+            entry=jserv.DatabaseEntry.JobStatus(
+                job_id=job_id,
+                init_time=dt.datetime.now(),
+                archived=False,
+            ),
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+
+    def test_database_uses_wal(self, database_client: jserv.DatabaseClient) -> None:
+        journal_mode = database_client._db_connection.execute("PRAGMA journal_mode").fetchone()
+        assert journal_mode == ("wal",)
+
+    def test_reads_do_not_wait_on_open_write(self, database_client: jserv.DatabaseClient) -> None:
+        self.insert_job(database_client, job_id=1)
+        with database_client._lock:
+            database_client._db_connection.execute("BEGIN IMMEDIATE")
+            database_client._db_connection.execute("UPDATE JobStatus SET archived = 1")
+
+            # Read from another thread while the write is uncommitted
+            job_status_entries: list = []
+            thread = threading.Thread(
+                target=lambda: job_status_entries.append(
+                    database_client.get_entry(
+                        table=jserv.enums.DatabaseTable.JOB_STATUS,
+                        primary_key_fields={"job_id": 1},
+                    )
+                )
+            )
+            thread.start()
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+            assert not job_status_entries[0].archived
+            database_client._db_connection.rollback()
+
+    def test_read_connections_are_capped(self, config_client: jserv.ConfigClient) -> None:
+        config_client.set(jserv.enums.ConfigValue.DATABASE_READ_CONNECTIONS.value, 2)
+        database_client = jserv.DatabaseClient(config=config_client)
+        self.insert_job(database_client, job_id=1)
+
+        def read() -> None:
+            for _ in range(20):
+                assert database_client.get_entry(
+                    table=jserv.enums.DatabaseTable.JOB_STATUS,
+                    primary_key_fields={"job_id": 1},
+                )
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert 1 <= len(database_client._read_connections) <= 2
+        database_client.disconnect()
+
+
+class TestSchemaMigrations:
+    def get_schema_version(self, database_client: jserv.DatabaseClient) -> int:
+        return database_client._db_connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def get_query_plan(self, database_client: jserv.DatabaseClient, query: str) -> str:
+        rows = database_client._db_connection.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+        return " ".join(row[-1] for row in rows)
+
+    def test_new_database_is_at_latest_version(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        assert self.get_schema_version(database_client) == len(database_client._get_migrations())
+
+    @pytest.mark.parametrize(
+        "query,index_name",
+        [
+            ("SELECT * FROM JobUpdate WHERE update_time > 0", "JobUpdate_Order_IX"),
+            ("SELECT * FROM Error WHERE error_time < 0", "Error_Order_IX"),
+            ("SELECT * FROM Error WHERE job_id = 1", "Error_JobID_IX"),
+            ("SELECT * FROM JobStatus WHERE archived = 1", "JobStatus_Archived_Order_IX"),
+            (
+                'SELECT * FROM "Connection" WHERE last_message_time > 0',
+                "Connection_LastMessageTime_IX",
+            ),
+        ],
+    )
+    def test_searches_use_indexes(
+        self,
+        database_client: jserv.DatabaseClient,
+        query: str,
+        index_name: str,
+    ) -> None:
+        assert index_name in self.get_query_plan(database_client, query)
+
+    def test_old_database_is_upgraded_in_place(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        # Roll the file back to the original schema, from before versioning
+        for table in ["JobResultCache", "RecurringJob"]:
+            database_client._db_connection.execute(f"DROP TABLE {table}")
+        database_client._db_connection.execute("DROP INDEX Error_Order_IX")
+        database_client._db_connection.execute("PRAGMA user_version = 0")
+        database_client.disconnect()
+
+        database_client = jserv.DatabaseClient(config=config_client)
+        assert self.get_schema_version(database_client) == len(database_client._get_migrations())
+        assert database_client.search_entries(table=jserv.enums.DatabaseTable.RECURRING_JOB) == []
+        assert "Error_Order_IX" in self.get_query_plan(
+            database_client, "SELECT * FROM Error WHERE error_time < 0"
+        )
+        database_client.disconnect()
+
+    def test_newer_database_is_rejected(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        database_client._db_connection.execute("PRAGMA user_version = 1000")
+        database_client.disconnect()
+        with pytest.raises(ValueError):
+            jserv.DatabaseClient(config=config_client)
+
+
+class TestWriteBehind:
+    def get_job_update(self, update_time: int) -> jserv.DatabaseEntry.JobUpdate:
+        return jserv.DatabaseEntry.JobUpdate(
+            job_id=1,
+            update_time=update_time,
+            new_state=jserv.enums.JobUpdateType.STATE_CHANGE.value,
+            comment="",
+        )
+
+    def count_job_updates(self, database_client: jserv.DatabaseClient) -> int:
+        # Counted on the write connection, which does not flush the buffer
+        with database_client._lock:
+            return database_client._db_connection.execute(
+                "SELECT COUNT(*) FROM JobUpdate"
+            ).fetchone()[0]
+
+    def test_buffered_rows_are_flushed_before_reads(
+        self,
+        config_client: jserv.ConfigClient,
+    ) -> None:
+        config_client.set(jserv.enums.ConfigValue.WRITE_BEHIND_INTERVAL.value, 60)
+        database_client = jserv.DatabaseClient(config=config_client)
+        for update_time in range(1, 4):
+            database_client.buffer_entry(self.get_job_update(update_time))
+        assert self.count_job_updates(database_client) == 0
+
+        job_updates = database_client.search_entries(table=jserv.enums.DatabaseTable.JOB_UPDATE)
+        assert len(job_updates or []) == 3
+        database_client.disconnect()
+
+    def test_full_buffer_is_flushed_in_background(self, config_client: jserv.ConfigClient) -> None:
+        config_client.set(jserv.enums.ConfigValue.WRITE_BEHIND_INTERVAL.value, 60)
+        config_client.set(jserv.enums.ConfigValue.WRITE_BEHIND_MAX_ROWS.value, 10)
+        database_client = jserv.DatabaseClient(config=config_client)
+        for update_time in range(1, 11):
+            database_client.buffer_entry(self.get_job_update(update_time))
+
+        deadline = time.monotonic() + 5
+        while self.count_job_updates(database_client) < 10:
+            assert time.monotonic() < deadline, "Timed out waiting for the buffer to flush"
+            time.sleep(0.01)
+        database_client.disconnect()
+
+    def test_disconnect_flushes_buffer(self, config_client: jserv.ConfigClient) -> None:
+        config_client.set(jserv.enums.ConfigValue.WRITE_BEHIND_INTERVAL.value, 60)
+        database_client = jserv.DatabaseClient(config=config_client)
+        database_client.buffer_entry(self.get_job_update(1))
+        database_client.disconnect()
+
+        database_client = jserv.DatabaseClient(config=config_client)
+        assert self.count_job_updates(database_client) == 1
+        database_client.disconnect()
+
+    def test_bad_row_does_not_lose_batch(self, database_client: jserv.DatabaseClient) -> None:
+        for update_time in [1, 2, 2, 3]:
+            database_client.buffer_entry(self.get_job_update(update_time))
+        database_client.flush()
+        assert self.count_job_updates(database_client) == 3
+
+    def test_full_durability_writes_through(self, config_client: jserv.ConfigClient) -> None:
+        config_client.set(jserv.enums.ConfigValue.DATABASE_DURABILITY.value, "FULL")
+        database_client = jserv.DatabaseClient(config=config_client)
+        database_client.buffer_entry(self.get_job_update(1))
+        assert self.count_job_updates(database_client) == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            database_client.buffer_entry(self.get_job_update(1))
+        database_client.disconnect()
+
+    def test_only_log_tables_are_buffered(self, database_client: jserv.DatabaseClient) -> None:
+        with pytest.raises(ValueError):
+            database_client.buffer_entry(
+                jserv.DatabaseEntry.JobStatus(job_id=1, init_time=dt.datetime.now(), archived=False)
+            )
+
+
 @pytest.mark.dependency(depends=["test_database_client_can_load"])
 class TestDatabaseSetFunctions:
     @pytest.mark.dependency(name="test_insert")
@@ -177,6 +379,44 @@ class TestDatabaseSetFunctions:
             set_method=jserv.enums.SQLSetMethod.UPDATE,
         )
 
+    def test_set_entries_in_one_transaction(
+        self,
+        database_client: jserv.DatabaseClient,
+        job_status_entry_factory: DatabaseEntryFactory,
+    ) -> None:
+        database_entries = [job_status_entry_factory.get() for _ in range(3)]
+        database_entries[1].job_id += 1  # type: ignore[attr-defined]
+        database_entries[2].job_id += 2  # type: ignore[attr-defined]
+        database_client.set_entries(
+            entries=database_entries,
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+
+        retrieved_entries = database_client.search_entries(
+            table=jserv.enums.DatabaseTable.JOB_STATUS,
+        )
+        assert retrieved_entries is not None
+        assert len(retrieved_entries) == 3
+
+    def test_set_entries_rolls_back_on_failure(
+        self,
+        database_client: jserv.DatabaseClient,
+        job_status_entry_factory: DatabaseEntryFactory,
+    ) -> None:
+        database_entry = job_status_entry_factory.get()
+
+        # The duplicate fails the whole batch
+        with pytest.raises(Exception):
+            database_client.set_entries(
+                entries=[database_entry, database_entry],
+                set_method=jserv.enums.SQLSetMethod.INSERT,
+            )
+
+        retrieved_entries = database_client.search_entries(
+            table=jserv.enums.DatabaseTable.JOB_STATUS,
+        )
+        assert retrieved_entries == []
+
 
 @pytest.mark.dependency(depends=["test_database_client_can_load"])
 class TestDatabaseGetFunctions:
@@ -526,6 +766,108 @@ class TestDatabaseSearchFunctions:
             set_method=jserv.enums.SQLSetMethod.INSERT,
         )
 
+    def test_search_by_text_and_enum_values(self, database_client: jserv.DatabaseClient) -> None:
+        database_client.set_entry(
+            entry=jserv.DatabaseEntry.Error(
+                error_id=1,
+                error_time=dt.datetime.now(),
+                severity_level=jserv.enums.ErrorSeverity.NOT_GOOD,
+                traceback="",
+                job_id=None,
+                client_token="client'); DROP TABLE Error; --",
+            ),
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+        errors = database_client.search_entries(
+            table=jserv.enums.DatabaseTable.ERROR,
+            filters=[
+                jserv.data.Filter.Compare(
+                    field_name="client_token",
+                    operator=jserv.enums.SQLCompareOperator.EQUALS,
+                    value="client'); DROP TABLE Error; --",
+                ),
+                jserv.data.Filter.Compare(
+                    field_name="severity_level",
+                    operator=jserv.enums.SQLCompareOperator.EQUALS,
+                    value=jserv.enums.ErrorSeverity.NOT_GOOD,
+                ),
+            ],
+        )
+        assert [error.error_id for error in errors or []] == [1]  # type: ignore[attr-defined]
+
+    def test_statements_are_built_once_per_shape(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        for job_id in range(3):
+            database_client.search_entries(
+                table=jserv.enums.DatabaseTable.JOB_STATUS,
+                filters=[
+                    jserv.data.Filter.Compare(
+                        field_name="job_id",
+                        operator=jserv.enums.SQLCompareOperator.EQUALS,
+                        value=job_id,
+                    )
+                ],
+                limit=10,
+                page=job_id,
+            )
+            database_client.get_entry(
+                table=jserv.enums.DatabaseTable.JOB_STATUS,
+                primary_key_fields={"job_id": job_id},
+            )
+        assert len(database_client._statements) == 2
+
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_cursor_pages_through_every_entry_once(
+        self,
+        database_client: jserv.DatabaseClient,
+        descending: bool,
+    ) -> None:
+        # Updates of two jobs share update times, so the job ID breaks the tie
+        database_client.set_entries(
+            entries=[
+                jserv.DatabaseEntry.JobUpdate(
+                    job_id=job_id,
+                    update_time=update_time,
+                    new_state=jserv.enums.JobUpdateType.STATE_CHANGE.value,
+                    comment="",
+                )
+                for update_time in range(1, 6)
+                for job_id in [1, 2]
+            ],
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+
+        keys = []
+        cursor = None
+        while True:
+            job_updates = (
+                database_client.search_entries(
+                    table=jserv.enums.DatabaseTable.JOB_UPDATE,
+                    limit=3,
+                    descending=descending,
+                    cursor=cursor,
+                )
+                or []
+            )
+            keys += [
+                (job_update.get_fields()["update_time"], job_update.job_id)  # type: ignore[attr-defined]
+                for job_update in job_updates
+            ]
+            if len(job_updates) < 3:
+                break
+            cursor = job_updates[-1].get_cursor()
+        assert len(keys) == 10
+        assert keys == sorted(keys, reverse=descending)
+
+    def test_invalid_cursor_is_rejected(self, database_client: jserv.DatabaseClient) -> None:
+        with pytest.raises(ValueError):
+            database_client.search_entries(
+                table=jserv.enums.DatabaseTable.JOB_UPDATE,
+                cursor="not a cursor",
+            )
+
     @pytest.mark.xfail(raises=NotImplementedError)
     def test_search_by_less_than(
         self,
@@ -553,3 +895,223 @@ class TestDatabaseSearchFunctions:
         request: pytest.FixtureRequest,
     ) -> None:
         raise NotImplementedError()
+
+
+class TestResultCache:
+    def get_job_result(self) -> jserv.structs.JobResult:
+        return jserv.structs.JobResult(
+            return_code=jserv.enums.JobReturnCode.SUCCESS,
+            artifacts=[],
+        )
+
+    def test_cache_key_ignores_scheduling_fields(self) -> None:
+        parameters_1 = jserv.structs.JobParameters(
+            name="Job",
+            priority=jserv.enums.JobPriority.LOW,
+            max_threads=1,
+        )
+        parameters_2 = jserv.structs.JobParameters(
+            name="Job",
+            priority=jserv.enums.JobPriority.HIGH,
+            max_threads=4,
+            init_time=dt.datetime.now() + dt.timedelta(days=1),
+        )
+        assert jserv.data.ResultCache.get_cache_key(
+            "Job", parameters_1
+        ) == jserv.data.ResultCache.get_cache_key("Job", parameters_2)
+        assert jserv.data.ResultCache.get_cache_key(
+            "Job", parameters_1
+        ) != jserv.data.ResultCache.get_cache_key("OtherJob", parameters_1)
+
+    def test_hit_and_miss_counters(self, database_client: jserv.DatabaseClient) -> None:
+        result_cache = jserv.data.ResultCache(database=database_client)
+        assert result_cache.get("key") is None
+        result_cache.set("key", "Job", self.get_job_result())
+
+        job_result = result_cache.get("key")
+        assert job_result is not None
+        assert job_result.return_code == jserv.enums.JobReturnCode.SUCCESS
+        stats = result_cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_least_recently_used_entry_is_evicted(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        result_cache = jserv.data.ResultCache(database=database_client, max_entries=2)
+        result_cache.set("key_1", "Job", self.get_job_result())
+        result_cache.set("key_2", "Job", self.get_job_result())
+        assert result_cache.get("key_1") is not None
+        result_cache.set("key_3", "Job", self.get_job_result())
+
+        assert result_cache.get("key_2") is None
+        assert result_cache.get("key_1") is not None
+        assert result_cache.get_stats()["evictions"] == 1
+
+    def test_expired_entry_is_a_miss(self, database_client: jserv.DatabaseClient) -> None:
+        result_cache = jserv.data.ResultCache(database=database_client, ttl=0)
+        result_cache.set("key", "Job", self.get_job_result())
+        assert result_cache.get("key") is None
+
+    def test_entries_persist_across_restarts(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        jserv.data.ResultCache(database=database_client).set("key", "Job", self.get_job_result())
+        assert jserv.data.ResultCache(database=database_client).get("key") is not None
+
+
+class TestJobLeases:
+    def insert_job(
+        self,
+        database_client: jserv.DatabaseClient,
+        job_id: int,
+        priority: int = 3,
+        lease_owner: str | None = None,
+    ) -> None:
+        database_client.set_entry(
+            entry=jserv.DatabaseEntry.JobStatus(
+                job_id=job_id,
+                init_time=dt.datetime.now(),
+                archived=False,
+                template_name="Job",
+                parameters=b"",
+                priority=priority,
+                lease_owner=lease_owner,
+            ),
+            set_method=jserv.enums.SQLSetMethod.INSERT,
+        )
+
+    def get_lease_expiry(self, seconds: float = 30) -> dt.datetime:
+        return dt.datetime.now() + dt.timedelta(seconds=seconds)
+
+    def test_jobs_are_claimed_once_by_priority(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        self.insert_job(database_client, job_id=1, priority=2)
+        self.insert_job(database_client, job_id=2, priority=4)
+
+        claimed_ids = []
+        for worker_id in ["worker_1", "worker_2", "worker_3"]:
+            job_status_entry = database_client.claim_job(
+                lease_owner=worker_id,
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+            if job_status_entry is not None:
+                assert job_status_entry.lease_owner == worker_id
+                claimed_ids.append(job_status_entry.job_id)
+        assert claimed_ids == [2, 1]
+
+    def test_jobs_of_other_templates_are_not_claimed(
+        self,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        self.insert_job(database_client, job_id=1)
+        assert (
+            database_client.claim_job(
+                lease_owner="worker",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["OtherJob"],
+            )
+            is None
+        )
+
+    def test_local_jobs_are_not_claimed(self, database_client: jserv.DatabaseClient) -> None:
+        self.insert_job(database_client, job_id=1, lease_owner="server")
+        assert (
+            database_client.claim_job(
+                lease_owner="worker",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+            is None
+        )
+
+    def test_expired_lease_is_reclaimed(self, database_client: jserv.DatabaseClient) -> None:
+        self.insert_job(database_client, job_id=1)
+        database_client.claim_job(
+            lease_owner="crashed_worker",
+            lease_expiry=self.get_lease_expiry(seconds=-1),
+            template_names=["Job"],
+        )
+
+        job_status_entry = database_client.claim_job(
+            lease_owner="worker",
+            lease_expiry=self.get_lease_expiry(),
+            template_names=["Job"],
+        )
+        assert job_status_entry is not None
+        assert job_status_entry.job_id == 1
+
+    def test_renewed_lease_is_not_reclaimed(self, database_client: jserv.DatabaseClient) -> None:
+        self.insert_job(database_client, job_id=1)
+        database_client.claim_job(
+            lease_owner="worker_1",
+            lease_expiry=self.get_lease_expiry(seconds=-1),
+            template_names=["Job"],
+        )
+        database_client.renew_leases(
+            lease_owner="worker_1",
+            job_ids=[1],
+            lease_expiry=self.get_lease_expiry(),
+        )
+        assert (
+            database_client.claim_job(
+                lease_owner="worker_2",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+            is None
+        )
+
+    def test_archived_jobs_are_not_released(self, database_client: jserv.DatabaseClient) -> None:
+        self.insert_job(database_client, job_id=1)
+        self.insert_job(database_client, job_id=2)
+        for _ in range(2):
+            database_client.claim_job(
+                lease_owner="worker_1",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+        database_client.archive_job(1)
+        database_client.release_leases(lease_owner="worker_1")
+
+        job_status_entry = database_client.claim_job(
+            lease_owner="worker_2",
+            lease_expiry=self.get_lease_expiry(),
+            template_names=["Job"],
+        )
+        assert job_status_entry is not None
+        assert job_status_entry.job_id == 2
+        assert (
+            database_client.claim_job(
+                lease_owner="worker_2",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+            is None
+        )
+
+    def test_new_columns_are_added_to_existing_database(
+        self,
+        config_client: jserv.ConfigClient,
+        database_client: jserv.DatabaseClient,
+    ) -> None:
+        database_client._db_connection.execute("DROP INDEX JobStatus_Open_IX")
+        for column in ["lease_owner", "lease_expiry", "state_index", "checkpoint"]:
+            database_client._db_connection.execute(f"ALTER TABLE JobStatus DROP COLUMN {column}")
+        database_client._db_connection.execute("PRAGMA user_version = 1")
+        database_client.disconnect()
+
+        database_client = jserv.DatabaseClient(config=config_client)
+        self.insert_job(database_client, job_id=1)
+        assert (
+            database_client.claim_job(
+                lease_owner="worker",
+                lease_expiry=self.get_lease_expiry(),
+                template_names=["Job"],
+            )
+            is not None
+        )
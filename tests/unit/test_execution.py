@@ -0,0 +1,84 @@
+import time
+import threading
+import pytest
+import jobserver as jserv
+from tests.fixtures.jobs.async_job import AsyncJob
+from tests.fixtures.jobs.blocking_job import BlockingJob
+from tests.fixtures.jobs.parallel_job import ParallelJob
+
+
+class TestThreadBackend:
+    def test_control_state_calls_hook(self) -> None:
+        backend = jserv.execution.ThreadBackend()
+        state = BlockingJob.State1_Block(name="State1_Block", job_id="1")
+        assert backend.control_state(state, "pause").result(timeout=1) is False
+
+    def test_maps_partitions_on_up_to_max_workers(self) -> None:
+        ParallelJob.State1_SumSquares.max_running = 0
+        backend = jserv.execution.ThreadBackend()
+        progress: list[tuple[int, int]] = []
+        state = ParallelJob.State1_SumSquares(
+            name="State1_SumSquares",
+            job_id="1",
+            update_callback=lambda finished, total: progress.append((finished, total)),
+            max_workers=3,
+        )
+        assert backend.run_parallel_state(state).result(timeout=5) is True
+        assert ParallelJob.State1_SumSquares.max_running == 3
+        assert [finished for finished, _ in progress] == list(range(1, 9))
+
+    def test_cancelled_parallel_state_drops_remaining_partitions(self) -> None:
+        release = threading.Event()
+        mapped: list[int] = []
+
+        class State1_Block(jserv.Job.ParallelState):
+            def partition(self) -> list[int]:
+                return list(range(4))
+
+            def map(self, partition: int) -> int:
+                mapped.append(partition)
+                release.wait(timeout=5)
+                return partition
+
+        backend = jserv.execution.ThreadBackend()
+        state = State1_Block(name="State1_Block", job_id="1", max_workers=1)
+        future = backend.run_parallel_state(state)
+        while not mapped:
+            time.sleep(0.01)
+        assert backend.control_state(state, "cancel").result(timeout=1) is True
+        release.set()
+        assert future.result(timeout=5) is False
+        assert mapped == [0]
+
+
+class TestAsyncioBackend:
+    def test_runs_coroutine_state(self) -> None:
+        backend = jserv.execution.AsyncioBackend()
+        state = AsyncJob.State1_Wait(name="State1_Wait", job_id="1")
+        try:
+            assert backend.run_state(state).result(timeout=5) is True
+            assert backend.control_state(state, "cancel").result(timeout=5) is True
+        finally:
+            backend.shutdown()
+
+    def test_measures_loop_lag_from_blocking_state(self) -> None:
+        class State1_Block(jserv.Job.AsyncState):
+            async def start(self) -> bool:
+                time.sleep(0.3)
+                return True
+
+        backend = jserv.execution.AsyncioBackend(heartbeat_interval=0.05)
+        state = State1_Block(name="State1_Block", job_id="1")
+        try:
+            assert backend.run_state(state).result(timeout=5) is True
+            time.sleep(0.1)
+            assert backend.get_loop_lag() > 0.1
+            assert backend.get_loop_lag() < 0.1
+        finally:
+            backend.shutdown()
+
+    def test_rejects_synchronous_state(self) -> None:
+        backend = jserv.execution.AsyncioBackend()
+        state = BlockingJob.State1_Block(name="State1_Block", job_id="1")
+        with pytest.raises(TypeError):
+            backend.run_state(state)
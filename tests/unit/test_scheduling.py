@@ -0,0 +1,366 @@
+import pytest
+import datetime as dt
+import jobserver as jserv
+from jobserver.enums import JobPriority
+
+
+class TestRunQueue:
+    def test_pop_on_empty_queue(self) -> None:
+        run_queue = jserv.scheduling.RunQueue()
+        assert run_queue.pop() is None
+        assert len(run_queue) == 0
+
+    def test_pops_by_priority_then_init_time(self) -> None:
+        run_queue = jserv.scheduling.RunQueue(aging_interval=60)
+        now = dt.datetime.now()
+        run_queue.push(job_id=1, priority=JobPriority.LOW, init_time=now)
+        run_queue.push(job_id=2, priority=JobPriority.HIGH, init_time=now)
+        run_queue.push(job_id=3, priority=JobPriority.HIGH, init_time=now - dt.timedelta(seconds=1))
+        run_queue.push(job_id=4, priority=JobPriority.NORMAL, init_time=now)
+
+        assert [run_queue.pop() for _ in range(4)] == [3, 2, 4, 1]
+
+    def test_old_low_priority_job_is_not_starved(self) -> None:
+        run_queue = jserv.scheduling.RunQueue(aging_interval=10)
+        now = dt.datetime.now()
+        run_queue.push(
+            job_id=1,
+            priority=JobPriority.VERY_LOW,
+            init_time=now - dt.timedelta(seconds=41),
+        )
+        run_queue.push(job_id=2, priority=JobPriority.VERY_HIGH, init_time=now)
+
+        assert run_queue.pop() == 1
+
+    def test_deadline_policy_pops_earliest_deadline_first(self) -> None:
+        run_queue = jserv.scheduling.RunQueue(policy=jserv.enums.SchedulingPolicy.DEADLINE)
+        now = dt.datetime.now()
+        run_queue.push(job_id=1, priority=JobPriority.VERY_HIGH, init_time=now)
+        run_queue.push(
+            job_id=2,
+            priority=JobPriority.LOW,
+            init_time=now,
+            deadline=now + dt.timedelta(minutes=5),
+        )
+        run_queue.push(
+            job_id=3,
+            priority=JobPriority.VERY_LOW,
+            init_time=now,
+            deadline=now + dt.timedelta(minutes=1),
+        )
+
+        assert [run_queue.pop() for _ in range(3)] == [3, 2, 1]
+
+    def test_removed_job_is_skipped(self) -> None:
+        run_queue = jserv.scheduling.RunQueue()
+        now = dt.datetime.now()
+        run_queue.push(job_id=1, priority=JobPriority.HIGH, init_time=now)
+        run_queue.push(job_id=2, priority=JobPriority.LOW, init_time=now)
+
+        assert run_queue.remove(1)
+        assert not run_queue.remove(1)
+        assert 1 not in run_queue
+        assert run_queue.pop() == 2
+        assert run_queue.pop() is None
+
+    def test_stats_per_priority(self) -> None:
+        run_queue = jserv.scheduling.RunQueue()
+        now = dt.datetime.now()
+        run_queue.push(job_id=1, priority=JobPriority.HIGH, init_time=now)
+        run_queue.push(job_id=2, priority=JobPriority.LOW, init_time=now)
+        run_queue.pop()
+
+        stats = run_queue.get_stats()
+        assert stats["HIGH"]["depth"] == 0
+        assert stats["HIGH"]["dequeued"] == 1
+        assert stats["LOW"]["depth"] == 1
+        assert stats["LOW"]["dequeued"] == 0
+
+    def test_drain_rate_counts_recent_dequeues(self) -> None:
+        run_queue = jserv.scheduling.RunQueue(drain_rate_window=10)
+        now = dt.datetime.now()
+        for job_id in range(5):
+            run_queue.push(job_id=job_id, priority=JobPriority.NORMAL, init_time=now)
+        assert run_queue.get_drain_rate() == 0
+        assert run_queue.get_depth(JobPriority.NORMAL) == 5
+
+        for _ in range(5):
+            run_queue.pop()
+        assert run_queue.get_drain_rate() == 0.5
+
+
+class TestFairShareQueue:
+    @staticmethod
+    def push(
+        run_queue: jserv.scheduling.FairShareQueue,
+        job_id: int,
+        client_token: str,
+        cost: int = 1,
+    ) -> None:
+        run_queue.push(
+            job_id=job_id,
+            priority=JobPriority.NORMAL,
+            init_time=dt.datetime.now(),
+            client_token=client_token,
+            cost=cost,
+        )
+
+    def test_clients_take_turns(self) -> None:
+        run_queue = jserv.scheduling.FairShareQueue()
+        for job_id in range(1, 5):
+            self.push(run_queue, job_id=job_id, client_token="noisy")
+        self.push(run_queue, job_id=5, client_token="quiet")
+        self.push(run_queue, job_id=6, client_token="quiet")
+
+        assert [run_queue.pop() for _ in range(7)] == [1, 5, 2, 6, 3, 4, None]
+
+    def test_clients_are_served_in_proportion_to_weight(self) -> None:
+        run_queue = jserv.scheduling.FairShareQueue(weights={"heavy": 2})
+        for job_id in range(1, 7):
+            self.push(run_queue, job_id=job_id, client_token="heavy" if job_id % 2 else "light")
+        popped = [run_queue.pop() for _ in range(3)]
+
+        assert sorted(popped) == [1, 2, 3]
+        assert run_queue.get_client_stats()["heavy"]["dequeued_jobs"] == 2
+
+    def test_wide_jobs_cost_their_threads(self) -> None:
+        run_queue = jserv.scheduling.FairShareQueue()
+        self.push(run_queue, job_id=1, client_token="wide", cost=4)
+        self.push(run_queue, job_id=2, client_token="wide", cost=4)
+        for job_id in range(3, 10):
+            self.push(run_queue, job_id=job_id, client_token="narrow")
+        popped = [run_queue.pop() for _ in range(6)]
+
+        assert popped.count(1) + popped.count(2) == 1
+        assert run_queue.get_client_stats()["narrow"]["dequeued_threads"] == 5
+
+    def test_blocked_client_does_not_hold_up_others(self) -> None:
+        run_queue = jserv.scheduling.FairShareQueue()
+        now = dt.datetime.now()
+        run_queue.push(job_id=1, priority=JobPriority.HIGH, init_time=now, client_token="a")
+        run_queue.push(job_id=2, priority=JobPriority.LOW, init_time=now, client_token="b")
+
+        assert run_queue.peek() == 1
+        assert run_queue.pop_first(predicate=lambda job_id: job_id != 1) == 2
+        assert run_queue.get_stats()["HIGH"]["depth"] == 1
+        assert run_queue.pop_first(predicate=lambda job_id: job_id != 1) is None
+        assert run_queue.remove(1)
+        assert len(run_queue) == 0
+
+
+class TestRetryPolicy:
+    def test_backoff_doubles_up_to_cap(self) -> None:
+        retry_policy = jserv.structs.RetryPolicy(backoff_base=1, backoff_cap=5, jitter=0)
+        assert [retry_policy.get_delay(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+    def test_jitter_only_shortens_delay(self) -> None:
+        retry_policy = jserv.structs.RetryPolicy(backoff_base=4, jitter=0.5)
+        assert all(2 <= retry_policy.get_delay(1) <= 4 for _ in range(100))
+
+    def test_only_retryable_codes_within_attempts_are_retried(self) -> None:
+        retry_policy = jserv.structs.RetryPolicy(max_attempts=2)
+        assert retry_policy.should_retry(1, jserv.enums.ErrorCode.TIMEOUT)
+        assert not retry_policy.should_retry(2, jserv.enums.ErrorCode.TIMEOUT)
+        assert not retry_policy.should_retry(1, jserv.enums.ErrorCode.INPUT_FILE_INVALID)
+
+
+class TestAdmissionController:
+    def test_small_jobs_fill_gaps_around_wide_job(self) -> None:
+        admission = jserv.scheduling.AdmissionController(budget=8)
+        assert admission.can_admit(job_id=1, max_threads=6)
+        admission.admit(job_id=1, max_threads=6)
+
+        # A second wide job does not fit, but narrow ones do
+        assert not admission.can_admit(job_id=2, max_threads=4)
+        assert admission.can_admit(job_id=3, max_threads=2)
+        admission.admit(job_id=3, max_threads=2)
+        assert admission.get_free_threads() == 0
+
+        admission.release(job_id=1)
+        assert admission.get_free_threads() == 6
+
+    def test_job_wider_than_budget_is_clamped(self) -> None:
+        admission = jserv.scheduling.AdmissionController(budget=4)
+        assert admission.admit(job_id=1, max_threads=16) == 4
+
+    def test_reserved_job_blocks_backfill_after_limit(self) -> None:
+        admission = jserv.scheduling.AdmissionController(budget=4, backfill_limit=1)
+        admission.admit(job_id=1, max_threads=2)
+        assert not admission.can_admit(job_id=2, max_threads=4)
+
+        # One backfill is allowed past the reserved job, then it gets priority
+        assert admission.can_admit(job_id=3, max_threads=1)
+        admission.admit(job_id=3, max_threads=1)
+        assert not admission.can_admit(job_id=4, max_threads=1)
+
+        admission.release(job_id=1)
+        admission.release(job_id=3)
+        assert admission.can_admit(job_id=2, max_threads=4)
+
+    def test_shrinking_budget_keeps_running_jobs(self) -> None:
+        admission = jserv.scheduling.AdmissionController(budget=4)
+        admission.admit(job_id=1, max_threads=3)
+        admission.set_budget(2)
+
+        assert 1 in admission
+        assert admission.get_free_threads() == 0
+        assert not admission.can_admit(job_id=2, max_threads=1)
+
+
+class TestDependencyGraph:
+    def test_job_without_dependencies_is_ready(self) -> None:
+        dependencies = jserv.scheduling.DependencyGraph()
+        assert dependencies.add(job_id=1, depends_on=[])
+        assert 1 not in dependencies
+
+    def test_job_is_ready_once_all_upstream_jobs_succeed(self) -> None:
+        dependencies = jserv.scheduling.DependencyGraph()
+        assert not dependencies.add(job_id=3, depends_on=[1, 2])
+
+        assert dependencies.resolve(job_id=1, succeeded=True) == ([], [])
+        assert dependencies.resolve(job_id=2, succeeded=True) == ([3], [])
+        assert len(dependencies) == 0
+
+    def test_failure_cancels_downstream_jobs_transitively(self) -> None:
+        dependencies = jserv.scheduling.DependencyGraph()
+        dependencies.add(job_id=2, depends_on=[1])
+        dependencies.add(job_id=3, depends_on=[2])
+        dependencies.add(job_id=4, depends_on=[2, 3])
+        dependencies.add(job_id=5, depends_on=[6])
+
+        ready, cancelled = dependencies.resolve(job_id=1, succeeded=False)
+        assert ready == []
+        assert sorted(cancelled) == [2, 3, 4]
+        assert 5 in dependencies
+
+    def test_removed_job_is_not_released(self) -> None:
+        dependencies = jserv.scheduling.DependencyGraph()
+        dependencies.add(job_id=2, depends_on=[1], priority=JobPriority.LOW)
+        assert dependencies.get_depth(JobPriority.LOW) == 1
+        assert dependencies.remove(job_id=2)
+        assert dependencies.get_depth(JobPriority.LOW) == 0
+        assert not dependencies.remove(job_id=2)
+        assert dependencies.resolve(job_id=1, succeeded=True) == ([], [])
+
+
+class TestConcurrencyPools:
+    def test_pool_is_full_at_limit(self) -> None:
+        pools = jserv.scheduling.ConcurrencyPools()
+        pool = jserv.structs.ConcurrencyPool(name="licence", max_jobs=2)
+        pools.acquire(pool)
+        assert not pools.is_full(pool)
+        pools.acquire(pool)
+        assert pools.is_full(pool)
+
+    def test_release_hands_back_parked_jobs_in_order(self) -> None:
+        pools = jserv.scheduling.ConcurrencyPools()
+        pool = jserv.structs.ConcurrencyPool(name="licence", max_jobs=1)
+        now = dt.datetime.now()
+        pools.acquire(pool)
+        pools.park(pool, job_id=2, priority=JobPriority.LOW, init_time=now)
+        pools.park(pool, job_id=3, priority=JobPriority.HIGH, init_time=now)
+        assert pools.get_stats()["licence"] == {"max_jobs": 1, "running_jobs": 1, "parked_jobs": 2}
+        assert pools.get_depth(JobPriority.HIGH) == 1
+
+        assert pools.release(pool) == 3
+        pools.acquire(pool)
+        assert pools.release(pool) == 2
+        assert pools.release(pool) is None
+
+
+class TestTimingWheel:
+    def test_timer_fires_once_due(self) -> None:
+        wheel = jserv.scheduling.TimingWheel(tick=1, slots=4, levels=3, now=0)
+        wheel.schedule(delay=2.5, callback=lambda: "fired", now=0)
+
+        assert wheel.advance(now=2) == []
+        assert [callback() for callback in wheel.advance(now=3)] == ["fired"]
+        assert len(wheel) == 0
+
+    def test_cancelled_timer_does_not_fire(self) -> None:
+        wheel = jserv.scheduling.TimingWheel(tick=1, slots=4, levels=3, now=0)
+        timer_id = wheel.schedule(delay=1, callback=lambda: "fired", now=0)
+
+        assert wheel.cancel(timer_id)
+        assert not wheel.cancel(timer_id)
+        assert wheel.advance(now=5) == []
+
+    def test_distant_timers_cascade_down_the_levels(self) -> None:
+        wheel = jserv.scheduling.TimingWheel(tick=1, slots=4, levels=2, now=0)
+        for delay in [3, 9, 15, 40, 100]:
+            wheel.schedule(delay=delay, callback=lambda delay=delay: delay, now=0)
+
+        fired = []
+        for now in range(1, 101):
+            for callback in wheel.advance(now=now):
+                fired.append((callback(), now))
+        assert fired == [(3, 3), (9, 9), (15, 15), (40, 40), (100, 100)]
+
+
+class TestAutoscaler:
+    def test_grows_with_queued_jobs_up_to_max(self) -> None:
+        autoscaler = jserv.scheduling.Autoscaler(min_threads=1, max_threads=6, cooldown=10)
+        kwargs = {"queued_jobs": 20, "used_threads": 2, "cpu_utilisation": 0.2, "loop_lag": 0.0}
+
+        assert autoscaler.decide(budget=2, now=0, **kwargs)[0] == 4  # type: ignore[index]
+        assert autoscaler.decide(budget=4, now=5, **kwargs) is None
+        assert autoscaler.decide(budget=4, now=10, **kwargs)[0] == 6  # type: ignore[index]
+        assert autoscaler.decide(budget=6, now=20, **kwargs) is None
+
+    def test_shrinks_when_overloaded(self) -> None:
+        autoscaler = jserv.scheduling.Autoscaler(min_threads=1, max_threads=8)
+        decision = autoscaler.decide(
+            budget=4,
+            queued_jobs=10,
+            used_threads=4,
+            cpu_utilisation=0.5,
+            loop_lag=0.5,
+            now=0,
+        )
+        assert decision is not None and decision[0] == 3
+
+    def test_reclaims_idle_threads_after_cooldown(self) -> None:
+        autoscaler = jserv.scheduling.Autoscaler(min_threads=2, max_threads=8, cooldown=10)
+        kwargs = {"budget": 8, "queued_jobs": 0, "used_threads": 1, "cpu_utilisation": 0.0}
+
+        assert autoscaler.decide(loop_lag=0.0, now=0, **kwargs) is None
+        assert autoscaler.decide(loop_lag=0.0, now=9, **kwargs) is None
+        decision = autoscaler.decide(loop_lag=0.0, now=10, **kwargs)
+        assert decision is not None and decision[0] == 2
+
+    def test_budget_is_brought_within_bounds(self) -> None:
+        autoscaler = jserv.scheduling.Autoscaler(min_threads=2, max_threads=4)
+        decision = autoscaler.decide(
+            budget=16,
+            queued_jobs=0,
+            used_threads=0,
+            cpu_utilisation=0.0,
+            loop_lag=0.0,
+        )
+        assert decision is not None and decision[0] == 4
+
+
+class TestCronSchedule:
+    # Saturday
+    after = dt.datetime(2026, 10, 17, 12, 34, 56)
+
+    def test_every_minute(self) -> None:
+        schedule = jserv.scheduling.CronSchedule("* * * * *")
+        assert schedule.get_next_time(self.after) == dt.datetime(2026, 10, 17, 12, 35)
+
+    def test_steps_and_ranges(self) -> None:
+        schedule = jserv.scheduling.CronSchedule("*/15 9-17 * * *")
+        assert schedule.get_next_time(self.after) == dt.datetime(2026, 10, 17, 12, 45)
+        schedule = jserv.scheduling.CronSchedule("0 9 * * 1-5")
+        assert schedule.get_next_time(self.after) == dt.datetime(2026, 10, 19, 9, 0)
+
+    def test_restricted_day_fields_match_either(self) -> None:
+        schedule = jserv.scheduling.CronSchedule("0 0 1 * 0")
+        assert schedule.get_next_time(self.after) == dt.datetime(2026, 10, 18, 0, 0)
+        schedule = jserv.scheduling.CronSchedule("0 0 1 * 7")
+        assert schedule.get_next_time(self.after) == dt.datetime(2026, 10, 18, 0, 0)
+
+    @pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "0 0 31 2 *"])
+    def test_invalid_expressions(self, expression: str) -> None:
+        with pytest.raises(ValueError):
+            jserv.scheduling.CronSchedule(expression).get_next_time(self.after)